@@ -0,0 +1,233 @@
+"""
+Semantic answer cache
+Konuşma geçmişi olmayan (bağımsız) bir soru, cache'teki bir soruya embedding
+olarak yeterince yakınsa kayıtlı cevap döner; genişletme, arama, rerank ve
+LLM adımlarının hiçbiri çalışmaz.
+
+Soru vektörleri bellek içi bir HNSW index'inde tutulur (hnswlib, cosine):
+cache büyüdükçe arama süresi neredeyse sabit kalır. En eski kayıtların
+index'teki yerleri yeni sorulara verilir. Corpus sürümü değişince cache
+temizlenir.
+
+Yakın embedding tek başına yetmez: "işverenin yükümlülükleri" ile
+"çalışanın yükümlülükleri" çok yakın vektörlerdir ama cevapları farklıdır.
+Bu yüzden iki sorunun arama terimleri (kökler) de yeterince örtüşmelidir.
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+import hnswlib
+import numpy as np
+from config import (
+    ANSWER_CACHE,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MAX_DISTANCE,
+    ANSWER_CACHE_MIN_TERM_OVERLAP,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH
+)
+from cache_utils import normalize_text
+from lexical_index import tokenize
+from resources import get_model
+
+# Mesafe eşiğinin altındaki en yakın kaç soru terim kontrolüne girer
+CANDIDATES = 4
+
+
+def filter_key(filter_dict):
+    """Stable key for a metadata filter (None = whole corpus)"""
+    return json.dumps(filter_dict, sort_keys=True, ensure_ascii=False) if filter_dict else ""
+
+
+def term_overlap(terms, other):
+    """Jaccard overlap of two search-term sets"""
+    if not terms and not other:
+        return 1.0
+    return len(terms & other) / len(terms | other)
+
+
+class AnswerCache:
+    """Bounded answer cache with an HNSW index over question vectors"""
+
+    def __init__(self, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL,
+                 max_distance=ANSWER_CACHE_MAX_DISTANCE, min_term_overlap=ANSWER_CACHE_MIN_TERM_OVERLAP):
+        """
+        Initialize an empty cache (the index is created on the first insert).
+
+        Args:
+            max_entries (int): En fazla kayıt; dolunca en az kullanılan silinir (0 = cache kapalı)
+            ttl (float): Kayıt ömrü, saniye (0 = süresiz)
+            max_distance (float): Eşleşme için en fazla cosine mesafesi (1 - cosine benzerliği)
+            min_term_overlap (float): Arama terimlerinin en az Jaccard örtüşmesi
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl or None
+        self.max_distance = max_distance
+        self.min_term_overlap = min_term_overlap
+
+        self.index = None
+        self._entries = OrderedDict()  # label -> kayıt, en az kullanılan başta
+        self._next_label = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_corpus_version(self, corpus_version):
+        """Drop all answers after the corpus was re-ingested (caller holds the lock)"""
+        if corpus_version != self._version:
+            if self._version is not None and self._entries:
+                print("🔄 Corpus değişti, cevap cache'i temizlendi")
+            self._clear()
+            self._version = corpus_version
+
+    def _clear(self):
+        for label in self._entries:
+            self.index.mark_deleted(label)
+        self._entries.clear()
+
+    def _remove(self, label):
+        self.index.mark_deleted(label)
+        del self._entries[label]
+
+    def lookup(self, question, vector, filter_dict=None, corpus_version=None):
+        """
+        Cached answer for a question close to a previously answered one.
+
+        Args:
+            question (str): Kullanıcının sorusu
+            vector: Sorunun embedding vektörü
+            filter_dict (dict): Aramada kullanılacak metadata filtresi (aynı olmalı)
+            corpus_version: Mevcut corpus sürümü
+
+        Returns:
+            dict: Kayıt (answer, response, sources, question, distance) veya None
+        """
+        terms = frozenset(tokenize(question))
+        key = filter_key(filter_dict)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_corpus_version(corpus_version)
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            k = min(CANDIDATES, len(self._entries))
+            try:
+                labels, distances = self.index.knn_query(np.asarray(vector, dtype=np.float32), k=k)
+            except RuntimeError:
+                # Graf k canlı kayıt bulamadı (yoğun silme sonrası): cache'i atla
+                self.misses += 1
+                return None
+
+            for label, distance in zip(labels[0], distances[0]):
+                if distance > self.max_distance:
+                    break
+                entry = self._entries.get(int(label))
+                if entry is None:
+                    continue
+                if entry["expires_at"] is not None and entry["expires_at"] <= now:
+                    self._remove(int(label))
+                    continue
+                if entry["filter"] != key or term_overlap(terms, entry["terms"]) < self.min_term_overlap:
+                    continue
+
+                self._entries.move_to_end(int(label))
+                self.hits += 1
+                return dict(entry, distance=float(distance))
+
+            self.misses += 1
+            return None
+
+    def store(self, question, vector, answer, response, sources, filter_dict=None, corpus_version=None):
+        """
+        Cache the answer of a standalone question.
+
+        Args:
+            question (str): Kullanıcının sorusu
+            vector: Sorunun embedding vektörü
+            answer (str): Kaynaklarla birlikte tam cevap
+            response (str): Sadece LLM cevabı (konuşma hafızası için)
+            sources (list): Cevapta kullanılan chunk id'leri
+            filter_dict (dict): Aramada kullanılan metadata filtresi
+            corpus_version: Cevabın üretildiği corpus sürümü
+        """
+        if self.max_entries <= 0:
+            return
+
+        vector = np.asarray(vector, dtype=np.float32)
+        entry = {
+            "question": normalize_text(question),
+            "terms": frozenset(tokenize(question)),
+            "filter": filter_key(filter_dict),
+            "answer": answer,
+            "response": response,
+            "sources": list(sources),
+            "version": corpus_version,
+            "expires_at": time.monotonic() + self.ttl if self.ttl else None
+        }
+
+        with self._lock:
+            self._check_corpus_version(corpus_version)
+            if self.index is None:
+                self.index = hnswlib.Index(space="cosine", dim=vector.shape[0])
+                self.index.init_index(
+                    max_elements=self.max_entries,
+                    ef_construction=HNSW_EF_CONSTRUCTION,
+                    M=HNSW_M,
+                    allow_replace_deleted=True
+                )
+                self.index.set_ef(HNSW_EF_SEARCH)
+
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+            # Silinen kayıtların yerini kullan: index max_entries'ten büyümez
+            label = self._next_label
+            self._next_label += 1
+            self.index.add_items(vector[np.newaxis, :], [label], replace_deleted=True)
+            self._entries[label] = entry
+
+    def clear(self):
+        """Removes all entries (counters are kept)"""
+        with self._lock:
+            if self.index is not None:
+                self._clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "max_distance": self.max_distance,
+                "min_term_overlap": self.min_term_overlap,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
+
+
+def get_answer_cache():
+    """
+    Süreç başına tek AnswerCache.
+
+    Returns:
+        AnswerCache: Paylaşılan cache, ANSWER_CACHE kapalıysa None
+    """
+    if not ANSWER_CACHE:
+        return None
+    return get_model("answer_cache", AnswerCache)
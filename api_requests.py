@@ -0,0 +1,81 @@
+"""
+Request validation and response bodies shared by the Flask (app.py) and ASGI (asgi.py) servers
+Hatalı istekler iş yapılmadan 400 ile döner; iki sunucu aynı /stats cevabını verir.
+"""
+
+from rag_pipeline import resolve_search_filter
+from query_expansion import get_expansion_cache, resolve_expansion_mode
+from llm_calls import llm_call_stats
+from client import http_call_stats
+
+
+def parse_ask_request(data):
+    """
+    Validates an /api/ask request body before doing any work.
+
+    Args:
+        data (dict): Parsed JSON body
+
+    Returns:
+        tuple: ((question, scope, filters, expansion, standalone), None) or (None, error message)
+    """
+    if not data or 'question' not in data:
+        return None, 'Missing question in request body'
+
+    question = data['question']
+    if not isinstance(question, str) or not question.strip():
+        return None, 'Question cannot be empty'
+
+    # Validate optional search scope
+    scope = data.get('scope')
+    filters = data.get('filters')
+    try:
+        resolve_search_filter(scope, filters)
+    except (ValueError, TypeError, AttributeError) as e:
+        return None, f'Invalid scope or filters: {e}'
+
+    expansion = data.get('expansion')
+    try:
+        resolve_expansion_mode(expansion)
+    except (ValueError, AttributeError) as e:
+        return None, f'Invalid expansion mode: {e}'
+
+    # Optional: answer without conversation memory (cacheable)
+    standalone = data.get('standalone', False)
+    if not isinstance(standalone, bool):
+        return None, 'standalone must be true or false'
+
+    return (question.strip(), scope, filters, expansion, standalone), None
+
+
+def stats_response(pipeline, collection_stats):
+    """
+    /stats response body.
+
+    Args:
+        pipeline: RAGPipeline or AsyncRAGPipeline instance
+        collection_stats (dict): vectorstore.get_collection_stats() result
+
+    Returns:
+        dict: JSON-serializable statistics
+    """
+    reranker_stats = pipeline.reranker.stats()
+    expansion_cache = pipeline.expansion_cache if pipeline.expansion_cache is not None else get_expansion_cache()
+    answer_cache = pipeline.answer_cache
+
+    return {
+        'total_documents': collection_stats['total_documents'],
+        'database': collection_stats['database'],
+        'collection': collection_stats['collection'],
+        'query_cache': collection_stats.get('query_cache'),
+        'rerank_cache': reranker_stats['score_cache'],
+        'expansion_cache': expansion_cache.stats() if expansion_cache is not None else None,
+        'answer_cache': answer_cache.stats() if answer_cache is not None else None,
+        'llm_calls': llm_call_stats(),
+        'http': http_call_stats(),
+        'batching': {
+            'encode': pipeline.vectorstore.encoder.batching_stats(),
+            'rerank': reranker_stats['batching']
+        },
+        'status': 'success'
+    }
@@ -5,26 +5,33 @@ MongoDB Vector Store Version - Optimized for Railway Deployment
 
 API Endpoints:
     POST /api/ask - Submit a question
+    POST /api/ask/stream - Submit a question, answer streamed as Server-Sent Events
     POST /api/reset - Reset conversation history
     GET /health - Health check endpoint
     GET /stats - Database statistics
 """
 
+import json
 import os
 import sys
 import warnings
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
 # Import modules
-from client import create_openrouter_client
-from mongodb_vector_store import get_mongodb_vectorstore, mongodb_store_exists
+from client import create_openrouter_client, warm_up_client
+from vectorstore_factory import get_vectorstore, vectorstore_exists
 from reranker import RerankerService
 from rag_pipeline import RAGPipeline
+from api_requests import parse_ask_request, stats_response
+from lexical_index import get_lexical_index
+from answer_cache import get_answer_cache
+from resources import mongodb_health
+from config import HYBRID_SEARCH, HTTP_WARMUP
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -51,36 +58,51 @@ def initialize_rag_system():
     
     print("🚀 Initializing Legislation RAG System (MongoDB)...\n")
     
-    # 1. MongoDB'de veri var mı kontrol et
-    if not mongodb_store_exists():
-        print("❌ MongoDB'de döküman bulunamadı!")
-        raise Exception("MongoDB'de döküman yok. Lütfen preprocessing.py scriptini çalıştırın.")
+    # 1. Vector store'da veri var mı kontrol et
+    if not vectorstore_exists():
+        print("❌ Vector store'da döküman bulunamadı!")
+        raise Exception("Vector store'da döküman yok. Lütfen preprocessing.py (local için: local_vector_store.py) scriptini çalıştırın.")
     
     # 2. Create OpenRouter client
     client = create_openrouter_client()
     
-    # 3. MongoDB Vector Store'u yükle (ChromaDB yerine)
-    vectorstore = get_mongodb_vectorstore()
+    # 3. Vector Store'u yükle (VECTOR_BACKEND: mongodb veya local)
+    vectorstore = get_vectorstore()
     stats = vectorstore.get_collection_stats()
-    print(f"✅ MongoDB bağlantısı başarılı: {stats['total_documents']} döküman yüklü\n")
+    print(f"✅ Vector store hazır: {stats['total_documents']} döküman yüklü\n")
     
-    # 4. Initialize reranker
-    reranker = RerankerService()
+    # 4. Initialize reranker (score cache is cleared when the corpus is re-ingested)
+    reranker = RerankerService(corpus_version=vectorstore.corpus_version)
     
-    # 5. Create RAG pipeline
-    rag_pipeline = RAGPipeline(client, vectorstore, reranker)
+    # 5. Build BM25 index for hybrid search (optional)
+    lexical_index = get_lexical_index(vectorstore) if HYBRID_SEARCH else None
+    
+    # 6. Create RAG pipeline (near-identical standalone questions reuse cached answers)
+    rag_pipeline = RAGPipeline(
+        client, vectorstore, reranker, lexical_index=lexical_index, answer_cache=get_answer_cache()
+    )
     
     print("\n✅ Legislation RAG system ready!\n")
 
 
+def prepare_worker():
+    """
+    Load the system and open the OpenRouter connection before serving.
+    Called at worker start (gunicorn post_worker_init, python app.py), never
+    from a request: the first question neither loads models nor waits for TLS.
+    """
+    initialize_rag_system()
+    if HTTP_WARMUP:
+        warm_up_client(rag_pipeline.client)
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     try:
-        # MongoDB bağlantısını kontrol et
-        from mongodb_vector_store import MongoDBVectorStore
-        store = MongoDBVectorStore()
-        health = store.health_check()
+        # MongoDB bağlantısını paylaşılan client ile kontrol et
+        # (her probe'da yeni client açılmaz, model yüklenmez)
+        health = mongodb_health()
         
         return jsonify({
             'status': 'healthy',
@@ -109,12 +131,7 @@ def get_stats():
         # MongoDB'den istatistikleri al
         stats = rag_pipeline.vectorstore.get_collection_stats()
         
-        return jsonify({
-            'total_documents': stats['total_documents'],
-            'database': stats['database'],
-            'collection': stats['collection'],
-            'status': 'success'
-        }), 200
+        return jsonify(stats_response(rag_pipeline, stats)), 200
         
     except Exception as e:
         return jsonify({
@@ -227,7 +244,12 @@ def ask_question():
     
     Request Body:
         {
-            "question": "Your question here"
+            "question": "Your question here",
+            "scope": "kanun" | "teblig" (optional),
+            "filters": {"source_file": "...", "source_dir": "...", "page": 3} (optional),
+            "expansion": "llm" | "thesaurus" | "multi" | "none" (optional, default QUERY_EXPANSION_MODE),
+            "standalone": true | false (optional, default false: answer without
+                          conversation history; such answers can come from the answer cache)
         }
     
     Response:
@@ -237,28 +259,23 @@ def ask_question():
         }
     """
     try:
-        # Get question from request
+        # Get and validate the request
         data = request.get_json()
-        
-        if not data or 'question' not in data:
-            return jsonify({
-                'error': 'Missing question in request body',
-                'status': 'error'
-            }), 400
-        
-        question = data['question'].strip()
-        
-        if not question:
+        arguments, error = parse_ask_request(data)
+        if error is not None:
             return jsonify({
-                'error': 'Question cannot be empty',
+                'error': error,
                 'status': 'error'
             }), 400
+        question, scope, filters, expansion, standalone = arguments
         
         # Initialize RAG system if not already done
         initialize_rag_system()
         
         # Generate answer
-        answer = rag_pipeline.generate_response(question)
+        answer = rag_pipeline.generate_response(
+            question, scope=scope, filters=filters, expansion_mode=expansion, standalone=standalone
+        )
         
         return jsonify({
             'answer': answer,
@@ -272,6 +289,65 @@ def ask_question():
         }), 500
 
 
+def format_sse(event, data):
+    """Format one Server-Sent Event (JSON payload, so newlines in tokens are safe)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route('/api/ask/stream', methods=['POST'])
+def ask_question_stream():
+    """
+    Answer a question as a Server-Sent Events stream
+    
+    Request Body: same as /api/ask
+    
+    Response (text/event-stream):
+        event: sources  data: {"sources": "<formatted sources block>"}
+        event: token    data: {"token": "..."}  (repeated as the answer is generated)
+        event: done     data: {"answer": "<full answer with sources>", "status": "success"}
+        event: error    data: {"error": "...", "status": "error"}  (if generation fails)
+    """
+    try:
+        # Get and validate the request
+        data = request.get_json()
+        arguments, error = parse_ask_request(data)
+        if error is not None:
+            return jsonify({
+                'error': error,
+                'status': 'error'
+            }), 400
+        question, scope, filters, expansion, standalone = arguments
+        
+        # Initialize before the stream starts so startup errors are plain JSON
+        initialize_rag_system()
+        
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+    
+    def generate():
+        try:
+            events = rag_pipeline.generate_response_stream(
+                question, scope=scope, filters=filters, expansion_mode=expansion, standalone=standalone
+            )
+            for event, payload in events:
+                if event == 'sources':
+                    yield format_sse('sources', {'sources': payload})
+                elif event == 'token':
+                    yield format_sse('token', {'token': payload})
+                else:
+                    yield format_sse('done', {'answer': payload, 'status': 'success'})
+        except Exception as e:
+            yield format_sse('error', {'error': str(e), 'status': 'error'})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Proxy'ler (nginx/Railway) akışı tamponlamasın
+    })
+
+
 @app.route('/api/reset', methods=['POST'])
 def reset_conversation():
     """
@@ -345,7 +421,8 @@ def index():
         'version': '1.0.0',
         'mongodb': 'MongoDB Atlas Vector Search',
         'endpoints': {
-            'POST /api/ask': 'Submit a question (JSON body: {"question": "..."})',
+            'POST /api/ask': 'Submit a question (JSON body: {"question": "...", "scope": "kanun|teblig" (optional), "expansion": "llm|thesaurus|multi|none" (optional)})',
+            'POST /api/ask/stream': 'Same body as /api/ask; answer streamed as Server-Sent Events (sources, token..., done)',
             'POST /api/reset': 'Reset conversation history',
             'GET /api/memory': 'Get conversation memory statistics',
             'GET /health': 'Health check',
@@ -360,8 +437,8 @@ def index():
 
 
 if __name__ == '__main__':
-    # Initialize RAG system on startup
-    initialize_rag_system()
+    # Initialize RAG system and warm the OpenRouter connection on startup
+    prepare_worker()
     
     # Run Flask app
     # Railway will set the PORT environment variable
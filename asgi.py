@@ -0,0 +1,234 @@
+"""
+Async web server (ASGI, Starlette) - same API as app.py
+
+Bir süreç, OpenRouter ve MongoDB çağrılarını event loop üzerinde bekler:
+yavaş bir LLM çağrısı worker'ı bloklamaz, yüzlerce istek aynı anda işlenebilir.
+CPU işleri (encode, BM25, rerank) ASYNC_CPU_THREADS thread'lik havuzda çalışır.
+
+Çalıştırma:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+API Endpoints:
+    POST /api/ask - Submit a question
+    POST /api/ask/stream - Submit a question, answer streamed as Server-Sent Events
+    POST /api/reset - Reset conversation history
+    GET /api/memory - Conversation memory statistics
+    GET /health - Health check endpoint
+    GET /stats - Database statistics
+"""
+
+import json
+import asyncio
+import warnings
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+warnings.filterwarnings('ignore')
+
+from client import awarm_up_client, create_async_openrouter_client
+from vectorstore_factory import get_vectorstore, vectorstore_exists
+from reranker import RerankerService
+from async_pipeline import AsyncRAGPipeline
+from api_requests import parse_ask_request, stats_response
+from lexical_index import get_lexical_index
+from answer_cache import get_answer_cache
+from resources import mongodb_health, close_async_mongo_client, shutdown
+from config import HYBRID_SEARCH, HTTP_WARMUP
+
+rag_pipeline = None
+_init_lock = asyncio.Lock()
+
+
+def build_rag_pipeline():
+    """Load models and indexes (blocking; run in a thread)"""
+    print("🚀 Initializing Legislation RAG System (async)...\n")
+
+    if not vectorstore_exists():
+        print("❌ Vector store'da döküman bulunamadı!")
+        raise Exception("Vector store'da döküman yok. Lütfen preprocessing.py (local için: local_vector_store.py) scriptini çalıştırın.")
+
+    client = create_async_openrouter_client()
+
+    vectorstore = get_vectorstore()
+    stats = vectorstore.get_collection_stats()
+    print(f"✅ Vector store hazır: {stats['total_documents']} döküman yüklü\n")
+
+    reranker = RerankerService(corpus_version=vectorstore.corpus_version)
+    lexical_index = get_lexical_index(vectorstore) if HYBRID_SEARCH else None
+
+    pipeline = AsyncRAGPipeline(
+        client, vectorstore, reranker, lexical_index=lexical_index, answer_cache=get_answer_cache()
+    )
+    print("\n✅ Legislation RAG system ready!\n")
+    return pipeline
+
+
+async def initialize_rag_system():
+    """Initialize the RAG system once, without blocking the event loop"""
+    global rag_pipeline
+    async with _init_lock:
+        if rag_pipeline is None:
+            rag_pipeline = await run_in_threadpool(build_rag_pipeline)
+    return rag_pipeline
+
+
+def error_response(error, status_code):
+    return JSONResponse({'error': str(error), 'status': 'error'}, status_code=status_code)
+
+
+async def read_ask_request(request):
+    """Parsed and validated /api/ask body: (arguments, None) or (None, 400 response)"""
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    arguments, error = parse_ask_request(data)
+    if error is not None:
+        return None, error_response(error, 400)
+    return arguments, None
+
+
+async def health_check(request):
+    """Health check endpoint"""
+    health = await run_in_threadpool(mongodb_health)
+    if health.get('status') != 'healthy':
+        return JSONResponse({'status': 'unhealthy', 'error': health.get('error')}, status_code=500)
+    return JSONResponse({
+        'status': 'healthy',
+        'message': 'Legislation RAG System (MongoDB, async)',
+        'mongodb': health
+    })
+
+
+async def get_stats(request):
+    """Get database statistics"""
+    try:
+        pipeline = await initialize_rag_system()
+        stats = await run_in_threadpool(pipeline.vectorstore.get_collection_stats)
+        return JSONResponse(stats_response(pipeline, stats))
+    except Exception as e:
+        return JSONResponse({'error': str(e), 'status': 'error', 'total_documents': 0}, status_code=500)
+
+
+async def ask_question(request):
+    """Answer a question (same body and response as app.py /api/ask)"""
+    arguments, error = await read_ask_request(request)
+    if error is not None:
+        return error
+    question, scope, filters, expansion, standalone = arguments
+
+    try:
+        pipeline = await initialize_rag_system()
+        answer = await pipeline.agenerate_response(
+            question, scope=scope, filters=filters, expansion_mode=expansion, standalone=standalone
+        )
+        return JSONResponse({'answer': answer, 'status': 'success'})
+    except Exception as e:
+        return error_response(e, 500)
+
+
+def format_sse(event, data):
+    """Format one Server-Sent Event (JSON payload, so newlines in tokens are safe)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def ask_question_stream(request):
+    """Answer a question as Server-Sent Events (same events as app.py /api/ask/stream)"""
+    arguments, error = await read_ask_request(request)
+    if error is not None:
+        return error
+    question, scope, filters, expansion, standalone = arguments
+
+    try:
+        pipeline = await initialize_rag_system()
+    except Exception as e:
+        return error_response(e, 500)
+
+    async def generate():
+        events = pipeline.agenerate_response_stream(
+            question, scope=scope, filters=filters, expansion_mode=expansion, standalone=standalone
+        )
+        try:
+            async for event, payload in events:
+                if event == 'sources':
+                    yield format_sse('sources', {'sources': payload})
+                elif event == 'token':
+                    yield format_sse('token', {'token': payload})
+                else:
+                    yield format_sse('done', {'answer': payload, 'status': 'success'})
+        except Exception as e:
+            yield format_sse('error', {'error': str(e), 'status': 'error'})
+        finally:
+            # İstemci koptuysa LLM akışını da kapat
+            await events.aclose()
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+async def reset_conversation(request):
+    """Reset conversation history"""
+    if rag_pipeline is None:
+        return error_response('RAG system not initialized', 400)
+    rag_pipeline.reset_conversation()
+    return JSONResponse({'message': 'Conversation history cleared', 'status': 'success'})
+
+
+async def get_memory_stats(request):
+    """Get conversation memory statistics"""
+    if rag_pipeline is None:
+        return error_response('RAG system not initialized', 400)
+    stats = rag_pipeline.get_conversation_stats()
+    stats['status'] = 'success'
+    return JSONResponse(stats)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Load the system at startup; close async clients and shared resources at shutdown"""
+    try:
+        pipeline = await initialize_rag_system()
+        if HTTP_WARMUP:
+            # Bağlantılar onları açan loop'a aittir: ısıtma sunucunun loop'unda yapılır
+            await awarm_up_client(pipeline.client)
+    except Exception as e:
+        # /health yine yanıt versin; ilk istekte tekrar denenir
+        print(f"❌ RAG system could not be initialized: {e}")
+    yield
+    if rag_pipeline is not None:
+        await rag_pipeline.client.close()
+    await close_async_mongo_client()
+    shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check, methods=['GET']),
+        Route('/stats', get_stats, methods=['GET']),
+        Route('/api/ask', ask_question, methods=['POST']),
+        Route('/api/ask/stream', ask_question_stream, methods=['POST']),
+        Route('/api/reset', reset_conversation, methods=['POST']),
+        Route('/api/memory', get_memory_stats, methods=['GET']),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['GET', 'POST', 'OPTIONS'],
+                   allow_headers=['Content-Type'])
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import os
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
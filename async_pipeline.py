@@ -0,0 +1,320 @@
+"""
+Asynchronous RAG pipeline (served by asgi.py)
+RAGPipeline ile aynı adımlar, fakat event loop üzerinde: LLM çağrıları
+AsyncOpenAI ile, $vectorSearch AsyncMongoClient ile beklenir; encode, BM25
+ve rerank gibi CPU işleri bir thread havuzunda çalışır. Tek süreç, yavaş bir
+OpenRouter çağrısını beklerken diğer istekleri karşılamaya devam eder.
+
+Prompt, bağlam paketleme, kaynak formatı, cevap cache'i ve konuşma hafızası
+RAGPipeline'dan aynen kullanılır.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    MODEL_NAME,
+    TEMPERATURE,
+    MAX_TOKENS,
+    INITIAL_RETRIEVAL_K,
+    LEXICAL_RETRIEVAL_K,
+    MULTI_QUERY_K,
+    ASYNC_CPU_THREADS
+)
+from query_expansion import (
+    aexpand_query,
+    agenerate_subqueries,
+    get_cached_expansion,
+    get_cached_subqueries,
+    resolve_expansion_mode
+)
+from rag_pipeline import RAGPipeline, pack_context, resolve_search_filter
+from rank_fusion import reciprocal_rank_fusion
+from conversation_memory import asummarize_turns
+from llm_calls import acomplete
+from cache_utils import normalize_text
+from resources import get_model, register_shutdown
+
+
+def cpu_executor():
+    """Süreç genelinde paylaşılan CPU thread havuzu (encode, BM25, rerank)"""
+    def create():
+        executor = ThreadPoolExecutor(max_workers=ASYNC_CPU_THREADS, thread_name_prefix="async-cpu")
+        register_shutdown(lambda: executor.shutdown(wait=False))
+        return executor
+    return get_model("async_cpu_executor", create)
+
+
+class AsyncRAGPipeline(RAGPipeline):
+    """RAGPipeline for an event loop; client is an AsyncOpenAI instance"""
+
+    def __init__(self, client, vectorstore, reranker, executor=None, **kwargs):
+        """
+        Initialize the async pipeline.
+
+        Args:
+            client: AsyncOpenAI client instance
+            vectorstore: Vector store; MongoDB is searched with AsyncMongoClient,
+                local backends run in the executor
+            reranker: RerankerService instance (runs in the executor)
+            executor: Thread pool for CPU-bound steps (default: cpu_executor())
+            **kwargs: Other RAGPipeline options (lexical_index, answer_cache, ...)
+        """
+        super().__init__(client, vectorstore, reranker, **kwargs)
+        self.executor = executor or cpu_executor()
+        self._background = set()
+        self._summary_lock = asyncio.Lock()
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking call in the CPU thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def _in_background(self, coroutine):
+        """Start a task that may outlive the request (late expansions still fill the cache)"""
+        task = asyncio.ensure_future(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _until_deadline(self, task, deadline):
+        """
+        Result of a background task if it finishes before the deadline.
+
+        Returns:
+            object: Task result, or None after the deadline (the task keeps running)
+        """
+        timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _deadline(self):
+        return asyncio.get_running_loop().time() + self.expansion_deadline_ms / 1000
+
+    def _summarize_in_background(self):
+        """Rolling summary as a task on the loop (AsyncOpenAI); tasks run one at a time, in order"""
+        self._in_background(self._aupdate_summary(self._memory_generation))
+
+    async def _aupdate_summary(self, generation):
+        """Async _update_summary"""
+        async with self._summary_lock:
+            with self._memory_lock:
+                turns = list(self._pending_turns)
+                summary = self.summary
+            if turns:
+                self._apply_summary(generation, turns, await asummarize_turns(self.client, summary, turns))
+
+    async def _search(self, query, k, filter_dict=None):
+        """Vector search without blocking the loop"""
+        if hasattr(self.vectorstore, "asimilarity_search"):
+            return await self.vectorstore.asimilarity_search(
+                query, k=k, filter_dict=filter_dict, executor=self.executor
+            )
+        return await self._run(self.vectorstore.similarity_search, query, k=k, filter_dict=filter_dict)
+
+    async def _search_batch(self, queries, k, filter_dict=None):
+        """Batch vector search without blocking the loop"""
+        if hasattr(self.vectorstore, "asimilarity_search_batch"):
+            return await self.vectorstore.asimilarity_search_batch(
+                queries, k=k, filter_dict=filter_dict, executor=self.executor
+            )
+        return await self._run(self.vectorstore.similarity_search_batch, queries, k=k, filter_dict=filter_dict)
+
+    async def _aretrieve(self, search_query, filter_dict=None):
+        """Async _retrieve: vector and BM25 searches run concurrently, then RRF"""
+        if self.lexical_index is None:
+            return await self._search(search_query, INITIAL_RETRIEVAL_K, filter_dict)
+
+        vector_docs, lexical_docs = await asyncio.gather(
+            self._search(search_query, INITIAL_RETRIEVAL_K, filter_dict),
+            self._run(self.lexical_index.search, search_query, k=LEXICAL_RETRIEVAL_K, filter_dict=filter_dict)
+        )
+        return reciprocal_rank_fusion([vector_docs, lexical_docs], limit=INITIAL_RETRIEVAL_K)
+
+    async def _aretrieve_lists(self, queries, filter_dict=None, k=MULTI_QUERY_K):
+        """Async _retrieve_lists"""
+        if self.lexical_index is None:
+            return await self._search_batch(queries, k, filter_dict)
+
+        def lexical_lists():
+            return [self.lexical_index.search(query, k=k, filter_dict=filter_dict) for query in queries]
+
+        vector_lists, lexical = await asyncio.gather(
+            self._search_batch(queries, k, filter_dict),
+            self._run(lexical_lists)
+        )
+        return vector_lists + lexical
+
+    async def _amulti_query_retrieve(self, user_input, filter_dict=None):
+        """Async _multi_query_retrieve"""
+        sub_queries = get_cached_subqueries(user_input, cache=self.expansion_cache)
+        if sub_queries is None and not self.speculative:
+            sub_queries = await agenerate_subqueries(
+                self.client, user_input, check_cache=False, cache=self.expansion_cache
+            )
+
+        if sub_queries is not None:
+            result_lists = await self._aretrieve_lists(sub_queries, filter_dict)
+        else:
+            deadline = self._deadline()
+            generation = self._in_background(
+                agenerate_subqueries(self.client, user_input, check_cache=False, cache=self.expansion_cache)
+            )
+            result_lists = await self._aretrieve_lists([user_input], filter_dict)
+            sub_queries = await self._until_deadline(generation, deadline)
+            if sub_queries is None:
+                print(f"⏱️ Sub-queries exceeded {self.expansion_deadline_ms} ms, using the original question only")
+            elif sub_queries[1:]:
+                result_lists += await self._aretrieve_lists(sub_queries[1:], filter_dict)
+
+        return reciprocal_rank_fusion(result_lists, limit=INITIAL_RETRIEVAL_K)
+
+    async def _aexpand_and_retrieve(self, user_input, filter_dict=None, expansion_mode=None):
+        """
+        Async _expand_and_retrieve: in speculative mode the raw-question search
+        and the LLM expansion are awaited concurrently on the loop.
+
+        Returns:
+            tuple: (query used for reranking, candidate documents)
+        """
+        mode = resolve_expansion_mode(expansion_mode)
+        if mode == "multi":
+            return user_input, await self._amulti_query_retrieve(user_input, filter_dict)
+
+        if mode != "llm":
+            search_query = await aexpand_query(self.client, user_input, mode, cache=self.expansion_cache)
+            return search_query, await self._aretrieve(search_query, filter_dict)
+
+        cached = get_cached_expansion(user_input, self.expansion_cache)
+        if cached is not None:
+            return cached, await self._aretrieve(cached, filter_dict)
+
+        if not self.speculative:
+            search_query = await aexpand_query(
+                self.client, user_input, mode, check_cache=False, cache=self.expansion_cache
+            )
+            return search_query, await self._aretrieve(search_query, filter_dict)
+
+        deadline = self._deadline()
+        expansion = self._in_background(
+            aexpand_query(self.client, user_input, mode, check_cache=False, cache=self.expansion_cache)
+        )
+        raw_docs = await self._aretrieve(user_input, filter_dict)
+
+        search_query = await self._until_deadline(expansion, deadline)
+        if search_query is None:
+            print(f"⏱️ Expansion exceeded {self.expansion_deadline_ms} ms, using raw-question candidates")
+            return user_input, raw_docs
+
+        if normalize_text(search_query) == normalize_text(user_input):
+            return user_input, raw_docs
+
+        expanded_docs = await self._aretrieve(search_query, filter_dict)
+        merged = reciprocal_rank_fusion([expanded_docs, raw_docs], limit=INITIAL_RETRIEVAL_K)
+        return search_query, merged
+
+    async def _aprepare_generation(self, user_input, filter_dict=None, expansion_mode=None, standalone=False):
+        """
+        Async _prepare_generation (steps 1-5).
+
+        Returns:
+            tuple: (messages, relevant_docs)
+        """
+        search_query, initial_docs = await self._aexpand_and_retrieve(user_input, filter_dict, expansion_mode)
+        reranked_docs = await self._run(
+            self.reranker.rerank_documents, search_query, initial_docs, top_k=len(initial_docs)
+        )
+        relevant_docs = pack_context(reranked_docs)
+        return self._build_messages(user_input, relevant_docs, standalone), relevant_docs
+
+    async def agenerate_response(self, user_input, scope=None, filters=None, expansion_mode=None, standalone=False):
+        """
+        Async counterpart of RAGPipeline.generate_response.
+
+        Args:
+            user_input (str): User's question
+            scope (str): Restrict retrieval to a named scope, e.g. "teblig" (optional)
+            filters (dict): Restrict retrieval by metadata (optional)
+            expansion_mode (str): "llm", "thesaurus", "multi" or "none" for this request (optional)
+            standalone (bool): Answer without conversation memory and leave it unchanged (optional)
+
+        Returns:
+            str: Answer with source citations
+        """
+        filter_dict = resolve_search_filter(scope, filters)
+
+        cached, vector = await self._run(self._lookup_answer, user_input, filter_dict, standalone)
+        if cached is not None:
+            if not standalone:
+                self._remember(user_input, cached["response"])
+            return cached["answer"]
+
+        messages, relevant_docs = await self._aprepare_generation(user_input, filter_dict, expansion_mode, standalone)
+
+        response = await acomplete(self.client, {
+            "model": MODEL_NAME,
+            "messages": messages,
+            "temperature": TEMPERATURE,
+            "max_tokens": MAX_TOKENS
+        })
+        response_text = response.choices[0].message.content
+        sources = self._format_sources(relevant_docs)
+        full_response = response_text + sources
+
+        if not standalone:
+            self._remember(user_input, response_text)
+        await self._run(self._store_answer, user_input, vector, full_response, response_text, relevant_docs, filter_dict)
+
+        return full_response
+
+    async def agenerate_response_stream(self, user_input, scope=None, filters=None, expansion_mode=None, standalone=False):
+        """
+        Async counterpart of RAGPipeline.generate_response_stream.
+
+        Yields:
+            tuple: ("sources", str), ("token", str)..., ("done", str)
+        """
+        filter_dict = resolve_search_filter(scope, filters)
+
+        cached, vector = await self._run(self._lookup_answer, user_input, filter_dict, standalone)
+        if cached is not None:
+            yield "sources", cached["answer"][len(cached["response"]):]
+            yield "token", cached["response"]
+            if not standalone:
+                self._remember(user_input, cached["response"])
+            yield "done", cached["answer"]
+            return
+
+        messages, relevant_docs = await self._aprepare_generation(user_input, filter_dict, expansion_mode, standalone)
+
+        sources = self._format_sources(relevant_docs)
+        yield "sources", sources
+
+        stream = await acomplete(self.client, {
+            "model": MODEL_NAME,
+            "messages": messages,
+            "temperature": TEMPERATURE,
+            "max_tokens": MAX_TOKENS,
+            "stream": True
+        }, kind="answer_stream")
+
+        parts = []
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield "token", delta
+        finally:
+            await stream.close()
+
+        response_text = "".join(parts)
+        if not standalone:
+            self._remember(user_input, response_text)
+        await self._run(self._store_answer, user_input, vector, response_text + sources, response_text, relevant_docs, filter_dict)
+
+        yield "done", response_text + sources
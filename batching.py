@@ -0,0 +1,142 @@
+"""
+Cross-request micro-batching
+Eşzamanlı isteklerin tekil model çağrılarını birkaç milisaniye boyunca toplar
+ve tek bir batch forward pass olarak çalıştırır; sonuçlar bekleyen her isteğe
+kendi Future'ı üzerinden geri verilir.
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Collects items from concurrent callers and processes them in batches"""
+
+    def __init__(self, process_batch, max_batch_size, max_wait_ms, name="batcher"):
+        """
+        Start the batching worker thread.
+
+        Args:
+            process_batch (callable): Item listesini alıp aynı sırada sonuç listesi döndüren fonksiyon
+            max_batch_size (int): Bir batch'teki en fazla item sayısı
+            max_wait_ms (float): İlk item geldikten sonra batch'i doldurmak için en fazla bekleme
+            name (str): Worker thread adı (metrikler için)
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_queue_depth = 0
+        self._largest_batch = 0
+        self._total_wait = 0.0
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """
+        Item'ı kuyruğa ekle.
+
+        Returns:
+            Future: Item'ın sonucu
+        """
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items):
+        """
+        Birden fazla item'ı kuyruğa ekle (aynı istekten gelenler aynı batch'e düşer).
+
+        Returns:
+            list: Her item için Future
+        """
+        if self._closed:
+            raise RuntimeError(f"{self.name} kapatıldı")
+
+        now = time.perf_counter()
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future, now))
+            futures.append(future)
+
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+        return futures
+
+    def map(self, items):
+        """Item'ları işle ve sonuçları aynı sırada döndür (bloklar)"""
+        return [future.result() for future in self.submit_many(items)]
+
+    def _collect(self):
+        """İlk item'ı bekle, sonra max_wait dolana veya batch dolana kadar topla"""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)  # Kapanış sinyalini bu batch'ten sonra işle
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        """Worker döngüsü"""
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            items = [item for item, _, _ in batch]
+            try:
+                results = self.process_batch(items)
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
+                self._total_wait += sum(started - enqueued for _, _, enqueued in batch)
+
+    def close(self):
+        """Worker'ı durdur; kuyruktaki item'lar önce işlenir"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join(timeout=5)
+
+    def stats(self):
+        """Get batching and queue depth metrics"""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": (self._items / self._batches) if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "avg_queue_wait_ms": (self._total_wait / self._items * 1000) if self._items else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000
+            }
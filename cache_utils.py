@@ -0,0 +1,122 @@
+"""
+In-memory caching utilities
+"""
+
+import re
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """
+    Normalizes text for use as a cache key.
+    Unicode form and whitespace are normalized; case is preserved because
+    the embedding model is case-sensitive.
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        str: Normalized text
+    """
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def text_hash(text):
+    """Short stable hash of the normalized text (compact cache key component)"""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with optional TTL"""
+
+    def __init__(self, max_size, ttl=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of entries (0 disables caching)
+            ttl (float): Entry lifetime in seconds (None or 0 = no expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value and marks it as most recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes all entries (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
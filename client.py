@@ -1,31 +1,241 @@
 """
 OpenRouter API client setup
+Süreç başına bir bağlantı havuzu: keep-alive, HTTP/2 (h2 kuruluysa), ayrı
+connect/okuma timeout'ları ve açılışta önceden kurulan bağlantı; ilk soru
+TCP + TLS el sıkışmasını beklemez. Her HTTP isteği için bağlantının yeniden
+kullanılıp kullanılmadığı ve ilk byte'a kadar geçen süre (TTFB) kaydedilir
+(/stats: http).
 """
 
-from openai import OpenAI
+import time
+import threading
+from collections import deque
+from openai import APIStatusError, AsyncOpenAI, OpenAI
 import httpx
-from config import OPENROUTER_API_KEY, HTTP_TIMEOUT
+from config import (
+    OPENROUTER_API_KEY,
+    HTTP_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_POOL_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP2
+)
+from llm_calls import LatencyHistogram
+from resources import get_model
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# /stats'ta gösterilen son çağrı sayısı
+RECENT_CALLS = 20
+
+# İsteğin kendi ölçümü (httpcore "trace" extension'ı yanında)
+_TRACE_KEY = "openrouter_trace"
+
+
+class HttpCallStats:
+    """Connection reuse and time-to-first-byte of OpenRouter HTTP calls (thread-safe)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.ttfb = LatencyHistogram()
+        self.recent = deque(maxlen=RECENT_CALLS)
+    
+    def record(self, call):
+        with self._lock:
+            self.requests += 1
+            self.new_connections += call["new_connection"]
+            self.tls_handshakes += call["tls_handshake"]
+            self.ttfb.record(call["ttfb_ms"] / 1000)
+            self.recent.append(call)
+    
+    def stats(self):
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_percent": round(reused / self.requests * 100, 1) if self.requests else None,
+                "tls_handshakes": self.tls_handshakes,
+                "ttfb": self.ttfb.stats(),
+                "recent": list(self.recent)
+            }
+
+
+def get_http_stats():
+    """Süreç genelinde paylaşılan HTTP çağrı ölçümleri"""
+    return get_model("http_stats", HttpCallStats)
+
+
+def http_call_stats():
+    """Connection reuse and TTFB percentiles (for /stats)"""
+    return get_http_stats().stats()
+
+
+class _CallTrace:
+    """One HTTP request: did it open a new connection, and when did the first byte arrive?"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.new_connection = False
+        self.tls_handshake = False
+    
+    def event(self, name, info):
+        # httpcore trace olayları; havuzdan gelen bağlantıda connect/TLS olayı olmaz
+        if name == "connection.connect_tcp.complete":
+            self.new_connection = True
+        elif name == "connection.start_tls.complete":
+            self.tls_handshake = True
+    
+    async def aevent(self, name, info):
+        self.event(name, info)
+    
+    def finish(self, response):
+        # Response hook'u header'lar gelince çalışır (stream'de gövde okunmadan önce)
+        get_http_stats().record({
+            "method": response.request.method,
+            "path": response.request.url.path,
+            "status": response.status_code,
+            "http_version": response.http_version,
+            "new_connection": self.new_connection,
+            "tls_handshake": self.tls_handshake,
+            "ttfb_ms": round((time.perf_counter() - self.started) * 1000, 1)
+        })
+
+
+def _trace_request(request):
+    trace = _CallTrace()
+    request.extensions["trace"] = trace.event
+    request.extensions[_TRACE_KEY] = trace
+
+
+def _trace_response(response):
+    trace = response.request.extensions.get(_TRACE_KEY)
+    if trace is not None:
+        trace.finish(response)
+
+
+async def _atrace_request(request):
+    trace = _CallTrace()
+    request.extensions["trace"] = trace.aevent
+    request.extensions[_TRACE_KEY] = trace
+
+
+async def _atrace_response(response):
+    _trace_response(response)
+
+
+def _http2_enabled():
+    """HTTP2=true and the h2 package is installed"""
+    if not HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("⚠️ HTTP2=true but the h2 package is missing (pip install 'httpx[http2]'), using HTTP/1.1")
+        return False
+    return True
+
+
+def _http_client_options():
+    """Pool, timeout and protocol settings shared by the sync and async clients"""
+    return {
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_POOL_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        "http2": _http2_enabled(),
+        "follow_redirects": True
+    }
+
+
+def create_http_client():
+    """
+    Pooled, instrumented httpx client for OpenRouter.
+    
+    Returns:
+        httpx.Client: Client recording connection reuse and TTFB per request
+    """
+    return httpx.Client(
+        event_hooks={"request": [_trace_request], "response": [_trace_response]},
+        **_http_client_options()
+    )
+
+
+def create_async_http_client():
+    """
+    Async counterpart of create_http_client.
+    
+    Returns:
+        httpx.AsyncClient: Client recording connection reuse and TTFB per request
+    """
+    return httpx.AsyncClient(
+        event_hooks={"request": [_atrace_request], "response": [_atrace_response]},
+        **_http_client_options()
+    )
+
+
+def _warmup_request():
+    # Küçük bir cevap; API key geçersiz olsa bile bağlantı havuza girer
+    return {"cast_to": httpx.Response, "options": {"max_retries": 0}}
+
+
+def warm_up_client(client):
+    """
+    Open the pooled connection (TCP + TLS, HTTP/2 negotiation) before the first question.
+    Failures are only reported: the first request then connects as usual.
+    
+    Args:
+        client: OpenAI client instance
+    """
+    started = time.perf_counter()
+    try:
+        client.get("/key", **_warmup_request())
+    except APIStatusError:
+        pass
+    except Exception as e:
+        print(f"⚠️ OpenRouter warmup failed: {e}")
+        return
+    print(f"🔥 OpenRouter connection ready ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+
+async def awarm_up_client(client):
+    """Async counterpart of warm_up_client (run it on the server's event loop)"""
+    started = time.perf_counter()
+    try:
+        await client.get("/key", **_warmup_request())
+    except APIStatusError:
+        pass
+    except Exception as e:
+        print(f"⚠️ OpenRouter warmup failed: {e}")
+        return
+    print(f"🔥 OpenRouter connection ready ({(time.perf_counter() - started) * 1000:.0f} ms)")
 
 
 def create_openrouter_client():
     """
     Creates and returns an OpenAI-compatible client for OpenRouter.
+    Startup code (not a request) opens its connection with warm_up_client().
     
     Returns:
         OpenAI: Configured OpenAI client
     """
     print("🔧 Setting up OpenRouter client...")
     
-    # Create httpx client with timeout
-    http_client = httpx.Client(
-        timeout=HTTP_TIMEOUT,
-        follow_redirects=True,
-    )
+    # Pooled keep-alive connections, split timeouts, HTTP/2 when available
+    http_client = create_http_client()
     
     # Create OpenAI-compatible client for OpenRouter
     try:
         client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
+            base_url=OPENROUTER_BASE_URL,
             api_key=OPENROUTER_API_KEY,
             http_client=http_client,
         )
@@ -34,3 +244,30 @@ def create_openrouter_client():
     except Exception as e:
         print(f"❌ Error creating client: {e}")
         raise
+
+
+def create_async_openrouter_client():
+    """
+    Creates and returns an AsyncOpenAI client for OpenRouter (asgi.py).
+    Requests are awaited on the event loop, so a slow OpenRouter call
+    does not hold a worker thread. Warm it up with awarm_up_client() on
+    the server's loop (connections belong to the loop that opened them).
+    
+    Returns:
+        AsyncOpenAI: Configured async OpenAI client
+    """
+    print("🔧 Setting up async OpenRouter client...")
+    
+    http_client = create_async_http_client()
+    
+    try:
+        client = AsyncOpenAI(
+            base_url=OPENROUTER_BASE_URL,
+            api_key=OPENROUTER_API_KEY,
+            http_client=http_client,
+        )
+        print("✅ Async OpenRouter client created successfully!")
+        return client
+    except Exception as e:
+        print(f"❌ Error creating async client: {e}")
+        raise
@@ -16,6 +16,9 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "mevzuat_db")
 MONGO_COLLECTION_NAME = os.getenv("MONGO_COLLECTION_NAME", "documents")
 MONGO_VECTOR_INDEX_NAME = os.getenv("MONGO_VECTOR_INDEX_NAME", "vector_index")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))  # Süreç başına paylaşılan bağlantı havuzu
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))  # Health check'ler hızlı hata versin
+MONGO_META_COLLECTION_NAME = os.getenv("MONGO_META_COLLECTION_NAME", "corpus_meta")  # Corpus sürümü (ingestion'da güncellenir)
 
 # Model Configuration
 MODEL_NAME = "ai21/jamba-mini-1.7"
@@ -25,30 +28,138 @@ RERANKER_MODEL = os.getenv("RERANKER_MODEL", "ms-marco-MiniLM-L-12-v2")
 # Model Cache Directories (Railway Volume support)
 MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "./models")
 FLASHRANK_CACHE_DIR = os.getenv("FLASHRANK_CACHE_DIR", "./flashrank_cache")
+PASSAGE_TOKENS_DIR = os.getenv("PASSAGE_TOKENS_DIR", "./passage_tokens")  # Reranker için önceden tokenize edilmiş chunk'lar
 
 # Document Configuration
 DATA_DIR = "./data"  # Ana data klasörü
 KANUN_DIR = "./data/KANUN VE YÖNETMELİKLER"  # Kanunlar ve yönetmelikler
 TEBLIG_DIR = "./data/TEBLİĞ"  # Tebliğler
 
+# Kapsamlı arama: /api/ask "scope" değeri → metadata filtresi
+SEARCH_SCOPES = {
+    "kanun": {"source_dir": os.path.basename(KANUN_DIR)},
+    "teblig": {"source_dir": os.path.basename(TEBLIG_DIR)},
+}
+
 # RAG Parameters
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 INITIAL_RETRIEVAL_K = 50
 TOP_RERANKED_K = 15
 
+# Context Packing (chunk'lar rerank skoruna göre token bütçesine kadar eklenir)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3500"))  # Prompt'taki chunk'lar için token bütçesi
+RERANK_SCORE_THRESHOLD = float(os.getenv("RERANK_SCORE_THRESHOLD", "0.01"))  # Bu skorun altındaki chunk'lar atılır
+CONTEXT_MIN_CHUNKS = int(os.getenv("CONTEXT_MIN_CHUNKS", "3"))  # Eşikten bağımsız en az chunk sayısı
+CHARS_PER_TOKEN = float(os.getenv("CHARS_PER_TOKEN", "3.0"))  # Token tahmini (Türkçe metin için ~3 karakter/token)
+
+# Hybrid Search (BM25 + Vector, Reciprocal Rank Fusion)
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "false").lower() == "true"
+LEXICAL_RETRIEVAL_K = int(os.getenv("LEXICAL_RETRIEVAL_K", "50"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60  # Reciprocal Rank Fusion sabiti
+
 # LLM Parameters
 TEMPERATURE = 0.2
 MAX_TOKENS = 1500
 EXPANSION_TEMPERATURE = 0.3
 EXPANSION_MAX_TOKENS = 100
 
+# LLM Call Deadlines, Hedging and Fallback (bkz. llm_calls.py)
+LLM_DEADLINE_MS = int(os.getenv("LLM_DEADLINE_MS", "45000"))  # Cevap üretimi için toplam süre sınırı
+LLM_EXPANSION_DEADLINE_MS = int(os.getenv("LLM_EXPANSION_DEADLINE_MS", "8000"))  # Genişletme / alt sorgu çağrıları
+LLM_HEDGING = os.getenv("LLM_HEDGING", "true").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))  # Bu gecikme yüzdeliği aşılınca ikinci istek gönderilir
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # Bu kadar ölçüm olmadan hedge yapılmaz
+LLM_HEDGE_MIN_MS = int(os.getenv("LLM_HEDGE_MIN_MS", "500"))  # Hedge eşiğinin alt sınırı
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "")  # Birincil model hata verirse (boş = yedek yok)
+
+# Query Expansion Mode: "llm" (OpenRouter), "thesaurus" (yerel, LLM çağrısı yok),
+# "multi" (LLM alt sorguları, paralel arama + RRF) veya "none"
+QUERY_EXPANSION_MODE = os.getenv("QUERY_EXPANSION_MODE", "llm").lower()
+MULTI_QUERY_COUNT = int(os.getenv("MULTI_QUERY_COUNT", "3"))  # Orijinal soruya ek alt sorgu sayısı
+MULTI_QUERY_K = int(os.getenv("MULTI_QUERY_K", "20"))  # Alt sorgu başına aday; birleşim INITIAL_RETRIEVAL_K ile sınırlı
+THESAURUS_PATH = os.getenv("THESAURUS_PATH", "./thesaurus.json")  # python thesaurus.py ile data/ klasöründen oluşturulur
+THESAURUS_MAX_TERMS = int(os.getenv("THESAURUS_MAX_TERMS", "12"))  # Sorguya eklenecek en fazla ifade
+
+# Speculative Retrieval (ham soru ile arama, genişletme ile paralel başlar)
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "true").lower() == "true"
+EXPANSION_DEADLINE_MS = int(os.getenv("EXPANSION_DEADLINE_MS", "2000"))  # Bu süreden sonra genişletme beklenmez
+
+# Query Expansion Cache (SQLite; aynı sunucudaki tüm worker'lar paylaşır)
+EXPANSION_CACHE = os.getenv("EXPANSION_CACHE", "true").lower() == "true"
+EXPANSION_CACHE_PATH = os.getenv("EXPANSION_CACHE_PATH", "./expansion_cache/expansions.sqlite3")
+EXPANSION_CACHE_TTL = int(os.getenv("EXPANSION_CACHE_TTL", "604800"))  # Saniye (7 gün, 0 = süresiz)
+EXPANSION_CACHE_MAX_ENTRIES = int(os.getenv("EXPANSION_CACHE_MAX_ENTRIES", "100000"))
+
+# Semantic Answer Cache (geçmişsiz sorular; yakın soru → kayıtlı cevap, LLM çağrısı yok)
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "true").lower() == "true"
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "10000"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))  # Saniye (1 gün, 0 = süresiz)
+ANSWER_CACHE_MAX_DISTANCE = float(os.getenv("ANSWER_CACHE_MAX_DISTANCE", "0.06"))  # Cosine mesafesi (1 - benzerlik)
+ANSWER_CACHE_MIN_TERM_OVERLAP = float(os.getenv("ANSWER_CACHE_MIN_TERM_OVERLAP", "0.5"))  # Arama terimleri Jaccard örtüşmesi
+
 # Conversation Memory Configuration
 MAX_CONVERSATION_HISTORY = int(os.getenv("MAX_CONVERSATION_HISTORY", "10"))  # Son 10 mesaj (5 soru + 5 cevap)
 MEMORY_STRATEGY = os.getenv("MEMORY_STRATEGY", "sliding_window")  # sliding_window veya summarize
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "1500"))  # summarize: özet dışında tutulan geçmişin token sınırı
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "300"))  # summarize: taşan mesajların katlandığı özetin en fazla uzunluğu
 
 # Vector Store Configuration
 MONGO_COLLECTION_NAME = os.getenv("MONGO_COLLECTION_NAME", "documents")
+VECTOR_FILTER_FIELDS = ("source_file", "source_dir", "page")  # create_vector_index.py'deki filter alanları
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "mongodb")  # mongodb, local veya hnsw
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "./vector_index")  # Yerel vektör index klasörü
+
+# Embedding Storage (Quantization)
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "float64")  # MongoDB: float64 (liste) veya int8 (BinData + ölçek)
+LOCAL_INDEX_DTYPE = os.getenv("LOCAL_INDEX_DTYPE", "float32")  # Yerel index: float32, float16 veya int8
+RESCORE_FACTOR = int(os.getenv("RESCORE_FACTOR", "4"))  # Sıkıştırılmış aramada k * RESCORE_FACTOR aday tam hassasiyetle yeniden skorlanır
+
+# Query Embedding Cache
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))  # 0 = cache kapalı
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))  # saniye, 0 = süresiz
+
+# Reranker Cascade (küçük model adayları eler, büyük model sadece kısa listeyi sıralar)
+RERANK_CASCADE = os.getenv("RERANK_CASCADE", "false").lower() == "true"
+RERANK_PREFILTER_MODEL = os.getenv("RERANK_PREFILTER_MODEL", "ms-marco-TinyBERT-L-2-v2")  # FlashRank nano model (~4 MB)
+RERANK_SHORTLIST_K = int(os.getenv("RERANK_SHORTLIST_K", "20"))  # Büyük modele giden aday sayısı
+
+# Multi-core Reranking (ONNX Runtime)
+RERANK_WORKERS = int(os.getenv("RERANK_WORKERS", "1"))  # Pasajların bölündüğü ONNX session sayısı (1 = bölme yok)
+RERANK_INTRA_OP_THREADS = int(os.getenv("RERANK_INTRA_OP_THREADS", "0"))  # Session başına op içi thread (0 = ORT varsayılanı)
+RERANK_INTER_OP_THREADS = int(os.getenv("RERANK_INTER_OP_THREADS", "0"))  # Session başına paralel op thread (0 = ORT varsayılanı)
+
+# Reranker Score Cache (anahtar: sorgu hash'i + chunk id)
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "50000"))  # (sorgu, chunk) skoru, 0 = cache kapalı
+RERANK_CACHE_TTL = float(os.getenv("RERANK_CACHE_TTL", "3600"))  # saniye, 0 = süresiz
+CORPUS_VERSION_CHECK_INTERVAL = float(os.getenv("CORPUS_VERSION_CHECK_INTERVAL", "30"))  # Re-ingestion kontrol aralığı (saniye)
+
+# Batch Retrieval
+BATCH_SEARCH_MAX_WORKERS = int(os.getenv("BATCH_SEARCH_MAX_WORKERS", "8"))  # Eşzamanlı $vectorSearch sayısı
+
+# Async Server (asgi.py)
+ASYNC_CPU_THREADS = int(os.getenv("ASYNC_CPU_THREADS", "4"))  # Encode, BM25 ve rerank için thread havuzu; LLM/MongoDB çağrıları loop'ta beklenir
+
+# Micro-batching (eşzamanlı isteklerin encode/rerank çağrıları tek forward pass'te)
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "false").lower() == "true"  # Çok thread'li sunucularda açın
+ENCODE_MAX_BATCH_SIZE = int(os.getenv("ENCODE_MAX_BATCH_SIZE", "32"))  # Batch başına sorgu metni
+ENCODE_MAX_WAIT_MS = float(os.getenv("ENCODE_MAX_WAIT_MS", "5"))  # İlk istekten sonra batch'i doldurma süresi
+RERANK_MAX_BATCH_SIZE = int(os.getenv("RERANK_MAX_BATCH_SIZE", "128"))  # Batch başına (sorgu, pasaj) çifti
+RERANK_MAX_WAIT_MS = float(os.getenv("RERANK_MAX_WAIT_MS", "5"))
+
+# HNSW Index Parameters (VECTOR_BACKEND=hnsw)
+HNSW_M = int(os.getenv("HNSW_M", "16"))  # Düğüm başına komşu sayısı
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "100"))  # Arama genişliği (recall/hız dengesi)
 
-# HTTP Client Configuration
-HTTP_TIMEOUT = 60.0
+# HTTP Client Configuration (OpenRouter)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60.0"))  # Okuma/yazma: bir sonraki veri parçası için bekleme
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5.0"))  # TCP + TLS bağlantısı
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5.0"))  # Havuzda boş bağlantı bekleme
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))  # Hedge'li eşzamanlı LLM çağrıları için
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60.0"))  # Boştaki bağlantının açık kalma süresi
+HTTP2 = os.getenv("HTTP2", "true").lower() == "true"  # h2 paketi gerekir (httpx[http2])
+HTTP_WARMUP = os.getenv("HTTP_WARMUP", "true").lower() == "true"  # Açılışta OpenRouter bağlantısını önceden kur
@@ -0,0 +1,81 @@
+"""
+Rolling conversation summary (MEMORY_STRATEGY=summarize)
+Token bütçesinden taşan eski soru-cevaplar önceki özetle birlikte LLM'e
+verilir ve tek, kısa bir özete katlanır. Her seferinde sadece yeni taşan
+mesajlar gönderilir (artımlı); özetin uzunluğu SUMMARY_MAX_TOKENS ile sınırlıdır.
+Özetleme arka planda çalışır, hiçbir istek onu beklemez (bkz. RAGPipeline).
+"""
+
+from text_processing import estimate_token_count
+from config import MODEL_NAME, TEMPERATURE, SUMMARY_MAX_TOKENS
+
+ROLE_LABELS = {"user": "Kullanıcı", "assistant": "Asistan"}
+
+
+def message_tokens(messages):
+    """Estimated token count of chat messages"""
+    return sum(estimate_token_count(message["content"]) for message in messages)
+
+
+def _summary_request(summary, turns):
+    """chat.completions.create arguments for folding turns into the summary"""
+    conversation = "\n".join(
+        f"{ROLE_LABELS.get(message['role'], message['role'])}: {message['content']}"
+        for message in turns
+    )
+    summary_prompt = f"""Sen bir hukuk asistanının konuşma hafızasısın. Görevin, mevcut özeti ve yeni konuşma bölümünü tek ve kısa bir özette birleştirmektir.
+
+Kurallar:
+1. Kullanıcının sorduğu konuları, geçen madde numaralarını (Madde X) ve verilen önemli cevapları koru.
+2. Tekrarları at, en fazla {SUMMARY_MAX_TOKENS // 2} kelime yaz.
+3. Sadece özeti yaz.
+
+Mevcut özet: {summary or "(yok)"}
+
+Yeni konuşma:
+{conversation}
+
+Güncellenmiş özet:"""
+
+    return {
+        "model": MODEL_NAME,
+        "messages": [{"role": "user", "content": summary_prompt}],
+        "temperature": TEMPERATURE,
+        "max_tokens": SUMMARY_MAX_TOKENS
+    }
+
+
+def _summary_result(response):
+    summary = (response.choices[0].message.content or "").strip()
+    print(f"🧠 Conversation summary updated ({estimate_token_count(summary)} tokens)")
+    return summary or None
+
+
+def summarize_turns(client, summary, turns):
+    """
+    Fold evicted turns into the running summary.
+
+    Args:
+        client: OpenAI client instance
+        summary (str): Current summary ("" if none yet)
+        turns (list): Evicted chat messages, oldest first
+
+    Returns:
+        str: New summary, or None if the LLM call failed (turns are retried later)
+    """
+    try:
+        response = client.chat.completions.create(**_summary_request(summary, turns))
+        return _summary_result(response)
+    except Exception as e:
+        print(f"⚠️ Conversation summary failed, keeping unsummarized turns. Error: {e}")
+        return None
+
+
+async def asummarize_turns(client, summary, turns):
+    """Async counterpart of summarize_turns (client: AsyncOpenAI instance)"""
+    try:
+        response = await client.chat.completions.create(**_summary_request(summary, turns))
+        return _summary_result(response)
+    except Exception as e:
+        print(f"⚠️ Conversation summary failed, keeping unsummarized turns. Error: {e}")
+        return None
@@ -5,16 +5,14 @@ Bu script MongoDB Atlas'ta vector search index oluşturur.
 NOT: Atlas UI üzerinden manuel olarak da oluşturulabilir.
 """
 
-from pymongo import MongoClient
-from config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION_NAME, MONGO_VECTOR_INDEX_NAME
+from resources import get_collection
+from config import MONGO_DB_NAME, MONGO_COLLECTION_NAME, MONGO_VECTOR_INDEX_NAME, VECTOR_FILTER_FIELDS
 
 def create_vector_search_index():
     """MongoDB Atlas Vector Search Index oluştur"""
     
     print("🔌 MongoDB Atlas'a bağlanılıyor...")
-    client = MongoClient(MONGO_URI)
-    db = client[MONGO_DB_NAME]
-    collection = db[MONGO_COLLECTION_NAME]
+    collection = get_collection()
     
     # Mevcut index'leri kontrol et
     print("\n📋 Mevcut index'ler kontrol ediliyor...")
@@ -45,19 +43,11 @@ def create_vector_search_index():
                     "path": "embedding",
                     "numDimensions": 384,  # paraphrase-multilingual-MiniLM-L12-v2 = 384 dim
                     "similarity": "cosine"
-                },
-                {
-                    "type": "filter",
-                    "path": "metadata.source_file"
-                },
-                {
-                    "type": "filter", 
-                    "path": "metadata.source_dir"
-                },
-                {
-                    "type": "filter",
-                    "path": "metadata.page"
                 }
+            ] + [
+                # $vectorSearch ön-filtresinde kullanılabilecek alanlar
+                {"type": "filter", "path": f"metadata.{field}"}
+                for field in VECTOR_FILTER_FIELDS
             ]
         }
     }
@@ -81,9 +71,6 @@ def create_vector_search_index():
         
         import json
         print(json.dumps(index_definition, indent=2))
-        
-    finally:
-        client.close()
 
 
 def verify_vector_search():
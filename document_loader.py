@@ -8,17 +8,12 @@ import os
 import glob
 from pathlib import Path
 from datetime import datetime
-from pymongo import MongoClient
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
-from text_processing import clean_text
-from config import KANUN_DIR, TEBLIG_DIR, CHUNK_SIZE, CHUNK_OVERLAP, MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION_NAME, EMBEDDING_MODEL
-
-# Initialize embedding model (will download from HuggingFace if needed)
-print("🤖 Loading embedding model...")
-embedding_model = SentenceTransformer(EMBEDDING_MODEL)
-print(f"✅ Embedding model loaded: {EMBEDDING_MODEL}")
+from text_processing import clean_text, estimate_token_count
+from quantization import embedding_fields
+from resources import get_collection, get_embedding_model, bump_corpus_version
+from config import KANUN_DIR, TEBLIG_DIR, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_STORAGE
 
 
 def load_single_pdf(pdf_path):
@@ -79,21 +74,23 @@ def load_all_pdfs_from_directory(directory_path):
     return all_documents
 
 
-def save_chunks_to_mongodb(chunks):
+def save_chunks_to_mongodb(chunks, storage=EMBEDDING_STORAGE):
     """
     Saves document chunks WITH EMBEDDINGS to MongoDB.
     
     Args:
         chunks (list): List of document chunks
+        storage (str): Embedding storage format, "float64" (list) or "int8" (BinData)
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
         print("\n💾 Connecting to MongoDB...")
-        client = MongoClient(MONGO_URI)
-        db = client[MONGO_DB_NAME]
-        collection = db[MONGO_COLLECTION_NAME]
+        collection = get_collection()
+        
+        # Shared per-process model (loaded on first use, not at import)
+        embedding_model = get_embedding_model()
         
         # Clear existing documents (optional)
         collection.delete_many({})
@@ -117,7 +114,7 @@ def save_chunks_to_mongodb(chunks):
                     "chunk_id": i + j,
                     "content": chunk.page_content,
                     "metadata": chunk.metadata,
-                    "embedding": embedding.tolist(),  # ⭐ VECTOR EKLENDI!
+                    **embedding_fields(embedding, storage),  # ⭐ VECTOR EKLENDI!
                     "created_at": datetime.utcnow()
                 }
                 documents_to_insert.append(doc)
@@ -128,7 +125,9 @@ def save_chunks_to_mongodb(chunks):
         result = collection.insert_many(documents_to_insert)
         print(f"\n✅ Saved {len(result.inserted_ids)} chunks WITH EMBEDDINGS to MongoDB")
         
-        client.close()
+        # Invalidate corpus-dependent caches in running servers
+        bump_corpus_version()
+        
         return True
         
     except Exception as e:
@@ -181,6 +180,10 @@ def load_and_process_documents():
     chunks = text_splitter.split_documents(all_documents)
     print(f"✅ Created {len(chunks)} chunks")
     
+    # Precompute token counts for context packing at query time
+    for chunk in chunks:
+        chunk.metadata["token_count"] = estimate_token_count(chunk.page_content)
+    
     # Show statistics
     if chunks:
         print("\n📊 Document Statistics:")
@@ -0,0 +1,33 @@
+"""
+Retrieval result record
+Vector/BM25 araması, füzyon ve reranker aynı Document objesini taşır;
+aşamalar arasında kopya oluşturulmaz.
+"""
+
+
+class Document:
+    """
+    Compact search result with LangChain-compatible attribute names.
+
+    Attributes:
+        chunk_id (str): Chunk kimliği (sonuç listelerini birleştirmek için)
+        page_content (str): Chunk metni
+        metadata (dict): Chunk metadata'sı (kaynaktaki sözlüğe referans, kopyalanmaz)
+        score (float): Arama skoru (vektör benzerliği veya BM25)
+        rerank_score (float): Reranker skoru (rerank edilmediyse None)
+    """
+
+    __slots__ = ("chunk_id", "page_content", "metadata", "score", "rerank_score")
+
+    def __init__(self, page_content, metadata, score=None, chunk_id=None, rerank_score=None):
+        self.page_content = page_content
+        self.metadata = metadata
+        self.score = score
+        self.chunk_id = chunk_id
+        self.rerank_score = rerank_score
+
+    def __repr__(self):
+        return (
+            f"Document(chunk_id={self.chunk_id!r}, score={self.score}, "
+            f"rerank_score={self.rerank_score}, page_content={self.page_content[:40]!r})"
+        )
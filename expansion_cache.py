@@ -0,0 +1,164 @@
+"""
+Persistent cache for LLM query expansions
+Genişletilmiş sorgular SQLite dosyasında saklanır; aynı sunucudaki tüm
+gunicorn worker'ları aynı dosyayı paylaşır ve cache yeniden başlatmalardan
+sonra da geçerlidir (WAL modu: okuyucular yazanı beklemez).
+
+Anahtar: normalize edilmiş soru + model adı + prompt sürümü. Prompt veya
+model değişince eski kayıtlar kendiliğinden kullanılmaz olur.
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from cache_utils import normalize_text
+from text_processing import turkish_lower
+
+# Bu kadar yazmada bir süresi dolan / fazla kayıtlar temizlenir
+PRUNE_EVERY = 100
+
+
+def expansion_key(question, model_name, prompt_version):
+    """Cache key for one (question, model, prompt version) combination"""
+    raw = "\x1f".join((turkish_lower(normalize_text(question)), model_name, str(prompt_version)))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ExpansionCache:
+    """SQLite-backed expansion cache with TTL and an LRU size limit"""
+
+    def __init__(self, path, ttl, max_entries):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): SQLite dosya yolu
+            ttl (float): Kayıt ömrü, saniye (0 = süresiz)
+            max_entries (int): En fazla kayıt; aşılınca en az kullanılanlar silinir
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS expansions ("
+            " key TEXT PRIMARY KEY,"
+            " expansion TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS expansions_accessed ON expansions (accessed_at)")
+        self.prune()
+
+    def _connection(self):
+        """Thread başına bir bağlantı (sqlite3 bağlantıları thread'ler arasında paylaşılmaz)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: her ifade kendi transaction'ı, kilit kısa tutulur
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, key):
+        """
+        Cached expansion, or None if missing or expired.
+
+        Args:
+            key (str): expansion_key(...) sonucu
+
+        Returns:
+            str: Genişletilmiş sorgu veya None
+        """
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT expansion, created_at FROM expansions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                row = None
+            if row is not None:
+                conn.execute("UPDATE expansions SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"⚠️  Expansion cache okunamadı: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row[0] if row is not None else None
+
+    def set(self, key, expansion):
+        """Store an expansion (cache errors never fail the request)"""
+        now = time.time()
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO expansions (key, expansion, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, expansion, now, now)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️  Expansion cache yazılamadı: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Süresi dolan kayıtları ve max_entries üzerindeki en eski kullanılanları sil"""
+        try:
+            conn = self._connection()
+            if self.ttl:
+                conn.execute("DELETE FROM expansions WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.execute(
+                "DELETE FROM expansions WHERE key IN ("
+                " SELECT key FROM expansions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️  Expansion cache temizlenemedi: {e}")
+
+    def close(self):
+        """Tüm thread bağlantılarını kapat"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def stats(self):
+        """Get cache hit/miss counters and size"""
+        try:
+            entries = self._connection().execute("SELECT COUNT(*) FROM expansions").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": entries,
+                "max_size": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "path": self.path
+            }
@@ -0,0 +1,25 @@
+"""
+Metadata filters for the local backends (local/hnsw vector store, BM25 index)
+MongoDB'ye bağımlı değildir; $vectorSearch tarafı mongodb_vector_store.build_vector_search_filter'dadır.
+"""
+
+
+def matches_filter(metadata, filter_dict):
+    """
+    Chunk metadata'sı filtreye uyuyor mu?
+    $vectorSearch filter ile aynı anlam: liste değerleri "içinde olan" olarak eşleşir.
+
+    Args:
+        metadata (dict): Chunk metadata'sı
+        filter_dict (dict): Metadata filtreleri
+
+    Returns:
+        bool: True if all filters match
+    """
+    for key, value in filter_dict.items():
+        if isinstance(value, (list, tuple, set)):
+            if metadata.get(key) not in value:
+                return False
+        elif metadata.get(key) != value:
+            return False
+    return True
@@ -8,3 +8,19 @@ keepalive = 5
 graceful_timeout = 30
 max_requests = 1000
 max_requests_jitter = 50
+
+
+def post_worker_init(worker):
+    """Worker açılışında modelleri yükle ve OpenRouter bağlantısını ısıt (ilk istek beklemesin)"""
+    from app import prepare_worker
+    try:
+        prepare_worker()
+    except Exception as e:
+        # /health yine yanıt versin; ilk istekte tekrar denenir
+        print(f"❌ RAG system could not be initialized at worker start: {e}")
+
+
+def worker_exit(server, worker):
+    """Worker kapanırken paylaşılan MongoClient ve modelleri bırak"""
+    from resources import shutdown
+    shutdown()
@@ -0,0 +1,204 @@
+"""
+HNSW Vector Store - Persistent approximate nearest neighbour search
+Yerel index'in (local_vector_store) üzerine diskte saklanan bir HNSW grafı kurar.
+Yeni chunk'lar grafı baştan kurmadan eklenir; index açılışta milisaniyeler içinde yüklenir.
+
+Graf oluşturma (önce yerel index gerekli: python local_vector_store.py):
+    python hnsw_vector_store.py
+"""
+
+import os
+import json
+import hashlib
+import hnswlib
+import numpy as np
+from config import (
+    LOCAL_INDEX_DIR,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH
+)
+from local_vector_store import CHUNKS_FILE, HNSW_INDEX_FILE, HNSW_META_FILE, LocalVectorStore
+from filters import matches_filter
+
+
+class HNSWVectorStore(LocalVectorStore):
+    """Approximate vector search over an on-disk HNSW graph"""
+
+    def __init__(self, index_dir=LOCAL_INDEX_DIR, model=None, ef=HNSW_EF_SEARCH):
+        """
+        Initialize local index, HNSW graph and embedding model.
+
+        Args:
+            index_dir (str): Index klasörü
+            model: SentenceTransformer instance (opsiyonel, yoksa yüklenir)
+            ef (int): Arama sırasında taranacak aday listesi genişliği
+        """
+        # Graf float32 vektörlerle kurulur; sıkıştırılmış arama matrisi kullanılmaz
+        super().__init__(index_dir, model, dtype="float32")
+        self.ef = ef
+
+        dim = self.embeddings.shape[1]
+        self.index = hnswlib.Index(space="cosine", dim=dim)
+
+        graph_path = os.path.join(index_dir, HNSW_INDEX_FILE)
+        if os.path.exists(graph_path) and self._graph_matches_corpus():
+            self.index.load_index(graph_path, max_elements=len(self.chunks))
+        else:
+            # Graf yok ya da başka bir corpus'tan kurulmuş (etiketler başka satırları gösterir)
+            self._build_graph()
+
+        self.index.set_ef(self.ef)
+        print(f"✅ HNSW graf hazır! (M={HNSW_M}, ef={self.ef})")
+
+    def _chunks_digest(self):
+        """chunks.json içeriğinin özeti: aynı boyutta ama farklı sıralı corpus'u da ayırt eder"""
+        digest = hashlib.sha1()
+        with open(os.path.join(self.index_dir, CHUNKS_FILE), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _graph_matches_corpus(self):
+        """Kayıtlı graf, şu anki chunks.json / embeddings.npy ile kurulmuş mu?"""
+        meta_path = os.path.join(self.index_dir, HNSW_META_FILE)
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        return meta.get("elements") == len(self.chunks) and meta.get("chunks_sha1") == self._chunks_digest()
+
+    def _build_graph(self):
+        """Tüm matristen HNSW grafını kur ve kaydet"""
+        print("🔧 HNSW grafı oluşturuluyor...")
+        self.index.init_index(
+            max_elements=len(self.chunks),
+            ef_construction=HNSW_EF_CONSTRUCTION,
+            M=HNSW_M
+        )
+        self._add_to_graph(np.arange(len(self.chunks)))
+
+    def _add_to_graph(self, rows):
+        """Verilen satırları grafa ekle ve grafı diske yaz"""
+        required = self.index.get_current_count() + len(rows)
+        if required > self.index.get_max_elements():
+            self.index.resize_index(required)
+
+        self.index.add_items(np.asarray(self.embeddings[rows]), rows)
+        self.index.save_index(os.path.join(self.index_dir, HNSW_INDEX_FILE))
+
+        # Grafın hangi corpus'a ait olduğu; eşleşmezse açılışta yeniden kurulur
+        meta_path = os.path.join(self.index_dir, HNSW_META_FILE)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"elements": self.index.get_current_count(), "chunks_sha1": self._chunks_digest()}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def add_chunks(self, embeddings, contents, metadatas, chunk_ids=None):
+        """
+        Yeni chunk'ları grafı yeniden kurmadan ekle.
+
+        Args:
+            embeddings: (n, d) boyutlu embedding matrisi
+            contents (list): Chunk metinleri
+            metadatas (list): Chunk metadata'ları
+            chunk_ids (list): Chunk kimlikleri (opsiyonel)
+
+        Returns:
+            np.ndarray: Yeni chunk'ların index içindeki satır numaraları
+        """
+        rows = super().add_chunks(embeddings, contents, metadatas, chunk_ids)
+        self._add_to_graph(rows)
+        return rows
+
+    def set_ef(self, ef):
+        """Arama genişliğini ayarla (yüksek ef = daha iyi recall, daha yavaş arama)"""
+        self.ef = ef
+        self.index.set_ef(ef)
+
+    def _search_vector(self, query_vector, k, filter_dict=None):
+        """
+        HNSW grafı üzerinde yaklaşık en yakın k chunk'ı bul.
+
+        Args:
+            query_vector: Normalize edilmiş sorgu vektörü
+            k (int): Döndürülecek sonuç sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            tuple: (indeksler, cosine skorları) - skora göre azalan sırada
+        """
+        k = min(k, self.index.get_current_count())
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        label_filter = None
+        if filter_dict:
+            def label_filter(label):
+                return matches_filter(self.chunks[label]["metadata"], filter_dict)
+
+        # ef paylaşılan index'te değiştirilmez (eşzamanlı aramalar); hnswlib zaten max(ef, k) kullanır
+        try:
+            labels, distances = self.index.knn_query(query_vector, k=k, filter=label_filter)
+        except RuntimeError:
+            # Filtre çok seçiciyse graf k sonuç bulamayabilir; tam aramaya düş
+            return LocalVectorStore._search_vectors(self, query_vector[np.newaxis, :], k, filter_dict)[0]
+
+        # hnswlib cosine mesafesi döndürür: 1 - cosine
+        return labels[0].astype(np.int64), 1.0 - distances[0]
+
+    def _search_vectors(self, query_matrix, k, filter_dict=None):
+        """
+        Birden fazla sorguyu HNSW grafı üzerinde ara.
+
+        Args:
+            query_matrix: (m, d) boyutlu normalize edilmiş sorgu matrisi
+            k (int): Her sorgu için döndürülecek sonuç sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            list: Her sorgu için (indeksler, cosine skorları) tuple'ı
+        """
+        return [self._search_vector(vector, k, filter_dict) for vector in query_matrix]
+
+    def get_collection_stats(self):
+        """Index istatistiklerini döndür"""
+        stats = super().get_collection_stats()
+        stats["database"] = "hnsw"
+        return stats
+
+    def health_check(self):
+        """Index'in yüklü olduğunu kontrol et"""
+        health = super().health_check()
+        health["backend"] = "hnsw"
+        return health
+
+
+def get_hnsw_vectorstore():
+    """
+    HNSW Vector Store instance oluştur.
+
+    Returns:
+        HNSWVectorStore: Vector store instance
+    """
+    return HNSWVectorStore()
+
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 60)
+    print("HNSW Graf Oluşturma")
+    print("=" * 60)
+
+    graph_path = os.path.join(LOCAL_INDEX_DIR, HNSW_INDEX_FILE)
+    if os.path.exists(graph_path):
+        os.remove(graph_path)
+
+    start = time.time()
+    store = get_hnsw_vectorstore()
+    print(f"\n⏱️  Süre: {time.time() - start:.1f} saniye")
+
+    print("\n" + "=" * 60)
+    print(f"✅ İşlem tamamlandı! {len(store.chunks)} chunk → {graph_path}")
+    print("   Kullanmak için: VECTOR_BACKEND=hnsw")
+    print("=" * 60)
@@ -0,0 +1,184 @@
+"""
+Lexical (BM25) search over chunk content
+Türkçe'ye uygun tokenizasyon (noktalı/noktasız i), hafif ek temizleme ve
+bellek içi ters index ile anahtar kelime araması yapar.
+
+Vektör aramasının zayıf kaldığı birebir terimler ("idari para cezası",
+"Madde 26") için hibrit aramada kullanılır.
+"""
+
+import re
+import math
+import heapq
+from collections import Counter, defaultdict
+from config import BM25_K1, BM25_B
+from text_processing import turkish_lower
+from filters import matches_filter
+from documents import Document
+
+# Sık geçen ve arama için anlamsız kelimeler
+STOPWORDS = {
+    "ve", "ile", "veya", "ya", "da", "de", "ki", "bu", "şu", "o", "bir", "her",
+    "için", "gibi", "olan", "olarak", "ise", "mi", "mı", "mu", "mü", "ne",
+    "nedir", "nelerdir", "nasıl", "hangi", "kadar", "daha", "en", "çok",
+    "the", "and", "of"
+}
+
+# Uzundan kısaya: çoğul, iyelik, hal ve bildirme ekleri.
+# Kaynaştırma "n"li biçimler (nın, nda...) bilerek yok: "kanunun" → "kanu" olmasın diye
+# "un" ile kırpılır, iki tur kırpma "işyerinin" gibi biçimleri de köküne indirir.
+SUFFIXES = sorted([
+    "lar", "ler", "ları", "leri", "ların", "lerin", "larının", "lerinin",
+    "lara", "lere", "larda", "lerde", "lardan", "lerden", "larla", "lerle",
+    "ın", "in", "un", "ün",
+    "ının", "inin", "unun", "ünün", "sının", "sinin", "sunun", "sünün",
+    "ı", "i", "u", "ü", "sı", "si", "su", "sü",
+    "da", "de", "ta", "te", "dan", "den", "tan", "ten",
+    "ya", "ye",
+    "la", "le", "yla", "yle",
+    "dır", "dir", "dur", "dür", "tır", "tir", "tur", "tür",
+], key=len, reverse=True)
+
+MIN_STEM_LENGTH = 4
+
+
+def stem(token):
+    """
+    Hafif ek temizleme: sondaki çekim eklerini en fazla iki tur kırp.
+    Kök en az MIN_STEM_LENGTH karakter kalır; sayılar olduğu gibi bırakılır.
+    Sondaki "ğ", yumuşamadan önceki "k" haline döndürülür.
+    """
+    if token.isdigit():
+        return token
+
+    for _ in range(2):
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+
+    # Ünsüz yumuşaması: "güvenliği" → "güvenliğ" → "güvenlik"
+    if token.endswith("ğ"):
+        token = token[:-1] + "k"
+    return token
+
+
+def tokenize(text):
+    """
+    Metni arama terimlerine ayır.
+
+    Args:
+        text (str): Ham metin
+
+    Returns:
+        list: Kökleri alınmış terimler
+    """
+    tokens = re.findall(r"\w+", turkish_lower(text))
+    return [stem(token) for token in tokens if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """In-memory BM25 inverted index over chunk content"""
+
+    def __init__(self, chunks, k1=BM25_K1, b=BM25_B):
+        """
+        Build the index.
+
+        Args:
+            chunks (list): {"chunk_id", "content", "metadata"} sözlükleri
+            k1 (float): BM25 terim frekansı doygunluk parametresi
+            b (float): BM25 uzunluk normalizasyonu parametresi
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        self.postings = defaultdict(list)  # term -> [(chunk index, tf)]
+        self.doc_lengths = []
+        for idx, chunk in enumerate(chunks):
+            terms = tokenize(chunk["content"])
+            self.doc_lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term].append((idx, tf))
+
+        n = len(chunks)
+        self.avg_doc_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def search(self, query, k=10, filter_dict=None):
+        """
+        BM25 ile en ilgili chunk'ları bul.
+
+        Args:
+            query (str): Arama sorgusu
+            k (int): Döndürülecek döküman sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            list: BM25 skoruna göre sıralı Document objeleri
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for idx, tf in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[idx] / self.avg_doc_length
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+        if filter_dict:
+            scores = {
+                idx: score for idx, score in scores.items()
+                if matches_filter(self.chunks[idx]["metadata"], filter_dict)
+            }
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            Document(
+                self.chunks[idx]["content"],
+                self.chunks[idx]["metadata"],
+                score,
+                self.chunks[idx]["chunk_id"]
+            )
+            for idx, score in top
+        ]
+
+    def stats(self):
+        """Get index statistics"""
+        return {
+            "documents": len(self.chunks),
+            "terms": len(self.postings),
+            "avg_doc_length": self.avg_doc_length
+        }
+
+
+def get_lexical_index(vectorstore):
+    """
+    Vector store'daki chunk'lardan BM25 index'i oluştur.
+    Yerel backend'lerde chunk'lar zaten bellektedir; MongoDB'de koleksiyondan okunur.
+
+    Args:
+        vectorstore: MongoDBVectorStore, LocalVectorStore veya HNSWVectorStore
+
+    Returns:
+        LexicalIndex: BM25 index
+    """
+    print("📖 BM25 index'i oluşturuluyor...")
+
+    if hasattr(vectorstore, "chunks"):
+        chunks = vectorstore.chunks
+    else:
+        cursor = vectorstore.collection.find({}, {"content": 1, "metadata": 1})
+        chunks = [
+            {"chunk_id": str(doc["_id"]), "content": doc["content"], "metadata": doc.get("metadata", {})}
+            for doc in cursor
+        ]
+
+    index = LexicalIndex(chunks)
+    print(f"✅ BM25 index hazır! ({len(chunks)} chunk, {len(index.postings)} terim)")
+    return index
@@ -0,0 +1,359 @@
+"""
+Hedged, deadline-bounded LLM calls (OpenRouter)
+Her çağrının bir toplam süre sınırı vardır (cevap: LLM_DEADLINE_MS, genişletme:
+LLM_EXPANSION_DEADLINE_MS); tek bir yavaş OpenRouter cevabı worker'ı
+HTTP_TIMEOUT boyunca tutmaz.
+
+- Hedge: birincil istek, o model ve çağrı türü için ölçülen gecikmenin
+  LLM_HEDGE_PERCENTILE yüzdeliğini aşınca aynı istek bir kez daha gönderilir;
+  önce gelen cevap kullanılır.
+- Fallback: model hata verirse (ve başka istek beklenmiyorsa) istek
+  LLM_FALLBACK_MODEL ile tekrarlanır.
+- Gecikme histogramları model ve çağrı türü başına tutulur ve zamanla
+  sönümlenir; hedge eşiği böylece güncel gecikmeye uyar.
+
+Streaming çağrılarda ölçülen süre ilk cevaba (header) kadardır.
+"""
+
+import math
+import time
+import asyncio
+import threading
+import httpx
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from config import (
+    LLM_DEADLINE_MS,
+    LLM_EXPANSION_DEADLINE_MS,
+    LLM_HEDGING,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_MIN_MS,
+    LLM_FALLBACK_MODEL,
+    HTTP_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_POOL_TIMEOUT
+)
+from resources import get_model, register_shutdown
+
+# Eşzamanlı istekler için aynı anda beklenebilecek LLM çağrısı (hedge'ler dahil)
+LLM_THREADS = 32
+
+# Çağrı türü başına toplam süre sınırı
+# answer_stream ayrı tutulur: ölçülen süre header'a kadardır, tam üretim değil;
+# aynı histogramda hedge eşiğini bloklayan cevaplar için aşağı çekerdi
+CALL_DEADLINES_MS = {
+    "answer": LLM_DEADLINE_MS,
+    "answer_stream": LLM_DEADLINE_MS,
+    "expansion": LLM_EXPANSION_DEADLINE_MS
+}
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """No attempt answered before the call's deadline"""
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (10 ms - ~2 min, %20 genişlikte kovalar)"""
+
+    MIN_SECONDS = 0.01
+    GROWTH = 1.2
+    BUCKETS = 52
+    # Bu kadar ölçümden sonra sayılar yarıya iner: eski gecikmelerin ağırlığı azalır
+    DECAY_AT = 1000
+
+    def __init__(self):
+        self.counts = [0.0] * self.BUCKETS
+        self.count = 0.0
+        self.samples = 0
+
+    def _bucket(self, seconds):
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        index = math.ceil(math.log(seconds / self.MIN_SECONDS, self.GROWTH))
+        return min(index, self.BUCKETS - 1)
+
+    def record(self, seconds):
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.samples += 1
+        if self.count >= self.DECAY_AT:
+            self.counts = [count / 2 for count in self.counts]
+            self.count /= 2
+
+    def percentile(self, percent):
+        """
+        Upper bound of the bucket holding the given percentile.
+
+        Returns:
+            float: Seconds, or None without samples
+        """
+        if not self.count:
+            return None
+        target = self.count * percent / 100
+        cumulative = 0.0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.MIN_SECONDS * self.GROWTH ** index
+        return self.MIN_SECONDS * self.GROWTH ** (self.BUCKETS - 1)
+
+    def stats(self):
+        return {
+            "samples": self.samples,
+            "p50_ms": round(self.percentile(50) * 1000) if self.count else None,
+            "p95_ms": round(self.percentile(95) * 1000) if self.count else None,
+            "p99_ms": round(self.percentile(99) * 1000) if self.count else None
+        }
+
+
+class LatencyTracker:
+    """Per-model latency histograms and hedge/fallback counters (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {"calls": 0, "hedges": 0, "hedge_wins": 0, "fallbacks": 0, "deadline_exceeded": 0}
+
+    def record(self, model, kind, seconds):
+        with self._lock:
+            histogram = self._histograms.get((model, kind))
+            if histogram is None:
+                histogram = self._histograms[(model, kind)] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def hedge_delay(self, model, kind):
+        """
+        How long to wait for an attempt before hedging it.
+
+        Returns:
+            float: Seconds, or None if hedging is off or there are too few samples
+        """
+        if not LLM_HEDGING:
+            return None
+        with self._lock:
+            histogram = self._histograms.get((model, kind))
+            if histogram is None or histogram.samples < LLM_HEDGE_MIN_SAMPLES:
+                return None
+            return max(LLM_HEDGE_MIN_MS / 1000, histogram.percentile(LLM_HEDGE_PERCENTILE))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["latency"] = {
+                f"{model} ({kind})": histogram.stats()
+                for (model, kind), histogram in self._histograms.items()
+            }
+        return stats
+
+
+def get_latency_tracker():
+    """Süreç genelinde paylaşılan gecikme ölçümleri"""
+    return get_model("llm_latency", LatencyTracker)
+
+
+def _llm_executor():
+    """Senkron çağrıların beklendiği thread havuzu"""
+    def create():
+        executor = ThreadPoolExecutor(max_workers=LLM_THREADS, thread_name_prefix="llm-call")
+        register_shutdown(lambda: executor.shutdown(wait=False))
+        return executor
+    return get_model("llm_executor", create)
+
+
+class _CallPlan:
+    """Attempt bookkeeping shared by complete() and acomplete()"""
+
+    def __init__(self, request, kind):
+        self.request = request
+        self.kind = kind
+        self.model = request["model"]
+        self.started = time.perf_counter()
+        self.deadline = self.started + CALL_DEADLINES_MS[kind] / 1000
+        self.tracker = get_latency_tracker()
+        self.hedge_at = self.tracker.hedge_delay(self.model, kind)
+        self.fallback = LLM_FALLBACK_MODEL if LLM_FALLBACK_MODEL and LLM_FALLBACK_MODEL != self.model else None
+        self.attempts = {}
+        self.error = None
+        self.tracker.count("calls")
+
+    def remaining(self):
+        return self.deadline - time.perf_counter()
+
+    def attempt_request(self, model):
+        # Her deneme kalan süreyle sınırlı: kaybeden istekler HTTP_TIMEOUT kadar sürmez
+        remaining = max(0.001, self.remaining())
+        timeout = httpx.Timeout(
+            min(HTTP_TIMEOUT, remaining),
+            connect=min(HTTP_CONNECT_TIMEOUT, remaining),
+            pool=min(HTTP_POOL_TIMEOUT, remaining)
+        )
+        return dict(self.request, model=model, timeout=timeout)
+
+    def next_wake(self):
+        """Time to wait for the pending attempts (until the hedge or the deadline)"""
+        wake = self.deadline
+        if self.hedge_at is not None:
+            wake = min(wake, self.started + self.hedge_at)
+        return max(0.0, wake - time.perf_counter())
+
+    def should_hedge(self):
+        if self.hedge_at is None or time.perf_counter() < self.started + self.hedge_at:
+            return False
+        self.hedge_at = None  # En fazla bir hedge
+        self.tracker.count("hedges")
+        print(f"🪁 {self.model} slower than p{LLM_HEDGE_PERCENTILE:g}, sending a hedged request")
+        return True
+
+    def take_fallback(self):
+        """Fallback model after every attempt failed (once), or None"""
+        model, self.fallback = self.fallback, None
+        if model is None or self.remaining() <= 0:
+            return None
+        self.tracker.count("fallbacks")
+        print(f"↪️ {self.model} failed, falling back to {model}")
+        return model
+
+    def failed(self, model, error):
+        print(f"⚠️ LLM call to {model} failed: {error}")
+        self.error = error
+
+    def won(self, attempt):
+        if self.attempts[attempt][1] == "hedge":
+            self.tracker.count("hedge_wins")
+
+    def deadline_exceeded(self):
+        self.tracker.count("deadline_exceeded")
+        return LLMDeadlineExceeded(
+            f"No answer from {self.model} within {CALL_DEADLINES_MS[self.kind]} ms ({self.kind})"
+        )
+
+
+def _close_result(future):
+    """Close a losing streaming response once it arrives"""
+    if not future.cancelled() and future.exception() is None:
+        close = getattr(future.result(), "close", None)
+        if close is not None:
+            close()
+
+
+def complete(client, request, kind="answer"):
+    """
+    chat.completions.create with a deadline, a hedged duplicate and model fallback.
+
+    Args:
+        client: OpenAI client instance
+        request (dict): chat.completions.create arguments (including model)
+        kind (str): "answer", "answer_stream" (stream=True) or "expansion";
+            selects the deadline and the latency histogram
+
+    Returns:
+        The first successful response (a stream if request has stream=True)
+
+    Raises:
+        LLMDeadlineExceeded: No attempt answered in time
+        Exception: The last error, if every attempt (and the fallback) failed
+    """
+    plan = _CallPlan(request, kind)
+    executor = _llm_executor()
+
+    def timed_call(model):
+        started = time.perf_counter()
+        response = client.chat.completions.create(**plan.attempt_request(model))
+        plan.tracker.record(model, kind, time.perf_counter() - started)
+        return response
+
+    def launch(model, role):
+        plan.attempts[executor.submit(timed_call, model)] = (model, role)
+
+    launch(plan.model, "primary")
+    pending = set(plan.attempts)
+    winner = None
+    try:
+        while True:
+            done, pending = wait(pending, timeout=plan.next_wake(), return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    winner = attempt
+                    plan.won(attempt)
+                    return attempt.result()
+                plan.failed(plan.attempts[attempt][0], attempt.exception())
+
+            if not pending:
+                model = plan.take_fallback()
+                if model is None:
+                    raise plan.error
+                launch(model, "fallback")
+                pending = {attempt for attempt in plan.attempts if not attempt.done()}
+            elif plan.remaining() <= 0:
+                raise plan.deadline_exceeded()
+            elif plan.should_hedge():
+                launch(plan.model, "hedge")
+                pending = {attempt for attempt in plan.attempts if not attempt.done()}
+    finally:
+        # Kaybeden denemeler arka planda biter; stream ise kapatılır
+        for attempt in plan.attempts:
+            if attempt is not winner:
+                attempt.add_done_callback(_close_result)
+
+
+async def acomplete(client, request, kind="answer"):
+    """
+    Async counterpart of complete (client: AsyncOpenAI instance).
+    Losing attempts are cancelled instead of being left to finish.
+    """
+    plan = _CallPlan(request, kind)
+
+    async def timed_call(model):
+        started = time.perf_counter()
+        # İptal edilen (kaybeden) denemeler histograma girmez: bitmiş bir ölçüm değildir
+        response = await client.chat.completions.create(**plan.attempt_request(model))
+        plan.tracker.record(model, kind, time.perf_counter() - started)
+        return response
+
+    def launch(model, role):
+        task = asyncio.ensure_future(timed_call(model))
+        plan.attempts[task] = (model, role)
+
+    launch(plan.model, "primary")
+    pending = set(plan.attempts)
+    winner = None
+    try:
+        while True:
+            done, pending = await asyncio.wait(pending, timeout=plan.next_wake(), return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    winner = attempt
+                    plan.won(attempt)
+                    return attempt.result()
+                plan.failed(plan.attempts[attempt][0], attempt.exception())
+
+            if not pending:
+                model = plan.take_fallback()
+                if model is None:
+                    raise plan.error
+                launch(model, "fallback")
+                pending = {attempt for attempt in plan.attempts if not attempt.done()}
+            elif plan.remaining() <= 0:
+                raise plan.deadline_exceeded()
+            elif plan.should_hedge():
+                launch(plan.model, "hedge")
+                pending = {attempt for attempt in plan.attempts if not attempt.done()}
+    finally:
+        for attempt in plan.attempts:
+            if attempt is winner:
+                continue
+            if not attempt.done():
+                attempt.cancel()
+            elif not attempt.cancelled() and attempt.exception() is None:
+                close = getattr(attempt.result(), "close", None)
+                if close is not None:
+                    await close()
+
+
+def llm_call_stats():
+    """Latency percentiles per model and hedge/fallback counters (for /stats)"""
+    return get_latency_tracker().stats()
@@ -0,0 +1,458 @@
+"""
+Local Vector Store - In-process exact search
+Tüm chunk embedding'lerini tek bir float32 matrisinde tutar (diskten memory-map)
+ve top-k sorgularını tek bir matris çarpımıyla cevaplar.
+
+LOCAL_INDEX_DTYPE=float16/int8 ile arama önce sıkıştırılmış matris üzerinde
+yapılır; k * RESCORE_FACTOR aday float32 satırlarla yeniden skorlanır.
+
+MongoDBVectorStore ile aynı arayüzü sunar; Atlas cluster'ı olmadan
+(laptop, CI) tüm pipeline'ı çalıştırmayı sağlar.
+
+Index oluşturma (MongoDB'den dışa aktarım):
+    python local_vector_store.py
+"""
+
+import os
+import json
+import numpy as np
+from config import (
+    LOCAL_INDEX_DIR,
+    LOCAL_INDEX_DTYPE,
+    RESCORE_FACTOR
+)
+from filters import matches_filter
+from documents import Document
+from resources import get_collection, get_embedding_model
+from query_encoder import QueryEncoder
+from quantization import quantize_int8, decode_float32_vector
+
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.json"
+SCALES_FILE = "scales.npy"
+COMPACT_DTYPES = ("float16", "int8")
+
+# Matristen türetilen HNSW grafı (hnsw_vector_store) ve hangi corpus'tan kurulduğu
+HNSW_INDEX_FILE = "hnsw.bin"
+HNSW_META_FILE = "hnsw.json"
+
+# Sıkıştırılmış matris bu kadar satırlık bloklar halinde float32'ye açılır
+SCORE_BLOCK_ROWS = 16384
+
+
+def _normalize(vectors):
+    """L2 normalizasyonu (cosine benzerliği = iç çarpım)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _write_index(index_dir, matrix, chunks):
+    """Matris ve chunk listesini atomik olarak diske yaz"""
+    os.makedirs(index_dir, exist_ok=True)
+
+    # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+    embeddings_path = os.path.join(index_dir, EMBEDDINGS_FILE)
+    chunks_path = os.path.join(index_dir, CHUNKS_FILE)
+    with open(embeddings_path + ".tmp", "wb") as f:
+        np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+    with open(chunks_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False, default=str)
+    os.replace(embeddings_path + ".tmp", embeddings_path)
+    os.replace(chunks_path + ".tmp", chunks_path)
+
+    # Sıkıştırılmış kopyalar ve HNSW grafı eskidi; bir sonraki yüklemede yeniden üretilir
+    derived = [_compact_file(dtype) for dtype in COMPACT_DTYPES] + [SCALES_FILE, HNSW_INDEX_FILE, HNSW_META_FILE]
+    for name in derived:
+        path = os.path.join(index_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _compact_file(dtype):
+    """Sıkıştırılmış matrisin dosya adı"""
+    return f"embeddings_{dtype}.npy"
+
+
+def _save_array(path, array):
+    """Diziyi atomik olarak diske yaz"""
+    with open(path + ".tmp", "wb") as f:
+        np.save(f, array)
+    os.replace(path + ".tmp", path)
+
+
+def _make_chunks(contents, metadatas, chunk_ids):
+    """Chunk kayıtlarını oluştur"""
+    return [
+        {"chunk_id": str(chunk_id), "content": content, "metadata": metadata}
+        for chunk_id, content, metadata in zip(chunk_ids, contents, metadatas)
+    ]
+
+
+def save_local_index(embeddings, contents, metadatas, chunk_ids=None, index_dir=LOCAL_INDEX_DIR):
+    """
+    Embedding matrisini ve chunk verilerini diske yaz.
+
+    Args:
+        embeddings: (n, d) boyutlu embedding matrisi
+        contents (list): Chunk metinleri
+        metadatas (list): Chunk metadata'ları
+        chunk_ids (list): Chunk kimlikleri (opsiyonel)
+        index_dir (str): Index klasörü
+    """
+    if chunk_ids is None:
+        chunk_ids = [str(i) for i in range(len(contents))]
+
+    chunks = _make_chunks(contents, metadatas, chunk_ids)
+    _write_index(index_dir, _normalize(embeddings), chunks)
+
+    print(f"✅ Yerel index kaydedildi: {len(chunks)} chunk → {index_dir}")
+
+
+def export_from_mongodb(index_dir=LOCAL_INDEX_DIR):
+    """
+    MongoDB'deki chunk'ları ve embedding'leri yerel index'e aktar.
+
+    Args:
+        index_dir (str): Index klasörü
+
+    Returns:
+        int: Aktarılan chunk sayısı
+    """
+    print("🔌 MongoDB Atlas'a bağlanılıyor...")
+    collection = get_collection()
+
+    chunk_ids, contents, metadatas, embeddings = [], [], [], []
+    cursor = collection.find({}, {"content": 1, "metadata": 1, "embedding": 1, "embedding_full": 1})
+    for doc in cursor:
+        chunk_ids.append(str(doc["_id"]))
+        contents.append(doc["content"])
+        metadatas.append(doc.get("metadata", {}))
+        # int8 saklamada tam hassasiyetli vektör embedding_full alanındadır
+        embeddings.append(decode_float32_vector(doc.get("embedding_full", doc["embedding"])))
+
+    if not embeddings:
+        print("❌ MongoDB'de döküman bulunamadı!")
+        return 0
+
+    save_local_index(embeddings, contents, metadatas, chunk_ids, index_dir)
+    return len(chunk_ids)
+
+
+class LocalVectorStore:
+    """In-process exact vector search over a memory-mapped float32 matrix"""
+
+    def __init__(self, index_dir=LOCAL_INDEX_DIR, model=None, dtype=LOCAL_INDEX_DTYPE):
+        """
+        Initialize local index and embedding model.
+
+        Args:
+            index_dir (str): Index klasörü
+            model: SentenceTransformer instance (opsiyonel, yoksa yüklenir)
+            dtype (str): Arama matrisi tipi: float32, float16 veya int8
+        """
+        if dtype != "float32" and dtype not in COMPACT_DTYPES:
+            raise ValueError(f"Bilinmeyen LOCAL_INDEX_DTYPE: {dtype} (float32, float16 veya int8)")
+
+        print(f"📂 Yerel vektör index'i yükleniyor: {index_dir}")
+        self.index_dir = index_dir
+        self.dtype = dtype
+
+        self._load_index()
+        self.model = model or get_embedding_model()
+        self.encoder = QueryEncoder(self.model)
+
+        print(f"✅ Local Vector Store hazır! ({len(self.chunks)} chunk)")
+
+    def _load_index(self):
+        """Matrisi ve chunk listesini diskten yükle"""
+        # Matris diskten memory-map edilir, sayfalar ihtiyaç oldukça okunur
+        self.embeddings = np.load(os.path.join(self.index_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        chunks_path = os.path.join(self.index_dir, CHUNKS_FILE)
+        with open(chunks_path, encoding="utf-8") as f:
+            self.chunks = json.load(f)
+        # Index her yeniden yazıldığında (export, add_chunks) sürüm değişir
+        self._corpus_version = f"local:{os.stat(chunks_path).st_mtime_ns}:{len(self.chunks)}"
+
+        if len(self.chunks) != self.embeddings.shape[0]:
+            raise ValueError(
+                f"Index bozuk: {len(self.chunks)} chunk, {self.embeddings.shape[0]} embedding"
+            )
+
+        self.compact, self.scales = self._load_compact()
+
+    def _load_compact(self):
+        """
+        Sıkıştırılmış arama matrisini yükle; yoksa float32 matristen üret.
+
+        Returns:
+            tuple: (float16 veya int8 matris, int8 için satır ölçekleri) - float32'de (None, None)
+        """
+        if self.dtype == "float32":
+            return None, None
+
+        compact_path = os.path.join(self.index_dir, _compact_file(self.dtype))
+        scales_path = os.path.join(self.index_dir, SCALES_FILE)
+        needs_scales = self.dtype == "int8"
+
+        if not os.path.exists(compact_path) or (needs_scales and not os.path.exists(scales_path)):
+            print(f"🔧 {self.dtype} arama matrisi oluşturuluyor...")
+            if needs_scales:
+                codes, scales = quantize_int8(self.embeddings)
+                _save_array(scales_path, scales)
+                _save_array(compact_path, codes)
+            else:
+                _save_array(compact_path, np.asarray(self.embeddings, dtype=np.float16))
+
+        compact = np.load(compact_path, mmap_mode="r")
+        scales = np.load(scales_path) if needs_scales else None
+        if compact.shape != self.embeddings.shape:
+            raise ValueError(
+                f"Index bozuk: {self.dtype} matris {compact.shape}, float32 matris {self.embeddings.shape}"
+            )
+        return compact, scales
+
+    def add_chunks(self, embeddings, contents, metadatas, chunk_ids=None):
+        """
+        Index'e yeni chunk'lar ekle ve diske kaydet.
+
+        Args:
+            embeddings: (n, d) boyutlu embedding matrisi
+            contents (list): Chunk metinleri
+            metadatas (list): Chunk metadata'ları
+            chunk_ids (list): Chunk kimlikleri (opsiyonel)
+
+        Returns:
+            np.ndarray: Yeni chunk'ların index içindeki satır numaraları
+        """
+        start = len(self.chunks)
+        if chunk_ids is None:
+            chunk_ids = [str(start + i) for i in range(len(contents))]
+
+        new_vectors = _normalize(embeddings)
+        matrix = np.concatenate([self.embeddings, new_vectors])
+        chunks = self.chunks + _make_chunks(contents, metadatas, chunk_ids)
+        _write_index(self.index_dir, matrix, chunks)
+        self._load_index()
+
+        print(f"✅ {len(contents)} chunk eklendi (toplam: {len(self.chunks)})")
+        return np.arange(start, len(self.chunks))
+
+    def _encode_query(self, query):
+        """Sorguyu normalize edilmiş float32 vektöre çevir"""
+        return _normalize(self.encoder.encode(query))
+
+    def _filter_mask(self, filter_dict):
+        """Filtreye uyan chunk'lar için boolean maske"""
+        return np.array(
+            [matches_filter(chunk["metadata"], filter_dict) for chunk in self.chunks],
+            dtype=bool
+        )
+
+    @staticmethod
+    def _top_k(scores, k):
+        """Skor vektöründen en yüksek k değeri azalan sırada seç"""
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Tam sıralama yerine sadece top-k'yı ayır, sonra onları sırala
+        if k < scores.shape[0]:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.shape[0])
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def _search_vector(self, query_vector, k, filter_dict=None):
+        """
+        Tek matris çarpımıyla en yakın k chunk'ı bul.
+
+        Args:
+            query_vector: Normalize edilmiş sorgu vektörü
+            k (int): Döndürülecek sonuç sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            tuple: (indeksler, cosine skorları) - skora göre azalan sırada
+        """
+        return self._search_vectors(query_vector[np.newaxis, :], k, filter_dict)[0]
+
+    def _search_vectors(self, query_matrix, k, filter_dict=None):
+        """
+        Birden fazla sorgu için tek matris çarpımıyla en yakın k chunk'ı bul.
+
+        Args:
+            query_matrix: (m, d) boyutlu normalize edilmiş sorgu matrisi
+            k (int): Her sorgu için döndürülecek sonuç sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            list: Her sorgu için (indeksler, cosine skorları) tuple'ı
+        """
+        if self.compact is None:
+            scores = query_matrix @ self.embeddings.T
+        else:
+            scores = self._approximate_scores(query_matrix)
+
+        if filter_dict:
+            scores = np.where(self._filter_mask(filter_dict), scores, -np.inf)
+
+        if self.compact is None:
+            return [self._top_k(row, k) for row in scores]
+        return [
+            self._rescore(query_vector, self._top_k(row, k * RESCORE_FACTOR)[0], k)
+            for query_vector, row in zip(query_matrix, scores)
+        ]
+
+    def _approximate_scores(self, query_matrix):
+        """
+        Sıkıştırılmış matris üzerinde yaklaşık cosine skorları.
+        Bloklar float32'ye açılarak çarpılır; bellekte tüm matrisin float32 kopyası oluşmaz.
+        """
+        n = self.compact.shape[0]
+        scores = np.empty((query_matrix.shape[0], n), dtype=np.float32)
+        for start in range(0, n, SCORE_BLOCK_ROWS):
+            block = np.asarray(self.compact[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + block.shape[0]] = query_matrix @ block.T
+
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def _rescore(self, query_vector, candidates, k):
+        """Adayları float32 satırlarla yeniden skorla ve en iyi k'yı döndür"""
+        if candidates.size == 0:
+            return candidates, np.empty(0, dtype=np.float32)
+
+        # memory-map'ten sadece aday satırlar okunur (sıralı erişim için sıralanmış)
+        candidates = np.sort(candidates)
+        exact = self.embeddings[candidates] @ query_vector
+        order = np.argsort(-exact)[:k]
+        return candidates[order], exact[order]
+
+    def _to_documents(self, indices, scores):
+        """Index sonuçlarını Document objelerine çevir (metadata kopyalanmaz)"""
+        documents = []
+        for idx, score in zip(indices, scores):
+            chunk = self.chunks[idx]
+            # Atlas vectorSearchScore ile aynı ölçek: (1 + cosine) / 2
+            doc = Document(
+                chunk["content"],
+                chunk["metadata"],
+                float((1 + score) / 2),
+                chunk["chunk_id"]
+            )
+            documents.append(doc)
+        return documents
+
+    def similarity_search(self, query, k=10, filter_dict=None):
+        """
+        Yerel index üzerinde benzer dökümanları bul.
+
+        Args:
+            query (str): Arama sorgusu
+            k (int): Döndürülecek döküman sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            list: Document objelerinin listesi (LangChain formatında)
+        """
+        query_vector = self._encode_query(query)
+        indices, scores = self._search_vector(query_vector, k, filter_dict)
+        return self._to_documents(indices, scores)
+
+    def similarity_search_batch(self, queries, k=10, filter_dict=None):
+        """
+        Birden fazla sorgu için benzer dökümanları bul.
+        Sorgular tek model.encode çağrısıyla vektöre çevrilir ve
+        tek matris çarpımıyla aranır.
+
+        Args:
+            queries (list): Arama sorguları
+            k (int): Her sorgu için döndürülecek döküman sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            list: Her sorgu için Document listesi (sorgu sırasıyla)
+        """
+        if not queries:
+            return []
+
+        query_matrix = _normalize(np.stack(self.encoder.encode_batch(queries)))
+        results = self._search_vectors(query_matrix, k, filter_dict)
+        return [self._to_documents(indices, scores) for indices, scores in results]
+
+    def similarity_search_with_score(self, query, k=10, filter_dict=None):
+        """
+        Benzerlik skorları ile birlikte döküman döndür.
+
+        Args:
+            query (str): Arama sorgusu
+            k (int): Döndürülecek döküman sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+
+        Returns:
+            list: (Document, score) tuple'larının listesi
+        """
+        docs = self.similarity_search(query, k, filter_dict)
+        return [(doc, doc.score) for doc in docs]
+
+    def corpus_version(self):
+        """Yüklü index'in sürümü (corpus'a bağlı cache'leri geçersiz kılmak için)"""
+        return self._corpus_version
+
+    def get_collection_stats(self):
+        """Index istatistiklerini döndür"""
+        return {
+            "total_documents": len(self.chunks),
+            "database": "local",
+            "collection": self.index_dir,
+            "dtype": self.dtype,
+            "query_cache": self.encoder.stats()
+        }
+
+    def health_check(self):
+        """Index'in yüklü olduğunu kontrol et"""
+        return {
+            "status": "healthy",
+            "backend": "local",
+            "documents": len(self.chunks)
+        }
+
+
+def get_local_vectorstore():
+    """
+    Local Vector Store instance oluştur.
+
+    Returns:
+        LocalVectorStore: Vector store instance
+    """
+    return LocalVectorStore()
+
+
+def local_store_exists(index_dir=LOCAL_INDEX_DIR):
+    """
+    Yerel index dosyaları var mı kontrol et.
+
+    Returns:
+        bool: True if index exists
+    """
+    return (
+        os.path.exists(os.path.join(index_dir, EMBEDDINGS_FILE))
+        and os.path.exists(os.path.join(index_dir, CHUNKS_FILE))
+    )
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("MongoDB → Yerel Vektör Index Aktarımı")
+    print("=" * 60)
+
+    count = export_from_mongodb()
+
+    print("\n" + "=" * 60)
+    print(f"✅ İşlem tamamlandı! {count} chunk aktarıldı.")
+    print("   Kullanmak için: VECTOR_BACKEND=local")
+    print("=" * 60)
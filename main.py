@@ -13,10 +13,13 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # Import modules
-from client import create_openrouter_client
-from mongodb_vector_store import get_mongodb_vectorstore, mongodb_store_exists
+from client import create_openrouter_client, warm_up_client
+from vectorstore_factory import get_vectorstore, vectorstore_exists
 from reranker import RerankerService
 from rag_pipeline import RAGPipeline
+from lexical_index import get_lexical_index
+from answer_cache import get_answer_cache
+from config import HYBRID_SEARCH, HTTP_WARMUP
 from cli import run_cli
 
 
@@ -25,30 +28,40 @@ def main():
     
     print("🚀 Initializing Legislation RAG System (MongoDB)...\n")
     
-    # 1. MongoDB'de veri var mı kontrol et
-    if not mongodb_store_exists():
-        print("❌ MongoDB'de döküman bulunamadı!")
+    # 1. Vector store'da veri var mı kontrol et
+    if not vectorstore_exists():
+        print("❌ Vector store'da döküman bulunamadı!")
         print("💡 Lütfen önce preprocessing.py scriptini yerel bilgisayarınızda çalıştırın.")
         print("   python preprocessing.py")
+        print("   (VECTOR_BACKEND=local için ardından: python local_vector_store.py)")
         return
     
     # 2. Create OpenRouter client
     client = create_openrouter_client()
     
-    # 3. MongoDB Vector Store'u yükle (ChromaDB yerine)
-    vectorstore = get_mongodb_vectorstore()
+    # 3. Vector Store'u yükle (VECTOR_BACKEND: mongodb veya local)
+    vectorstore = get_vectorstore()
     stats = vectorstore.get_collection_stats()
-    print(f"✅ MongoDB bağlantısı başarılı: {stats['total_documents']} döküman yüklü\n")
+    print(f"✅ Vector store hazır: {stats['total_documents']} döküman yüklü\n")
     
-    # 4. Initialize reranker
-    reranker = RerankerService()
+    # 4. Initialize reranker (score cache is cleared when the corpus is re-ingested)
+    reranker = RerankerService(corpus_version=vectorstore.corpus_version)
     
-    # 5. Create RAG pipeline
-    rag_pipeline = RAGPipeline(client, vectorstore, reranker)
+    # 5. Build BM25 index for hybrid search (optional)
+    lexical_index = get_lexical_index(vectorstore) if HYBRID_SEARCH else None
+    
+    # 6. Create RAG pipeline (near-identical standalone questions reuse cached answers)
+    rag_pipeline = RAGPipeline(
+        client, vectorstore, reranker, lexical_index=lexical_index, answer_cache=get_answer_cache()
+    )
     
     print("\n✅ Legislation RAG system ready!\n")
     
-    # 6. Run CLI interface
+    # Open the OpenRouter connection before the first question
+    if HTTP_WARMUP:
+        warm_up_client(client)
+    
+    # 7. Run CLI interface
     run_cli(rag_pipeline)
 
 
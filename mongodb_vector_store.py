@@ -4,41 +4,231 @@ MongoDB Atlas Vector Search implementation.
 """
 
 import os
-from pymongo import MongoClient
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype
 from sentence_transformers import SentenceTransformer
+from query_encoder import QueryEncoder
+from documents import Document
+from quantization import quantize_int8, decode_float32_vector
+from resources import (
+    get_mongo_client,
+    get_async_mongo_client,
+    get_embedding_model,
+    get_corpus_version,
+    register_shutdown,
+    mongodb_health
+)
 from config import (
-    MONGO_URI,
     MONGO_DB_NAME,
     MONGO_COLLECTION_NAME,
     MONGO_VECTOR_INDEX_NAME,
     MODEL_CACHE_DIR,
-    EMBEDDING_MODEL
+    EMBEDDING_MODEL,
+    BATCH_SEARCH_MAX_WORKERS,
+    VECTOR_FILTER_FIELDS,
+    EMBEDDING_STORAGE,
+    RESCORE_FACTOR,
+    CORPUS_VERSION_CHECK_INTERVAL
 )
 
 
+def load_embedding_model():
+    """
+    Embedding modelini yükle.
+    Önce yerel klasöre bakar, yoksa HuggingFace'ten indirir.
+    
+    Returns:
+        SentenceTransformer: Embedding modeli
+    """
+    print("🤖 Embedding modeli yükleniyor...")
+    # Modeli yerel klasörden yükle (internetten indirmez!)
+    model_path = os.path.join(MODEL_CACHE_DIR, "embedding_model")
+    
+    if os.path.exists(model_path):
+        print(f"✅ Model yerel klasörden yükleniyor: {model_path}")
+        return SentenceTransformer(model_path)
+    
+    print(f"⚠️  Yerel model bulunamadı, indiriliyor: {EMBEDDING_MODEL}")
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+def build_vector_search_filter(filter_dict):
+    """
+    Metadata filtrelerini $vectorSearch "filter" ifadesine çevir.
+    Sadece vector index'te filter olarak tanımlı alanlar kullanılabilir
+    (bkz. create_vector_index.py). Liste değerleri $in olarak eşleşir.
+    
+    Args:
+        filter_dict (dict): Metadata filtreleri, ör. {"source_dir": "TEBLİĞ"}
+        
+    Returns:
+        dict: $vectorSearch filter ifadesi
+        
+    Raises:
+        ValueError: Index'te tanımlı olmayan bir alan verilirse
+    """
+    conditions = []
+    for key, value in filter_dict.items():
+        if key not in VECTOR_FILTER_FIELDS:
+            raise ValueError(
+                f"'{key}' alanı ile filtrelenemez. Kullanılabilir alanlar: {', '.join(VECTOR_FILTER_FIELDS)}"
+            )
+        if isinstance(value, (list, tuple, set)):
+            conditions.append({f"metadata.{key}": {"$in": list(value)}})
+        else:
+            conditions.append({f"metadata.{key}": {"$eq": value}})
+    
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
 class MongoDBVectorStore:
     """MongoDB Atlas Vector Search Wrapper"""
     
     def __init__(self):
         """Initialize MongoDB connection and embedding model"""
         print("🔌 MongoDB Atlas'a bağlanılıyor...")
-        self.client = MongoClient(MONGO_URI)
+        # Client ve model süreç genelinde paylaşılır (bkz. resources.py)
+        self.client = get_mongo_client()
         self.db = self.client[MONGO_DB_NAME]
         self.collection = self.db[MONGO_COLLECTION_NAME]
         
-        print("🤖 Embedding modeli yükleniyor...")
-        # Modeli yerel klasörden yükle (internetten indirmez!)
-        model_path = os.path.join(MODEL_CACHE_DIR, "embedding_model")
+        self.model = get_embedding_model()
+        self.encoder = QueryEncoder(self.model)
+        self._executor = None
         
-        if os.path.exists(model_path):
-            print(f"✅ Model yerel klasörden yükleniyor: {model_path}")
-            self.model = SentenceTransformer(model_path)
-        else:
-            print(f"⚠️  Yerel model bulunamadı, indiriliyor: {EMBEDDING_MODEL}")
-            self.model = SentenceTransformer(EMBEDDING_MODEL)
+        # int8 saklamada index sıkıştırılmış vektörleri arar, adaylar
+        # embedding_full (float32) ile yeniden skorlanır
+        self.rescore = EMBEDDING_STORAGE == "int8"
+        
+        self._corpus_version = None
+        self._corpus_version_checked_at = None
         
         print("✅ MongoDB Vector Store hazır!")
     
+    def _query_vector_value(self, query_vector):
+        """Sorgu vektörünü index'teki vektör tipine uygun biçime çevir"""
+        if self.rescore:
+            # int8 index'i int8 sorgu vektörüyle aranır; cosine ölçekten bağımsızdır
+            codes, _ = quantize_int8(query_vector)
+            return Binary.from_vector(codes.tolist(), BinaryVectorDtype.INT8)
+        return np.asarray(query_vector).tolist()
+    
+    def _build_pipeline(self, query_vector, k, filter_dict=None):
+        """
+        MongoDB Vector Search aggregation pipeline'ı oluştur.
+        
+        Args:
+            query_vector (np.ndarray): Sorgu vektörü
+            k (int): Döndürülecek döküman sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+            
+        Returns:
+            list: Aggregation pipeline
+        """
+        # Yeniden skorlama için daha geniş aday kümesi getir
+        limit = k * RESCORE_FACTOR if self.rescore else k
+        
+        vector_search = {
+            "index": MONGO_VECTOR_INDEX_NAME,
+            "path": "embedding",
+            "queryVector": self._query_vector_value(query_vector),
+            "numCandidates": limit * 10,  # Daha iyi sonuçlar için fazla aday tara
+            "limit": limit
+        }
+        
+        # Filtreler index içinde ön-filtre olarak uygulanır: sadece filtreye uyan
+        # adaylar taranır ve k sonuç filtreden sonra değil, filtre içinden gelir
+        if filter_dict:
+            vector_search["filter"] = build_vector_search_filter(filter_dict)
+        
+        projection = {
+            "content": 1,
+            "metadata": 1,
+            "score": {"$meta": "vectorSearchScore"}
+        }
+        if self.rescore:
+            projection["embedding_full"] = 1
+        
+        return [
+            {"$vectorSearch": vector_search},
+            {"$project": projection}
+        ]
+    
+    def _rescore(self, results, query_vector, k):
+        """
+        Sıkıştırılmış vektörlerle bulunan adayları float32 vektörlerle yeniden skorla.
+        
+        Args:
+            results (list): Aggregation sonuçları (embedding_full alanı ile)
+            query_vector (np.ndarray): Sorgu vektörü
+            k (int): Döndürülecek sonuç sayısı
+            
+        Returns:
+            list: Tam hassasiyetli skora göre sıralı ilk k sonuç
+        """
+        if not results:
+            return results
+        
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / np.linalg.norm(query)
+        
+        for result in results:
+            full = result.pop("embedding_full", None)
+            if full is None:
+                continue  # Eski biçimdeki dökümanlar index skorunu korur
+            full = decode_float32_vector(full)
+            cosine = float(full @ query / np.linalg.norm(full))
+            # Atlas vectorSearchScore ile aynı ölçek: (1 + cosine) / 2
+            result["score"] = (1 + cosine) / 2
+        
+        results.sort(key=lambda result: result.get("score", 0), reverse=True)
+        return results[:k]
+    
+    def _run_pipeline(self, pipeline, query_vector=None, k=None):
+        """
+        Pipeline'ı çalıştır ve sonuçları Document formatına çevir.
+        
+        Args:
+            pipeline (list): Aggregation pipeline
+            query_vector (np.ndarray): Sorgu vektörü (yeniden skorlama için)
+            k (int): Döndürülecek döküman sayısı (yeniden skorlama için)
+            
+        Returns:
+            list: Document objelerinin listesi
+        """
+        results = list(self.collection.aggregate(pipeline))
+        return self._to_documents(results, query_vector, k)
+    
+    async def _arun_pipeline(self, pipeline, query_vector=None, k=None):
+        """Async counterpart of _run_pipeline (AsyncMongoClient, event loop is not blocked)"""
+        cursor = await self._async_collection().aggregate(pipeline)
+        results = await cursor.to_list(None)
+        return self._to_documents(results, query_vector, k)
+    
+    def _async_collection(self):
+        """Chunk koleksiyonu, paylaşılan AsyncMongoClient üzerinden"""
+        return get_async_mongo_client()[MONGO_DB_NAME][MONGO_COLLECTION_NAME]
+    
+    def _to_documents(self, results, query_vector=None, k=None):
+        """Aggregation sonuçlarını (gerekirse yeniden skorlayıp) Document listesine çevir"""
+        if self.rescore:
+            results = self._rescore(results, query_vector, k)
+        
+        return [
+            Document(
+                result['content'],
+                result.get('metadata', {}),
+                result.get('score', 0),
+                str(result['_id'])
+            )
+            for result in results
+        ]
+    
     def similarity_search(self, query, k=10, filter_dict=None):
         """
         MongoDB Vector Search ile benzer dökümanları bul.
@@ -51,51 +241,94 @@ class MongoDBVectorStore:
         Returns:
             list: Document objelerinin listesi (LangChain formatında)
         """
-        # 1. Sorguyu vektöre çevir
-        query_vector = self.model.encode(query).tolist()
-        
-        # 2. MongoDB Vector Search pipeline oluştur
-        pipeline = [
-            {
-                "$vectorSearch": {
-                    "index": MONGO_VECTOR_INDEX_NAME,
-                    "path": "embedding",
-                    "queryVector": query_vector,
-                    "numCandidates": k * 10,  # Daha iyi sonuçlar için fazla aday tara
-                    "limit": k
-                }
-            },
-            {
-                "$project": {
-                    "content": 1,
-                    "metadata": 1,
-                    "score": {"$meta": "vectorSearchScore"}
-                }
-            }
+        # 1. Sorguyu vektöre çevir (tekrar eden sorgular cache'ten gelir)
+        query_vector = self.encoder.encode(query)
+        
+        # 2. Pipeline'ı oluştur ve çalıştır
+        pipeline = self._build_pipeline(query_vector, k, filter_dict)
+        return self._run_pipeline(pipeline, query_vector, k)
+    
+    def similarity_search_batch(self, queries, k=10, filter_dict=None):
+        """
+        Birden fazla sorgu için benzer dökümanları bul.
+        Tüm sorgular tek model.encode çağrısıyla vektöre çevrilir,
+        $vectorSearch sorguları ortak MongoClient havuzu üzerinden eşzamanlı çalışır.
+        
+        Args:
+            queries (list): Arama sorguları
+            k (int): Her sorgu için döndürülecek döküman sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+            
+        Returns:
+            list: Her sorgu için Document listesi (sorgu sırasıyla)
+        """
+        if not queries:
+            return []
+        
+        query_vectors = self.encoder.encode_batch(queries)
+        pipelines = [
+            self._build_pipeline(vector, k, filter_dict)
+            for vector in query_vectors
         ]
         
-        # 3. Filter ekle (opsiyonel)
-        if filter_dict:
-            match_stage = {"$match": {}}
-            for key, value in filter_dict.items():
-                match_stage["$match"][f"metadata.{key}"] = value
-            pipeline.insert(1, match_stage)
+        if len(pipelines) == 1:
+            return [self._run_pipeline(pipelines[0], query_vectors[0], k)]
+        return list(self._get_executor().map(
+            self._run_pipeline, pipelines, query_vectors, [k] * len(pipelines)
+        ))
+    
+    async def asimilarity_search(self, query, k=10, filter_dict=None, executor=None):
+        """
+        Async similarity_search: encoding runs in the executor (CPU-bound),
+        $vectorSearch on the AsyncMongoClient.
         
-        # 4. Sorguyu çalıştır
-        results = list(self.collection.aggregate(pipeline))
+        Args:
+            query (str): Arama sorgusu
+            k (int): Döndürülecek döküman sayısı
+            filter_dict (dict): Metadata filtreleri (opsiyonel)
+            executor: Encode için thread havuzu (None = loop'un varsayılanı)
+            
+        Returns:
+            list: Document objelerinin listesi
+        """
+        loop = asyncio.get_running_loop()
+        query_vector = await loop.run_in_executor(executor, self.encoder.encode, query)
+        pipeline = self._build_pipeline(query_vector, k, filter_dict)
+        return await self._arun_pipeline(pipeline, query_vector, k)
+    
+    async def asimilarity_search_batch(self, queries, k=10, filter_dict=None, executor=None):
+        """
+        Async similarity_search_batch: one encode_batch call in the executor,
+        then all $vectorSearch queries concurrently on the event loop.
         
-        # 5. LangChain Document formatına çevir
-        documents = []
-        for result in results:
-            # Document benzeri obje oluştur
-            doc = type('Document', (), {
-                'page_content': result['content'],
-                'metadata': result.get('metadata', {}),
-                'score': result.get('score', 0)
-            })()
-            documents.append(doc)
+        Returns:
+            list: Her sorgu için Document listesi (sorgu sırasıyla)
+        """
+        if not queries:
+            return []
         
-        return documents
+        loop = asyncio.get_running_loop()
+        query_vectors = await loop.run_in_executor(executor, self.encoder.encode_batch, queries)
+        return list(await asyncio.gather(*[
+            self._arun_pipeline(self._build_pipeline(vector, k, filter_dict), vector, k)
+            for vector in query_vectors
+        ]))
+    
+    def _get_executor(self):
+        """Batch aramalar için thread havuzunu döndür (ilk kullanımda oluşturulur)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=BATCH_SEARCH_MAX_WORKERS,
+                thread_name_prefix="vector-search"
+            )
+            register_shutdown(self.close)
+        return self._executor
+    
+    def close(self):
+        """Thread pool'u kapat (client paylaşılır, resources.shutdown() kapatır)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
     
     def similarity_search_with_score(self, query, k=10, filter_dict=None):
         """
@@ -112,30 +345,37 @@ class MongoDBVectorStore:
         docs = self.similarity_search(query, k, filter_dict)
         return [(doc, doc.score) for doc in docs]
     
+    def corpus_version(self):
+        """
+        Corpus sürümü (ingestion'da değişir); MongoDB'ye en fazla
+        CORPUS_VERSION_CHECK_INTERVAL saniyede bir sorulur.
+        
+        Returns:
+            str: Sürüm kimliği (bilinmiyorsa None)
+        """
+        now = time.monotonic()
+        checked_at = self._corpus_version_checked_at
+        if checked_at is None or now - checked_at >= CORPUS_VERSION_CHECK_INTERVAL:
+            try:
+                self._corpus_version = get_corpus_version()
+            except Exception as e:
+                print(f"⚠️  Corpus sürümü okunamadı: {e}")
+            self._corpus_version_checked_at = now
+        return self._corpus_version
+    
     def get_collection_stats(self):
         """Koleksiyon istatistiklerini döndür"""
         count = self.collection.count_documents({})
         return {
             "total_documents": count,
             "database": MONGO_DB_NAME,
-            "collection": MONGO_COLLECTION_NAME
+            "collection": MONGO_COLLECTION_NAME,
+            "query_cache": self.encoder.stats()
         }
     
     def health_check(self):
         """MongoDB bağlantısını kontrol et"""
-        try:
-            self.client.admin.command('ping')
-            count = self.collection.count_documents({})
-            return {
-                "status": "healthy",
-                "mongodb": "connected",
-                "documents": count
-            }
-        except Exception as e:
-            return {
-                "status": "unhealthy",
-                "error": str(e)
-            }
+        return mongodb_health()
 
 
 def get_mongodb_vectorstore():
@@ -157,11 +397,9 @@ def mongodb_store_exists():
         bool: True if documents exist
     """
     try:
-        client = MongoClient(MONGO_URI)
-        db = client[MONGO_DB_NAME]
-        collection = db[MONGO_COLLECTION_NAME]
-        count = collection.count_documents({})
-        return count > 0
+        collection = get_mongo_client()[MONGO_DB_NAME][MONGO_COLLECTION_NAME]
+        # Tüm koleksiyonu saymak yerine tek döküman yeterli
+        return collection.find_one({}, {"_id": 1}) is not None
     except Exception as e:
         print(f"❌ MongoDB bağlantı hatası: {e}")
         return False
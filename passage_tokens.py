@@ -0,0 +1,201 @@
+"""
+Pre-tokenized passage store for the reranker
+Chunk metinleri değişmediği için reranker tokenizer'ı ile bir kez (ingestion'da)
+tokenize edilir ve yan dosyada saklanır. Sorgu anında sadece sorgu tokenize
+edilir; (sorgu, pasaj) çifti tokenizer'ın post-processor'ı ile birleştirilir
+(truncation + özel tokenlar), sonuç FlashRank'ın pair encoding'i ile aynıdır.
+
+Yan dosyayı oluşturma (MongoDB'deki tüm chunk'lar):
+    python passage_tokens.py
+"""
+
+import os
+import pickle
+import threading
+from tokenizers import Tokenizer
+from config import PASSAGE_TOKENS_DIR, RERANKER_MODEL
+
+
+def _unpadded_copy(tokenizer):
+    """Aynı tokenizer, padding kapalı (tekil encoding'ler batch'e göre doldurulmasın)"""
+    copy = Tokenizer.from_str(tokenizer.to_str())
+    copy.no_padding()
+    return copy
+
+
+class PassageTokenStore:
+    """Chunk id -> passage Encoding (without special tokens), persisted as a sidecar file"""
+
+    def __init__(self, tokenizer, model_name=RERANKER_MODEL, directory=PASSAGE_TOKENS_DIR):
+        """
+        Load the sidecar file if it exists.
+
+        Args:
+            tokenizer: Reranker'ın tokenizers.Tokenizer'ı (truncation/padding ayarlı)
+            model_name (str): Reranker model adı (token id'leri modele özgüdür)
+            directory (str): Yan dosya klasörü
+        """
+        self.tokenizer = _unpadded_copy(tokenizer)
+        self.padding = tokenizer.padding
+        self.model_name = model_name
+        self.path = os.path.join(directory, f"{model_name}.pkl")
+
+        self.encodings = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Yan dosyayı yükle (başka bir modele aitse yok say)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("model") == self.model_name:
+            self.encodings = data["encodings"]
+            print(f"✅ {len(self.encodings)} pre-tokenized passage yüklendi: {self.path}")
+
+    def save(self):
+        """Yeni tokenize edilen pasajlar varsa yan dosyayı atomik olarak yaz"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"model": self.model_name, "encodings": dict(self.encodings)}
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(self.path + ".tmp", self.path)
+
+    def clear(self):
+        """Corpus yeniden yüklendiğinde eski chunk'ları bırak"""
+        with self._lock:
+            self.encodings = {}
+            self._dirty = True
+
+    def add(self, chunk_ids, texts):
+        """
+        Pasajları tokenize edip store'a ekle (Rust tarafında paralel encode_batch).
+
+        Args:
+            chunk_ids (list): Chunk kimlikleri
+            texts (list): Chunk metinleri
+
+        Returns:
+            dict: Chunk id -> yeni tokenize edilen Encoding
+        """
+        encoded = dict(zip(chunk_ids, self.tokenizer.encode_batch(list(texts), add_special_tokens=False)))
+        with self._lock:
+            self.encodings.update(encoded)
+            self._dirty = True
+        return encoded
+
+    def passage_encodings(self, documents):
+        """
+        Dökümanların pasaj encoding'leri; store'da olmayanlar şimdi tokenize edilir.
+
+        Args:
+            documents (list): Document objeleri
+
+        Returns:
+            list: Encoding listesi (döküman sırasıyla)
+        """
+        # clear() sözlüğü değiştirir, içini boşaltmaz: bu anlık görüntüden kayıt silinmez
+        with self._lock:
+            stored = self.encodings
+
+        missing = {
+            doc.chunk_id: doc.page_content for doc in documents
+            if doc.chunk_id is not None and doc.chunk_id not in stored
+        }
+        added = self.add(list(missing), list(missing.values())) if missing else {}
+
+        result = []
+        for doc in documents:
+            if doc.chunk_id is None:
+                # Kimliksiz pasajlar saklanamaz, her seferinde tokenize edilir
+                result.append(self.tokenizer.encode(doc.page_content, add_special_tokens=False))
+            elif doc.chunk_id in added:
+                result.append(added[doc.chunk_id])
+            else:
+                result.append(stored[doc.chunk_id])
+        return result
+
+    def pair_encodings(self, query, documents):
+        """
+        (sorgu, pasaj) çiftlerinin model girdisine hazır encoding'leri.
+        Sorgu bir kez tokenize edilir; truncation ve özel tokenlar post-processor ile eklenir.
+
+        Args:
+            query (str): Arama sorgusu
+            documents (list): Document objeleri
+
+        Returns:
+            list: Pair Encoding listesi (padding'siz)
+        """
+        query_encoding = self.tokenizer.encode(query, add_special_tokens=False)
+        return [
+            self.tokenizer.post_process(query_encoding, passage, add_special_tokens=True)
+            for passage in self.passage_encodings(documents)
+        ]
+
+    def pad(self, encodings):
+        """
+        Batch'teki en uzun çifte göre padding uygula.
+        Çift encoding'leri her istekte yeni oluşur; store'daki pasajlar değişmez.
+        """
+        length = max(len(encoding.ids) for encoding in encodings)
+        for encoding in encodings:
+            encoding.pad(
+                length,
+                pad_id=self.padding["pad_id"],
+                pad_type_id=self.padding["pad_type_id"],
+                pad_token=self.padding["pad_token"]
+            )
+        return encodings
+
+    def stats(self):
+        """Get store statistics"""
+        return {
+            "passages": len(self.encodings),
+            "model": self.model_name,
+            "path": self.path
+        }
+
+
+def build_passage_store(model_name=RERANKER_MODEL):
+    """
+    MongoDB'deki tüm chunk'ları reranker tokenizer'ı ile tokenize et ve yan dosyaya yaz.
+
+    Args:
+        model_name (str): Reranker model adı (cascade ön eleme modeli için ayrı çağrılır)
+
+    Returns:
+        int: Tokenize edilen chunk sayısı
+    """
+    from resources import get_collection, get_ranker
+
+    ranker = get_ranker(model_name)
+    store = PassageTokenStore(ranker.tokenizer, model_name)
+    store.clear()
+
+    chunk_ids, texts = [], []
+    for doc in get_collection().find({}, {"content": 1}):
+        chunk_ids.append(str(doc["_id"]))
+        texts.append(doc["content"])
+
+    store.add(chunk_ids, texts)
+    store.save()
+    print(f"✅ {len(chunk_ids)} chunk tokenize edildi → {store.path}")
+    return len(chunk_ids)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Reranker Passage Tokenization")
+    print("=" * 60)
+    from config import RERANK_CASCADE, RERANK_PREFILTER_MODEL
+    build_passage_store()
+    if RERANK_CASCADE:
+        build_passage_store(RERANK_PREFILTER_MODEL)
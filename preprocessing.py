@@ -4,19 +4,31 @@ Processes PDF files and uploads to MongoDB Atlas with embeddings
 """
 
 import os
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
 from sentence_transformers import SentenceTransformer
 from document_loader import load_and_process_documents
+from quantization import embedding_fields
+from passage_tokens import build_passage_store
+from thesaurus import build_thesaurus
+from resources import get_mongo_client, get_collection, bump_corpus_version, shutdown
 from config import (
-    MONGO_URI,
     MONGO_DB_NAME,
     MONGO_COLLECTION_NAME,
     EMBEDDING_MODEL,
-    MODEL_CACHE_DIR
+    MODEL_CACHE_DIR,
+    EMBEDDING_STORAGE,
+    RERANK_CASCADE,
+    RERANK_PREFILTER_MODEL
 )
 
 
+def embedding_dim(doc):
+    """Embedding boyutu (float listesi veya BinData vektörü)"""
+    embedding = doc['embedding']
+    if isinstance(embedding, list):
+        return len(embedding)
+    return len(embedding.as_vector().data)
+
+
 def main():
     print("=" * 70)
     print("🚀 MongoDB Preprocessing - PDF Dökümanları Yükleme")
@@ -24,12 +36,11 @@ def main():
     
     # 1. MongoDB Bağlantısı
     print("\n1️⃣ MongoDB'ye bağlanılıyor...")
-    client = MongoClient(MONGO_URI, server_api=ServerApi('1'))
+    client = get_mongo_client()
     client.admin.command('ping')
     print("   ✅ Bağlantı başarılı!")
     
-    db = client[MONGO_DB_NAME]
-    collection = db[MONGO_COLLECTION_NAME]
+    collection = get_collection()
     
     # 2. Mevcut veri kontrolü
     existing_count = collection.count_documents({})
@@ -85,12 +96,12 @@ def main():
             print(f"   İlerleme: {i}/{len(chunks)} ({i*100//len(chunks)}%)")
         
         # Embedding oluştur
-        embedding = model.encode(chunk.page_content).tolist()
+        embedding = model.encode(chunk.page_content)
         
-        # MongoDB dökümanı hazırla
+        # MongoDB dökümanı hazırla (EMBEDDING_STORAGE: float64 liste veya int8 BinData)
         doc = {
             "content": chunk.page_content,
-            "embedding": embedding,
+            **embedding_fields(embedding, EMBEDDING_STORAGE),
             "metadata": chunk.metadata
         }
         
@@ -105,8 +116,26 @@ def main():
     if documents_to_insert:
         collection.insert_many(documents_to_insert)
     
+    # Çalışan sunuculardaki corpus'a bağlı cache'ler geçersiz olsun
+    bump_corpus_version()
     print(f"   ✅ Tüm dökümanlar yüklendi!")
     
+    # Reranker için chunk'ları bir kez tokenize et (yan dosya)
+    print("\n🔤 Chunk'lar reranker tokenizer'ı ile tokenize ediliyor...")
+    try:
+        build_passage_store()
+        if RERANK_CASCADE:
+            build_passage_store(RERANK_PREFILTER_MODEL)
+    except Exception as e:
+        print(f"   ⚠️  Atlandı ({e}); sunucu chunk'ları ilk kullanımda tokenize eder")
+    
+    # Yerel (LLM'siz) query expansion için thesaurus'u corpus'tan çıkar
+    print("\n📖 Query expansion thesaurus'u oluşturuluyor...")
+    try:
+        build_thesaurus([chunk.page_content for chunk in chunks])
+    except Exception as e:
+        print(f"   ⚠️  Atlandı ({e}); 'python thesaurus.py' ile sonradan oluşturulabilir")
+    
     # 6. İstatistikler
     final_count = collection.count_documents({})
     print("\n" + "=" * 70)
@@ -121,7 +150,7 @@ def main():
     if sample:
         print(f"\n📄 Örnek Döküman:")
         print(f"   Content uzunluğu: {len(sample['content'])} karakter")
-        print(f"   Embedding boyutu: {len(sample['embedding'])} dimension")
+        print(f"   Embedding boyutu: {embedding_dim(sample)} dimension")
         print(f"   Metadata: {sample['metadata']}")
     
     # 7. Atlas Search Index Talimatları
@@ -134,13 +163,13 @@ def main():
     print("4. Index Name: vector_index")
     print("5. Aşağıdaki JSON'u yapıştır:\n")
     
-    embedding_dim = len(sample['embedding']) if sample else 384
+    dimensions = embedding_dim(sample) if sample else 384
     print('{')
     print('  "fields": [')
     print('    {')
     print('      "type": "vector",')
     print('      "path": "embedding",')
-    print(f'      "numDimensions": {embedding_dim},')
+    print(f'      "numDimensions": {dimensions},')
     print('      "similarity": "cosine"')
     print('    },')
     print('    {')
@@ -153,7 +182,7 @@ def main():
     print("\n✅ Index oluştuktan sonra Railway'e deploy edebilirsiniz!")
     print("=" * 70)
     
-    client.close()
+    shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+"""
+Compact embedding storage
+Scalar int8 / float16 quantization and BSON BinData vector encoding.
+"""
+
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype
+
+# BSON vector (BinData subtype 9) header: dtype byte + padding byte
+_VECTOR_HEADER_SIZE = 2
+
+
+def quantize_int8(vectors):
+    """
+    Symmetric per-vector scalar quantization: x ≈ codes * scale.
+
+    Args:
+        vectors: (n, d) or (d,) float array
+
+    Returns:
+        tuple: (int8 codes, float32 scales)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=-1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return codes, scales.squeeze(-1).astype(np.float32)
+
+
+def dequantize_int8(codes, scales):
+    """Reconstruct float32 vectors from int8 codes and per-vector scales"""
+    return codes.astype(np.float32) * np.asarray(scales, dtype=np.float32)[..., np.newaxis]
+
+
+def embedding_fields(vector, storage):
+    """
+    MongoDB döküman alanlarını embedding saklama biçimine göre oluştur.
+
+    - "float64": embedding = float listesi (eski biçim, BSON'da 8 byte/boyut + anahtar)
+    - "int8": embedding = int8 BinData vektörü (Atlas index'i bunu arar),
+      embedding_scale = vektör ölçeği, embedding_full = float32 BinData (yeniden skorlama için)
+
+    Args:
+        vector: Embedding vektörü
+        storage (str): "float64" veya "int8"
+
+    Returns:
+        dict: Dökümana eklenecek alanlar
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+
+    if storage == "float64":
+        return {"embedding": vector.tolist()}
+
+    if storage == "int8":
+        codes, scale = quantize_int8(vector)
+        return {
+            "embedding": Binary.from_vector(codes.tolist(), BinaryVectorDtype.INT8),
+            "embedding_scale": float(scale),
+            "embedding_full": Binary.from_vector(vector.tolist(), BinaryVectorDtype.FLOAT32)
+        }
+
+    raise ValueError(f"Bilinmeyen EMBEDDING_STORAGE: {storage} (float64 veya int8)")
+
+
+def decode_float32_vector(value):
+    """
+    BSON float32 BinData vektörünü (veya eski float listesini) numpy dizisine çevir.
+    Binary.as_vector() Python listesi döndürür; burada veri doğrudan okunur.
+    """
+    if isinstance(value, Binary):
+        return np.frombuffer(value, dtype="<f4", offset=_VECTOR_HEADER_SIZE)
+    return np.asarray(value, dtype=np.float32)
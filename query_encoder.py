@@ -0,0 +1,110 @@
+"""
+Query embedding with an LRU cache in front of the SentenceTransformer model
+"""
+
+from cache_utils import LRUCache, normalize_text
+from batching import MicroBatcher
+from resources import register_shutdown
+from config import (
+    QUERY_CACHE_SIZE,
+    QUERY_CACHE_TTL,
+    MICRO_BATCHING,
+    ENCODE_MAX_BATCH_SIZE,
+    ENCODE_MAX_WAIT_MS
+)
+
+
+class QueryEncoder:
+    """Encodes search queries, reusing vectors of recently seen queries"""
+
+    def __init__(self, model, cache_size=QUERY_CACHE_SIZE, cache_ttl=QUERY_CACHE_TTL,
+                 batching=MICRO_BATCHING):
+        """
+        Initialize the encoder.
+
+        Args:
+            model: SentenceTransformer instance
+            cache_size (int): Maximum number of cached query vectors
+            cache_ttl (float): Cache entry lifetime in seconds
+            batching (bool): Merge cache misses of concurrent requests into shared model.encode calls
+        """
+        self.model = model
+        self.cache = LRUCache(cache_size, cache_ttl)
+
+        self.batcher = None
+        if batching:
+            self.batcher = MicroBatcher(
+                self._encode_texts,
+                ENCODE_MAX_BATCH_SIZE,
+                ENCODE_MAX_WAIT_MS,
+                name="encode-batcher"
+            )
+            register_shutdown(self.batcher.close)
+
+    def _encode_texts(self, texts):
+        """One forward pass over a list of texts"""
+        return list(self.model.encode(texts))
+
+    def _encode_misses(self, texts):
+        """Encodes cache misses, through the micro-batcher when enabled"""
+        if self.batcher is not None:
+            return self.batcher.map(texts)
+        return self._encode_texts(texts)
+
+    def encode(self, query):
+        """
+        Returns the embedding vector of a query.
+
+        Args:
+            query (str): Search query
+
+        Returns:
+            np.ndarray: Query vector (read-only, shared between callers)
+        """
+        key = normalize_text(query)
+        vector = self.cache.get(key)
+        if vector is None:
+            if self.batcher is not None:
+                vector = self.batcher.submit(key).result()
+            else:
+                vector = self.model.encode(key)
+            vector.setflags(write=False)
+            self.cache.set(key, vector)
+        return vector
+
+    def encode_batch(self, queries):
+        """
+        Returns the embedding vectors of several queries.
+        Cache misses are encoded together in a single model.encode call
+        (or a shared micro-batch with other requests).
+
+        Args:
+            queries (list): Search queries
+
+        Returns:
+            list: Query vectors in the same order as the queries
+        """
+        keys = [normalize_text(query) for query in queries]
+        vectors = [self.cache.get(key) for key in keys]
+
+        # Aynı sorgu batch içinde birden fazla geçebilir, bir kez encode et
+        missing = list(dict.fromkeys(key for key, vector in zip(keys, vectors) if vector is None))
+        if missing:
+            encoded = dict(zip(missing, self._encode_misses(missing)))
+            for key, vector in encoded.items():
+                vector.setflags(write=False)
+                self.cache.set(key, vector)
+            vectors = [
+                vector if vector is not None else encoded[key]
+                for key, vector in zip(keys, vectors)
+            ]
+
+        return vectors
+
+    def stats(self):
+        """Get query cache statistics"""
+        return self.cache.stats()
+
+    def batching_stats(self):
+        """Get micro-batching queue metrics (None when batching is off)"""
+        return self.batcher.stats() if self.batcher is not None else None
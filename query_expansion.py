@@ -1,21 +1,119 @@
 """
-Query expansion using LLM
+Query expansion using LLM, or locally with the thesaurus (no LLM call)
 """
 
-from config import MODEL_NAME, EXPANSION_TEMPERATURE, EXPANSION_MAX_TOKENS
+import re
+from cache_utils import normalize_text
+from text_processing import turkish_lower
+from expansion_cache import ExpansionCache, expansion_key
+from resources import get_model, register_shutdown
+from llm_calls import complete, acomplete
+from config import (
+    MODEL_NAME,
+    EXPANSION_TEMPERATURE,
+    EXPANSION_MAX_TOKENS,
+    EXPANSION_CACHE,
+    EXPANSION_CACHE_PATH,
+    EXPANSION_CACHE_TTL,
+    EXPANSION_CACHE_MAX_ENTRIES,
+    QUERY_EXPANSION_MODE,
+    MULTI_QUERY_COUNT
+)
 
+# Prompt'u değiştirirken artırın: eski cache kayıtları kullanılmaz
+EXPANSION_PROMPT_VERSION = 1
+MULTI_QUERY_PROMPT_VERSION = 1
 
-def expand_query(client, original_query):
+# "multi": alt sorgular ayrı ayrı aranıp RRF ile birleştirilir (bkz. RAGPipeline)
+EXPANSION_MODES = ("llm", "thesaurus", "multi", "none")
+
+
+def resolve_expansion_mode(mode=None):
     """
-    Expands the user's query with legal terminology and synonyms using the LLM.
+    Validates a per-request expansion mode.
     
     Args:
-        client: OpenAI client instance
-        original_query (str): The original user query
+        mode (str): "llm", "thesaurus", "multi" (LLM sub-queries, each searched
+            separately and fused with RRF) or "none"; None uses QUERY_EXPANSION_MODE
         
     Returns:
-        str: Expanded query with additional legal terms
+        str: Expansion mode
+        
+    Raises:
+        ValueError: Unknown mode
+    """
+    mode = (mode or QUERY_EXPANSION_MODE).strip().lower()
+    if mode not in EXPANSION_MODES:
+        raise ValueError(f"Unknown expansion mode '{mode}'. Available: {', '.join(EXPANSION_MODES)}")
+    return mode
+
+
+def get_expansion_cache():
+    """
+    Süreç başına tek ExpansionCache (fork sonrası yeniden açılır).
+    
+    Returns:
+        ExpansionCache: Paylaşılan cache, EXPANSION_CACHE kapalıysa None
+    """
+    if not EXPANSION_CACHE:
+        return None
+    
+    def open_cache():
+        cache = ExpansionCache(EXPANSION_CACHE_PATH, EXPANSION_CACHE_TTL, EXPANSION_CACHE_MAX_ENTRIES)
+        register_shutdown(cache.close)
+        return cache
+    
+    return get_model("expansion_cache", open_cache)
+
+
+def _resolve_cache(cache=None):
+    """Explicitly passed ExpansionCache, or the shared one"""
+    return cache if cache is not None else get_expansion_cache()
+
+
+def get_cached_expansion(original_query, cache=None):
+    """
+    Expansion from the persistent cache, without calling the LLM.
+    
+    Args:
+        original_query (str): The original user query
+        cache (ExpansionCache): Cache to use (default: get_expansion_cache())
+    
+    Returns:
+        str: Cached expansion, or None
+    """
+    cache = _resolve_cache(cache)
+    if cache is None:
+        return None
+    cached = cache.get(expansion_key(original_query, MODEL_NAME, EXPANSION_PROMPT_VERSION))
+    if cached is not None:
+        print(f"🔍 Expanded Query (cache): {cached}")
+    return cached
+
+
+def _expansion_request(original_query, mode=None, check_cache=True, cache=None):
     """
+    Shared first half of expand_query / aexpand_query: everything except the LLM call.
+    
+    Returns:
+        tuple: (expanded query, None) when no LLM call is needed,
+            or (None, chat.completions.create arguments)
+    """
+    mode = resolve_expansion_mode(mode)
+    if mode == "multi":
+        mode = "llm"  # Tek sorgu bekleyen çağıranlar için
+    if mode == "none":
+        return original_query, None
+    if mode == "thesaurus":
+        from thesaurus import get_thesaurus
+        expanded = get_thesaurus().expand(original_query)
+        print(f"🔍 Expanded Query (thesaurus): {expanded}")
+        return expanded, None
+    
+    cached = get_cached_expansion(original_query, cache) if check_cache else None
+    if cached is not None:
+        return cached, None
+    
     expansion_prompt = f"""Sen uzman bir hukuk asistanısın. Görevin, kullanıcının sorusunu arama motorunda daha iyi sonuç verecek şekilde hukuki terimler ve eş anlamlılarla genişletmektir.
     
 Kurallar:
@@ -25,17 +123,195 @@ Kurallar:
 
 Soru: "{original_query}"
 Genişletilmiş:"""
+    
+    return None, {
+        "model": MODEL_NAME,
+        "messages": [{"role": "user", "content": expansion_prompt}],
+        "temperature": EXPANSION_TEMPERATURE,
+        "max_tokens": EXPANSION_MAX_TOKENS
+    }
+
 
+def _expansion_result(original_query, response, cache=None):
+    """Read the expansion from the LLM response and cache it"""
+    expanded = response.choices[0].message.content
+    print(f"🔍 Expanded Query: {expanded}")
+    # Başarısız genişletmeler (orijinal sorguya dönüş) cache'lenmez
+    cache = _resolve_cache(cache)
+    if cache is not None and expanded:
+        cache.set(expansion_key(original_query, MODEL_NAME, EXPANSION_PROMPT_VERSION), expanded)
+    return expanded
+
+
+def expand_query(client, original_query, mode=None, check_cache=True, cache=None):
+    """
+    Expands the user's query with legal terminology and synonyms.
+    LLM expansions are cached on disk by (normalized question, model, prompt version);
+    thesaurus expansions run locally without any network call.
+    
+    Args:
+        client: OpenAI client instance
+        original_query (str): The original user query
+        mode (str): "llm", "thesaurus" or "none" (default: QUERY_EXPANSION_MODE);
+            "multi" expands like "llm" here, use generate_subqueries for sub-queries
+        check_cache (bool): Look up the cache first (False if the caller already did)
+        cache (ExpansionCache): Cache to use (default: get_expansion_cache())
+        
+    Returns:
+        str: Expanded query with additional legal terms
+    """
+    expanded, request = _expansion_request(original_query, mode, check_cache, cache)
+    if request is None:
+        return expanded
+    
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[{"role": "user", "content": expansion_prompt}],
-            temperature=EXPANSION_TEMPERATURE,
-            max_tokens=EXPANSION_MAX_TOKENS
-        )
-        expanded = response.choices[0].message.content
-        print(f"🔍 Expanded Query: {expanded}")
+        response = complete(client, request, kind="expansion")
+        return _expansion_result(original_query, response, cache)
+    except Exception as e:
+        print(f"⚠️ Expansion failed, using original query. Error: {e}")
+        return original_query
+
+
+async def aexpand_query(client, original_query, mode=None, check_cache=True, cache=None):
+    """
+    Async counterpart of expand_query (client: AsyncOpenAI instance).
+    
+    Returns:
+        str: Expanded query with additional legal terms
+    """
+    expanded, request = _expansion_request(original_query, mode, check_cache, cache)
+    if request is None:
         return expanded
+    
+    try:
+        response = await acomplete(client, request, kind="expansion")
+        return _expansion_result(original_query, response, cache)
     except Exception as e:
         print(f"⚠️ Expansion failed, using original query. Error: {e}")
         return original_query
+
+
+def _subquery_key(original_query, count):
+    return expansion_key(original_query, MODEL_NAME, f"multi-{MULTI_QUERY_PROMPT_VERSION}-{count}")
+
+
+def get_cached_subqueries(original_query, count=MULTI_QUERY_COUNT, cache=None):
+    """
+    Sub-queries from the persistent cache, without calling the LLM.
+    
+    Returns:
+        list: [original query, alternatives...], or None if not cached
+    """
+    cache = _resolve_cache(cache)
+    if cache is None:
+        return None
+    cached = cache.get(_subquery_key(original_query, count))
+    if cached is None:
+        return None
+    print(f"🔍 Sub-queries (cache): {cached.splitlines()}")
+    return [original_query] + cached.splitlines()
+
+
+def parse_subqueries(text, original_query, count):
+    """
+    LLM çıktısını alt sorgulara ayır: numara/madde işaretleri ve tırnaklar
+    temizlenir, orijinal soruyla veya birbiriyle aynı olanlar atılır.
+    
+    Returns:
+        list: En fazla count alternatif sorgu
+    """
+    seen = {turkish_lower(normalize_text(original_query))}
+    alternatives = []
+    for line in (text or "").splitlines():
+        query = re.sub(r'^\s*(?:\d+[.)]|[-*•])\s*', '', line).strip().strip('"\'')
+        key = turkish_lower(normalize_text(query))
+        if query and key not in seen:
+            seen.add(key)
+            alternatives.append(query)
+    return alternatives[:count]
+
+
+def _subquery_request(original_query, count, check_cache=True, cache=None):
+    """
+    Shared first half of generate_subqueries / agenerate_subqueries.
+    
+    Returns:
+        tuple: (cached sub-queries, None) or (None, chat.completions.create arguments)
+    """
+    cached = get_cached_subqueries(original_query, count, cache) if check_cache else None
+    if cached is not None:
+        return cached, None
+    
+    subquery_prompt = f"""Sen uzman bir hukuk asistanısın. Görevin, kullanıcının sorusunu mevzuat veritabanında farklı açılardan arama yapmak için {count} ayrı arama sorgusuna dönüştürmektir.
+
+Kurallar:
+1. Soruyu cevaplama.
+2. Her sorgu sorunun farklı bir yönünü hedeflesin (ilgili kavramlar, yükümlülükler, yaptırımlar, tanımlar).
+3. Hukuki terimleri ve eş anlamlıları kullan; Türkçe karakterlere dikkat et.
+4. Her satıra bir sorgu yaz; numara, açıklama veya başka metin ekleme.
+
+Soru: "{original_query}"
+Sorgular:"""
+    
+    return None, {
+        "model": MODEL_NAME,
+        "messages": [{"role": "user", "content": subquery_prompt}],
+        "temperature": EXPANSION_TEMPERATURE,
+        "max_tokens": EXPANSION_MAX_TOKENS * count
+    }
+
+
+def _subquery_result(original_query, count, response, cache=None):
+    """Parse the sub-queries from the LLM response and cache them"""
+    alternatives = parse_subqueries(response.choices[0].message.content, original_query, count)
+    print(f"🔍 Sub-queries: {alternatives}")
+    cache = _resolve_cache(cache)
+    if cache is not None and alternatives:
+        cache.set(_subquery_key(original_query, count), "\n".join(alternatives))
+    return [original_query] + alternatives
+
+
+def generate_subqueries(client, original_query, count=MULTI_QUERY_COUNT, check_cache=True, cache=None):
+    """
+    Turns the question into several alternative search queries (multi-query retrieval).
+    The original question is always the first sub-query; on failure it is the only one.
+    
+    Args:
+        client: OpenAI client instance
+        original_query (str): The original user query
+        count (int): Number of alternative sub-queries to ask for
+        check_cache (bool): Look up the cache first (False if the caller already did)
+        cache (ExpansionCache): Cache to use (default: get_expansion_cache())
+        
+    Returns:
+        list: [original query, alternatives...]
+    """
+    cached, request = _subquery_request(original_query, count, check_cache, cache)
+    if request is None:
+        return cached
+    
+    try:
+        response = complete(client, request, kind="expansion")
+        return _subquery_result(original_query, count, response, cache)
+    except Exception as e:
+        print(f"⚠️ Sub-query generation failed, using original query. Error: {e}")
+        return [original_query]
+
+
+async def agenerate_subqueries(client, original_query, count=MULTI_QUERY_COUNT, check_cache=True, cache=None):
+    """
+    Async counterpart of generate_subqueries (client: AsyncOpenAI instance).
+    
+    Returns:
+        list: [original query, alternatives...]
+    """
+    cached, request = _subquery_request(original_query, count, check_cache, cache)
+    if request is None:
+        return cached
+    
+    try:
+        response = await acomplete(client, request, kind="expansion")
+        return _subquery_result(original_query, count, response, cache)
+    except Exception as e:
+        print(f"⚠️ Sub-query generation failed, using original query. Error: {e}")
+        return [original_query]
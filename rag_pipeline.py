@@ -2,21 +2,131 @@
 Main RAG pipeline with intelligent memory management
 """
 
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from config import (
     MODEL_NAME,
     TEMPERATURE,
     MAX_TOKENS,
     INITIAL_RETRIEVAL_K,
+    LEXICAL_RETRIEVAL_K,
+    CONTEXT_TOKEN_BUDGET,
+    RERANK_SCORE_THRESHOLD,
+    CONTEXT_MIN_CHUNKS,
     MAX_CONVERSATION_HISTORY,
-    MEMORY_STRATEGY
+    MEMORY_STRATEGY,
+    MEMORY_TOKEN_BUDGET,
+    SEARCH_SCOPES,
+    VECTOR_FILTER_FIELDS,
+    SPECULATIVE_RETRIEVAL,
+    EXPANSION_DEADLINE_MS,
+    MULTI_QUERY_K
 )
-from query_expansion import expand_query
+from query_expansion import (
+    expand_query,
+    get_cached_expansion,
+    resolve_expansion_mode,
+    generate_subqueries,
+    get_cached_subqueries
+)
+from rank_fusion import reciprocal_rank_fusion
+from conversation_memory import message_tokens, summarize_turns
+from llm_calls import complete
+from lexical_index import turkish_lower
+from text_processing import estimate_token_count
+from cache_utils import normalize_text
+from resources import get_model, register_shutdown
+
+# Eşzamanlı istekler için aynı anda beklenebilecek genişletme çağrısı
+EXPANSION_THREADS = 16
+
+
+def _expansion_executor():
+    """Süreç genelinde paylaşılan genişletme thread havuzu"""
+    def create():
+        executor = ThreadPoolExecutor(max_workers=EXPANSION_THREADS, thread_name_prefix="query-expansion")
+        register_shutdown(lambda: executor.shutdown(wait=False))
+        return executor
+    return get_model("expansion_executor", create)
+
+
+def resolve_search_filter(scope=None, filters=None):
+    """
+    Builds the metadata filter for a scoped search.
+    
+    Args:
+        scope (str): Named scope from SEARCH_SCOPES, e.g. "teblig" or "TEBLİĞ" (optional)
+        filters (dict): Explicit metadata filters on VECTOR_FILTER_FIELDS (optional)
+        
+    Returns:
+        dict: Metadata filter, or None for an unscoped search
+        
+    Raises:
+        ValueError: Unknown scope or filter field
+    """
+    filter_dict = {}
+    
+    if scope:
+        # "TEBLİĞ", "Tebliğ" and "teblig" all name the same scope
+        key = turkish_lower(scope.strip()).translate(str.maketrans("ğışçöü", "giscou"))
+        if key not in SEARCH_SCOPES:
+            raise ValueError(f"Unknown scope '{scope}'. Available: {', '.join(SEARCH_SCOPES)}")
+        filter_dict.update(SEARCH_SCOPES[key])
+    
+    if filters:
+        unknown = set(filters) - set(VECTOR_FILTER_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"Cannot filter on {', '.join(sorted(unknown))}. Available: {', '.join(VECTOR_FILTER_FIELDS)}"
+            )
+        filter_dict.update(filters)
+    
+    return filter_dict or None
+
+
+def pack_context(documents, token_budget=CONTEXT_TOKEN_BUDGET,
+                 score_threshold=RERANK_SCORE_THRESHOLD, min_chunks=CONTEXT_MIN_CHUNKS):
+    """
+    Selects the chunks that go into the prompt.
+    Chunks are taken in rerank-score order; those below the score threshold
+    are dropped (the first min_chunks are always kept) and packing stops
+    adding chunks once the token budget is used up.
+    
+    Args:
+        documents (list): Reranked Document objects, best-first
+        token_budget (int): Maximum total tokens of the selected chunks
+        score_threshold (float): Minimum rerank score
+        min_chunks (int): Chunks kept regardless of the threshold (budget permitting)
+        
+    Returns:
+        list: Selected Document objects, best-first
+    """
+    selected = []
+    used_tokens = 0
+    
+    for doc in documents:
+        score = doc.rerank_score
+        if len(selected) >= min_chunks and score is not None and score < score_threshold:
+            break  # Sorted by score: the rest are below the threshold too
+        
+        # Ingestion'da hesaplanan token sayısı; eski chunk'larda tahmin edilir
+        tokens = doc.metadata.get("token_count") or estimate_token_count(doc.page_content)
+        if selected and used_tokens + tokens > token_budget:
+            continue  # Daha kısa, düşük skorlu bir chunk hâlâ sığabilir
+        
+        selected.append(doc)
+        used_tokens += tokens
+    
+    return selected
 
 
 class RAGPipeline:
     """Main RAG Pipeline for Law 6331 Q&A with Smart Memory"""
     
-    def __init__(self, client, vectorstore, reranker, max_history=None):
+    def __init__(self, client, vectorstore, reranker, max_history=None, lexical_index=None,
+                 speculative=SPECULATIVE_RETRIEVAL, answer_cache=None, expansion_cache=None,
+                 expansion_deadline_ms=EXPANSION_DEADLINE_MS):
         """
         Initialize RAG Pipeline.
         
@@ -25,27 +135,257 @@ class RAGPipeline:
             vectorstore: Vector store instance (MongoDB/Chroma)
             reranker: RerankerService instance
             max_history: Maximum conversation history to keep (default from config)
+            lexical_index: LexicalIndex for hybrid BM25 + vector retrieval (optional)
+            speculative: Retrieve with the raw question while the query is being expanded
+            answer_cache: AnswerCache for standalone questions (optional)
+            expansion_cache: ExpansionCache for query expansions (default: the shared one)
+            expansion_deadline_ms: How long retrieval waits for a speculative expansion
         """
         self.client = client
         self.vectorstore = vectorstore
         self.reranker = reranker
+        self.lexical_index = lexical_index
+        self.speculative = speculative
+        self.answer_cache = answer_cache
+        self.expansion_cache = expansion_cache
+        self.expansion_deadline_ms = expansion_deadline_ms
         self.conversation_history = []
         self.max_history = max_history or MAX_CONVERSATION_HISTORY
         self.memory_strategy = MEMORY_STRATEGY
+        self.memory_token_budget = MEMORY_TOKEN_BUDGET
+        
+        # "summarize": evicted turns wait in _pending_turns until folded into the summary
+        self.summary = ""
+        self._pending_turns = []
+        self._memory_lock = threading.Lock()
+        self._memory_generation = 0  # Incremented on reset; stale summaries are dropped
+        self._summary_executor = None
     
     def _manage_conversation_memory(self):
         """
         Intelligent conversation memory management.
         Keeps only recent messages to prevent context overflow.
         """
+        if self.memory_strategy == "summarize":
+            # Token-bounded history; evicted turns are folded into a rolling summary
+            if self._evict_over_token_budget():
+                self._summarize_in_background()
+            return
+        
         if len(self.conversation_history) > self.max_history:
-            if self.memory_strategy == "sliding_window":
-                # Keep only the last N messages
-                self.conversation_history = self.conversation_history[-self.max_history:]
-            elif self.memory_strategy == "summarize":
-                # TODO: Implement conversation summarization
-                # For now, use sliding window
-                self.conversation_history = self.conversation_history[-self.max_history:]
+            # Keep only the last N messages
+            self.conversation_history = self.conversation_history[-self.max_history:]
+    
+    def _evict_over_token_budget(self):
+        """
+        Move the oldest question/answer turns out of the history until it fits
+        memory_token_budget (the latest turn always stays).
+        
+        Returns:
+            list: Evicted messages (now waiting for the summary)
+        """
+        evicted = []
+        with self._memory_lock:
+            history = self.conversation_history
+            while len(history) > 2 and message_tokens(history) > self.memory_token_budget:
+                evicted += history[:2]
+                del history[:2]
+            self._pending_turns += evicted
+            
+            # Özetleme uzun süre başarısız olursa bekleyenler de bütçeyle sınırlı kalsın
+            while len(self._pending_turns) > 2 and message_tokens(self._pending_turns) > self.memory_token_budget:
+                del self._pending_turns[:2]
+        return evicted
+    
+    def _summarize_in_background(self):
+        """Fold pending turns into the summary on one background thread (in order, no request waits)"""
+        if self._summary_executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+            register_shutdown(lambda: executor.shutdown(wait=False))
+            self._summary_executor = executor
+        self._summary_executor.submit(self._update_summary, self._memory_generation)
+    
+    def _update_summary(self, generation):
+        """Background job: summarize the turns pending at this moment"""
+        with self._memory_lock:
+            turns = list(self._pending_turns)
+            summary = self.summary
+        if turns:
+            self._apply_summary(generation, turns, summarize_turns(self.client, summary, turns))
+    
+    def _apply_summary(self, generation, turns, summary):
+        """Install a new summary and drop the turns it covers (unless the conversation was reset)"""
+        with self._memory_lock:
+            if summary is None or generation != self._memory_generation:
+                return
+            self.summary = summary
+            self._pending_turns = [
+                message for message in self._pending_turns
+                if not any(message is turn for turn in turns)
+            ]
+    
+    def _memory_messages(self):
+        """
+        Conversation memory sent with the next question.
+        summarize: summary + turns not summarized yet + token-bounded history;
+        sliding_window: the last messages that fit max_history with the new question.
+        """
+        if self.memory_strategy != "summarize":
+            return self.conversation_history[-(self.max_history - 1):] if self.max_history > 1 else []
+        
+        with self._memory_lock:
+            messages = []
+            if self.summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation:\n{self.summary}"
+                })
+            return messages + self._pending_turns + self.conversation_history
+    
+    def _retrieve(self, search_query, filter_dict=None):
+        """
+        First-stage retrieval. With a lexical index, vector and BM25 rankings
+        are fused with Reciprocal Rank Fusion before reranking.
+        
+        Args:
+            search_query (str): Expanded search query
+            filter_dict (dict): Metadata filter for scoped search (optional)
+            
+        Returns:
+            list: Candidate documents, best-first
+        """
+        vector_docs = self.vectorstore.similarity_search(
+            search_query,
+            k=INITIAL_RETRIEVAL_K,
+            filter_dict=filter_dict
+        )
+        
+        if self.lexical_index is None:
+            return vector_docs
+        
+        lexical_docs = self.lexical_index.search(
+            search_query,
+            k=LEXICAL_RETRIEVAL_K,
+            filter_dict=filter_dict
+        )
+        return reciprocal_rank_fusion(
+            [vector_docs, lexical_docs],
+            limit=INITIAL_RETRIEVAL_K
+        )
+    
+    def _retrieve_lists(self, queries, filter_dict=None, k=MULTI_QUERY_K):
+        """
+        Ranked candidate lists for several queries: the vector store embeds all
+        queries in one batch and searches them concurrently; BM25 lists are
+        added per query in hybrid mode.
+        
+        Returns:
+            list: Document lists (vector lists first, then lexical)
+        """
+        result_lists = self.vectorstore.similarity_search_batch(queries, k=k, filter_dict=filter_dict)
+        if self.lexical_index is not None:
+            result_lists += [
+                self.lexical_index.search(query, k=k, filter_dict=filter_dict)
+                for query in queries
+            ]
+        return result_lists
+    
+    def _multi_query_retrieve(self, user_input, filter_dict=None):
+        """
+        Multi-query retrieval: the LLM rewrites the question into several
+        sub-queries, each is searched and the rankings are fused with RRF.
+        Fusion deduplicates by chunk id, so the reranker scores each passage once.
+        In speculative mode the original question is searched while the
+        sub-queries are being generated.
+        
+        Args:
+            user_input (str): User's question
+            filter_dict (dict): Metadata filter for scoped search (optional)
+            
+        Returns:
+            list: Fused candidate documents, best-first (at most INITIAL_RETRIEVAL_K)
+        """
+        sub_queries = get_cached_subqueries(user_input, cache=self.expansion_cache)
+        if sub_queries is None and not self.speculative:
+            sub_queries = generate_subqueries(
+                self.client, user_input, check_cache=False, cache=self.expansion_cache
+            )
+        
+        if sub_queries is not None:
+            result_lists = self._retrieve_lists(sub_queries, filter_dict)
+        else:
+            deadline = time.perf_counter() + self.expansion_deadline_ms / 1000
+            future = _expansion_executor().submit(
+                generate_subqueries, self.client, user_input, check_cache=False, cache=self.expansion_cache
+            )
+            result_lists = self._retrieve_lists([user_input], filter_dict)
+            try:
+                alternatives = future.result(timeout=max(0.0, deadline - time.perf_counter()))[1:]
+            except FutureTimeoutError:
+                print(f"⏱️ Sub-queries exceeded {self.expansion_deadline_ms} ms, using the original question only")
+                alternatives = []
+            if alternatives:
+                result_lists += self._retrieve_lists(alternatives, filter_dict)
+        
+        return reciprocal_rank_fusion(result_lists, limit=INITIAL_RETRIEVAL_K)
+    
+    def _expand_and_retrieve(self, user_input, filter_dict=None, expansion_mode=None):
+        """
+        Query expansion + first-stage retrieval.
+        In speculative mode, retrieval with the raw question runs while the LLM
+        expands the query. A second retrieval with the expanded query is merged
+        in (RRF) if the expansion arrives before expansion_deadline_ms; a slow
+        or failed expansion leaves the raw candidates.
+        
+        Args:
+            user_input (str): User's question
+            filter_dict (dict): Metadata filter for scoped search (optional)
+            expansion_mode (str): "llm", "thesaurus", "multi" or "none" (default: QUERY_EXPANSION_MODE)
+            
+        Returns:
+            tuple: (query used for reranking, candidate documents)
+        """
+        # Alt sorgular ayrı aranır; reranker orijinal soruyla skorlar
+        mode = resolve_expansion_mode(expansion_mode)
+        if mode == "multi":
+            return user_input, self._multi_query_retrieve(user_input, filter_dict)
+        
+        # Yerel genişletme milisaniyeler sürer, spekülasyona gerek yok
+        if mode != "llm":
+            search_query = expand_query(self.client, user_input, mode, cache=self.expansion_cache)
+            return search_query, self._retrieve(search_query, filter_dict)
+        
+        # Cache'teki genişletmeler için spekülasyona gerek yok
+        cached = get_cached_expansion(user_input, self.expansion_cache)
+        if cached is not None:
+            return cached, self._retrieve(cached, filter_dict)
+        
+        if not self.speculative:
+            search_query = expand_query(
+                self.client, user_input, mode, check_cache=False, cache=self.expansion_cache
+            )
+            return search_query, self._retrieve(search_query, filter_dict)
+        
+        deadline = time.perf_counter() + self.expansion_deadline_ms / 1000
+        expansion = _expansion_executor().submit(
+            expand_query, self.client, user_input, mode, check_cache=False, cache=self.expansion_cache
+        )
+        raw_docs = self._retrieve(user_input, filter_dict)
+        
+        try:
+            search_query = expansion.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeoutError:
+            # Genişletme arka planda bitip cache'e yazılır; bu istek ham sonuçlarla devam eder
+            print(f"⏱️ Expansion exceeded {self.expansion_deadline_ms} ms, using raw-question candidates")
+            return user_input, raw_docs
+        
+        if normalize_text(search_query) == normalize_text(user_input):
+            return user_input, raw_docs  # Genişletme başarısız oldu (orijinal sorgu döndü)
+        
+        expanded_docs = self._retrieve(search_query, filter_dict)
+        # Genişletilmiş sorgunun sonuçları önce: aynı chunk'ta onların objesi kalır
+        merged = reciprocal_rank_fusion([expanded_docs, raw_docs], limit=INITIAL_RETRIEVAL_K)
+        return search_query, merged
     
     def _format_sources(self, documents):
         """
@@ -111,42 +451,68 @@ class RAGPipeline:
         
         return sources
     
-    def generate_response(self, user_input):
+    def _lookup_answer(self, user_input, filter_dict=None, standalone=False):
         """
-        Main RAG Pipeline:
-        1. Expand Query -> 2. Retrieve (Broad) -> 3. Rerank -> 4. Generate Answer
+        Semantic answer cache lookup (Step 0), only for standalone questions:
+        with conversation history the same words can mean a different question.
+        A request is standalone if the client says so (it is answered without
+        history), or if the conversation has no history yet.
         
-        Args:
-            user_input (str): User's question
-            
         Returns:
-            str: Answer with source citations
+            tuple: (cached entry or None, question vector or None)
         """
-        # Step 1: Expand the query
-        search_query = expand_query(self.client, user_input)
+        if self.answer_cache is None:
+            return None, None
+        if not standalone and (self.conversation_history or self.summary):
+            return None, None
         
-        # Step 2: Retrieve broad set of documents
-        initial_docs = self.vectorstore.similarity_search(
-            search_query,
-            k=INITIAL_RETRIEVAL_K
+        # Same vector as the raw-question search: encoded once, reused from the query cache
+        vector = self.vectorstore.encoder.encode(user_input)
+        entry = self.answer_cache.lookup(user_input, vector, filter_dict, self.vectorstore.corpus_version())
+        if entry is not None:
+            print(f"♻️  Cached answer (distance {entry['distance']:.3f}): {entry['question']}")
+        return entry, vector
+    
+    def _store_answer(self, user_input, vector, full_response, response_text, relevant_docs, filter_dict=None):
+        """Cache the answer of a standalone question (vector from _lookup_answer)"""
+        if vector is None:
+            return
+        self.answer_cache.store(
+            user_input, vector, full_response, response_text,
+            [doc.chunk_id for doc in relevant_docs], filter_dict, self.vectorstore.corpus_version()
         )
+    
+    def _prepare_generation(self, user_input, filter_dict=None, expansion_mode=None, standalone=False):
+        """
+        Steps 1-5 shared by the blocking and streaming answers:
+        expand + retrieve, rerank, pack context and build the chat messages
+        (AsyncRAGPipeline runs the same steps without blocking the event loop).
         
-        # Step 3: Rerank documents
-        relevant_docs = self.reranker.rerank_documents(search_query, initial_docs)
+        Returns:
+            tuple: (messages, relevant_docs)
+        """
+        # Step 1-2: Expand the query and retrieve a broad set of documents
+        # (vector, or hybrid with BM25; raw-question retrieval overlaps the expansion)
+        search_query, initial_docs = self._expand_and_retrieve(user_input, filter_dict, expansion_mode)
         
-        # Step 4: Build context
-        context = "\n\n".join([doc.page_content for doc in relevant_docs])
+        # Step 3: Rerank all candidates (scores decide what goes into the prompt)
+        reranked_docs = self.reranker.rerank_documents(search_query, initial_docs, top_k=len(initial_docs))
         
-        # Add user message to conversation history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_input
-        })
+        # Step 4: Build context within the token budget
+        relevant_docs = pack_context(reranked_docs)
         
-        # Manage conversation memory (keep only recent messages)
-        self._manage_conversation_memory()
+        return self._build_messages(user_input, relevant_docs, standalone), relevant_docs
+    
+    def _build_messages(self, user_input, relevant_docs, standalone=False):
+        """
+        Step 5: Construct the prompt from the packed context and conversation memory
+        (no memory for a standalone request).
+        
+        Returns:
+            list: Chat messages for the answer
+        """
+        context = "\n\n".join([doc.page_content for doc in relevant_docs])
         
-        # Step 5: Construct prompt
         rag_prompt = f"""Based on the following excerpts from Law 6331, answer the question.
 
 CRITICAL INSTRUCTIONS:
@@ -163,25 +529,71 @@ Question: {user_input}
 
 Answer (must include article number):"""
         
+        # Previous turns (and, with "summarize", the rolling summary)
+        history = [] if standalone else self._memory_messages()
+        
         messages = [
             {
                 "role": "system",
                 "content": "You are a legal expert specialized ONLY in Turkish Law 6331."
             }
-        ] + self.conversation_history[:-1] + [
+        ] + history + [
             {
                 "role": "user",
                 "content": rag_prompt
             }
         ]
         
-        # Step 6: Generate answer
-        response = self.client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=messages,
-            temperature=TEMPERATURE,
-            max_tokens=MAX_TOKENS
-        )
+        return messages
+    
+    def _remember(self, user_input, response_text):
+        """Add a completed question/answer turn to conversation memory"""
+        self.conversation_history.append({
+            "role": "user",
+            "content": user_input
+        })
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": response_text
+        })
+        
+        # Manage conversation memory (keep only recent messages)
+        self._manage_conversation_memory()
+    
+    def generate_response(self, user_input, scope=None, filters=None, expansion_mode=None, standalone=False):
+        """
+        Main RAG Pipeline:
+        1. Expand Query (+ speculative raw retrieval) -> 2. Retrieve (Broad) -> 3. Rerank -> 4. Generate Answer
+        
+        Args:
+            user_input (str): User's question
+            scope (str): Restrict retrieval to a named scope, e.g. "teblig" (optional)
+            filters (dict): Restrict retrieval by metadata, e.g. {"source_file": "..."} (optional)
+            expansion_mode (str): "llm", "thesaurus", "multi" or "none" for this request (optional)
+            standalone (bool): Answer without conversation memory and leave it unchanged;
+                such questions can be served from the answer cache (optional)
+            
+        Returns:
+            str: Answer with source citations
+        """
+        filter_dict = resolve_search_filter(scope, filters)
+        
+        # Step 0: Near-identical standalone question answered before
+        cached, vector = self._lookup_answer(user_input, filter_dict, standalone)
+        if cached is not None:
+            if not standalone:
+                self._remember(user_input, cached["response"])
+            return cached["answer"]
+        
+        messages, relevant_docs = self._prepare_generation(user_input, filter_dict, expansion_mode, standalone)
+        
+        # Step 6: Generate answer (deadline, hedged request and fallback model: llm_calls.py)
+        response = complete(self.client, {
+            "model": MODEL_NAME,
+            "messages": messages,
+            "temperature": TEMPERATURE,
+            "max_tokens": MAX_TOKENS
+        })
         
         response_text = response.choices[0].message.content
         
@@ -190,26 +602,96 @@ Answer (must include article number):"""
         
         full_response = response_text + sources
         
-        # Add assistant response to conversation history
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": response_text
-        })
-        
-        # Manage memory after adding response
-        self._manage_conversation_memory()
+        # Add the turn to conversation history
+        if not standalone:
+            self._remember(user_input, response_text)
+        self._store_answer(user_input, vector, full_response, response_text, relevant_docs, filter_dict)
         
         return full_response
     
+    def generate_response_stream(self, user_input, scope=None, filters=None, expansion_mode=None, standalone=False):
+        """
+        Streaming variant of generate_response.
+        
+        Yields (event, data) tuples as soon as they are available:
+            ("sources", str): Formatted sources block (before the first token)
+            ("token", str): Answer text as it is generated
+            ("done", str): Full answer with sources, after memory is updated
+        
+        Conversation memory is only updated when the stream completes; if the
+        consumer stops early (client disconnected) the upstream request is closed.
+        A cached answer is sent as a single token. A standalone request neither
+        reads nor updates memory.
+        """
+        filter_dict = resolve_search_filter(scope, filters)
+        
+        cached, vector = self._lookup_answer(user_input, filter_dict, standalone)
+        if cached is not None:
+            yield "sources", cached["answer"][len(cached["response"]):]
+            yield "token", cached["response"]
+            if not standalone:
+                self._remember(user_input, cached["response"])
+            yield "done", cached["answer"]
+            return
+        
+        messages, relevant_docs = self._prepare_generation(user_input, filter_dict, expansion_mode, standalone)
+        
+        # Sources are known before generation starts: send them first
+        sources = self._format_sources(relevant_docs)
+        yield "sources", sources
+        
+        # Step 6: Generate answer token by token
+        stream = complete(self.client, {
+            "model": MODEL_NAME,
+            "messages": messages,
+            "temperature": TEMPERATURE,
+            "max_tokens": MAX_TOKENS,
+            "stream": True
+        }, kind="answer_stream")
+        
+        parts = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield "token", delta
+        finally:
+            # Also runs on GeneratorExit: stop paying for tokens nobody reads
+            stream.close()
+        
+        response_text = "".join(parts)
+        if not standalone:
+            self._remember(user_input, response_text)
+        self._store_answer(user_input, vector, response_text + sources, response_text, relevant_docs, filter_dict)
+        
+        yield "done", response_text + sources
+    
     def reset_conversation(self):
-        """Resets the conversation history"""
-        self.conversation_history = []
+        """Resets the conversation history (and the rolling summary)"""
+        with self._memory_lock:
+            self.conversation_history = []
+            self.summary = ""
+            self._pending_turns = []
+            self._memory_generation += 1
     
     def get_conversation_stats(self):
         """Get conversation memory statistics"""
-        return {
+        stats = {
             "total_messages": len(self.conversation_history),
             "max_allowed": self.max_history,
             "memory_strategy": self.memory_strategy,
             "memory_usage_percent": (len(self.conversation_history) / self.max_history * 100) if self.max_history > 0 else 0
         }
+        if self.memory_strategy == "summarize":
+            history_tokens = message_tokens(self.conversation_history)
+            stats.update({
+                "history_tokens": history_tokens,
+                "token_budget": self.memory_token_budget,
+                "summary_tokens": estimate_token_count(self.summary),
+                "pending_messages": len(self._pending_turns),
+                "memory_usage_percent": history_tokens / self.memory_token_budget * 100 if self.memory_token_budget > 0 else 0
+            })
+        return stats
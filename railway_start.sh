@@ -20,7 +20,7 @@ if [ $? -eq 0 ]; then
     echo "2️⃣ RAG API başlatılıyor..."
     
     # Gunicorn ile production server başlat
-    gunicorn app:app --bind 0.0.0.0:$PORT --workers 1 --timeout 120 --log-level info
+    gunicorn app:app -c gunicorn_config.py --bind 0.0.0.0:$PORT --workers 1 --timeout 120 --log-level info
 else
     echo ""
     echo "❌ MongoDB bağlantı hatası! Environment variables kontrol edin."
@@ -0,0 +1,40 @@
+"""
+Merging of ranked result lists from different retrievers
+"""
+
+from config import RRF_K
+
+
+def doc_key(doc):
+    """Stable identity of a retrieved chunk (chunk id, or content as fallback)"""
+    return doc.chunk_id if getattr(doc, "chunk_id", None) is not None else doc.page_content
+
+
+def reciprocal_rank_fusion(result_lists, k=RRF_K, limit=None):
+    """
+    Fuses several ranked lists with Reciprocal Rank Fusion.
+    Each document scores sum(1 / (k + rank)) over the lists it appears in;
+    duplicates are merged so every chunk appears once.
+
+    Args:
+        result_lists (list): Lists of Document objects, each sorted best-first
+        k (int): RRF damping constant
+        limit (int): Maximum number of documents to return (optional)
+
+    Returns:
+        list: Fused Document list, best-first
+    """
+    fused_scores = {}
+    docs_by_key = {}
+
+    for results in result_lists:
+        for rank, doc in enumerate(results, 1):
+            key = doc_key(doc)
+            fused_scores[key] = fused_scores.get(key, 0.0) + 1.0 / (k + rank)
+            # İlk görülen obje tutulur (vektör sonuçları önce verilirse onların skoru kalır)
+            docs_by_key.setdefault(key, doc)
+
+    ranked = sorted(fused_scores, key=fused_scores.get, reverse=True)
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [docs_by_key[key] for key in ranked]
@@ -2,16 +2,67 @@
 Reranking functionality using FlashRank
 """
 
-from flashrank import Ranker, RerankRequest
-from langchain_core.documents import Document
-from config import RERANKER_MODEL, FLASHRANK_CACHE_DIR, INITIAL_RETRIEVAL_K, TOP_RERANKED_K
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import onnxruntime as ort
+from flashrank import RerankRequest
+from flashrank.Config import model_file_map
+from batching import MicroBatcher
+from cache_utils import LRUCache, text_hash
+from passage_tokens import PassageTokenStore
+from resources import get_ranker, register_shutdown
+from config import (
+    RERANKER_MODEL,
+    INITIAL_RETRIEVAL_K,
+    TOP_RERANKED_K,
+    MICRO_BATCHING,
+    RERANK_MAX_BATCH_SIZE,
+    RERANK_MAX_WAIT_MS,
+    RERANK_CACHE_SIZE,
+    RERANK_CACHE_TTL,
+    RERANK_WORKERS,
+    RERANK_INTRA_OP_THREADS,
+    RERANK_INTER_OP_THREADS,
+    RERANK_CASCADE,
+    RERANK_PREFILTER_MODEL,
+    RERANK_SHORTLIST_K,
+    PASSAGE_TOKENS_DIR
+)
 
 
 class RerankerService:
     """Service for reranking retrieved documents"""
     
-    def __init__(self):
-        """Initialize the reranker model"""
+    def __init__(self, batching=MICRO_BATCHING, corpus_version=None,
+                 cache_size=RERANK_CACHE_SIZE, cache_ttl=RERANK_CACHE_TTL,
+                 workers=RERANK_WORKERS, intra_op_threads=RERANK_INTRA_OP_THREADS,
+                 inter_op_threads=RERANK_INTER_OP_THREADS,
+                 cascade=RERANK_CASCADE, shortlist_k=RERANK_SHORTLIST_K,
+                 ranker=None, prefilter_ranker=None, session_factory=None,
+                 passage_tokens_dir=PASSAGE_TOKENS_DIR):
+        """
+        Initialize the reranker model.
+        
+        Args:
+            batching (bool): Score (query, passage) pairs of concurrent requests
+                in shared cross-encoder forward passes
+            corpus_version (callable): Returns the current corpus version; the score
+                cache is cleared when it changes (e.g. vectorstore.corpus_version)
+            cache_size (int): Maximum number of cached (query, chunk) scores
+            cache_ttl (float): Cache entry lifetime in seconds
+            workers (int): ONNX sessions the passages of one call are sharded across
+            intra_op_threads (int): Threads per session inside one operator (0 = ORT default)
+            inter_op_threads (int): Threads per session across independent operators (0 = ORT default)
+            cascade (bool): Prune candidates with the small RERANK_PREFILTER_MODEL first;
+                the main model scores only the shortlist
+            shortlist_k (int): Candidates kept by the prefilter
+            ranker: FlashRank Ranker (default: shared RERANKER_MODEL instance)
+            prefilter_ranker: Cascade prefilter Ranker (default: shared RERANK_PREFILTER_MODEL instance)
+            session_factory (callable): options -> ONNX session of the cross-encoder, used when
+                workers or thread settings need sessions of their own (default: CPU session)
+            passage_tokens_dir (str): Folder of the pre-tokenized passage sidecar files
+        """
         print("\n⚖️ Loading Reranker Model...")
         import os
         # ChromaDB telemetri kapatma
@@ -19,12 +70,134 @@ class RerankerService:
         os.environ["CHROMA_TELEMETRY"] = "False"
         os.environ["POSTHOG_DISABLED"] = "1"
         
-        self.ranker = Ranker(
-            model_name=RERANKER_MODEL,
-            cache_dir=FLASHRANK_CACHE_DIR
-        )
+        # Ranker süreç genelinde tek instance (bkz. resources.py)
+        self.ranker = ranker if ranker is not None else get_ranker(RERANKER_MODEL)
+        
+        # Cross-encoder skorları (sorgu hash'i, chunk id) ile saklanır
+        self.cache = LRUCache(cache_size, cache_ttl)
+        self.corpus_version = corpus_version
+        self._cached_version = None
+        self._version_lock = threading.Lock()
+        
+        # Pairwise modellerde chunk'lar bir kez tokenize edilir (yan dosyada saklanır)
+        self.passages = None
+        self.sessions = []
+        self._shard_pool = None
+        if getattr(self.ranker, "session", None) is not None:
+            self.passages = PassageTokenStore(self.ranker.tokenizer, RERANKER_MODEL, passage_tokens_dir)
+            register_shutdown(self.passages.save)
+            
+            # Her worker kendi ONNX session'ı ve thread havuzu ile pasajların bir kısmını skorlar
+            self.sessions = self._make_sessions(workers, intra_op_threads, inter_op_threads, session_factory)
+            if len(self.sessions) > 1:
+                self._shard_pool = ThreadPoolExecutor(
+                    max_workers=len(self.sessions),
+                    thread_name_prefix="rerank-shard"
+                )
+                register_shutdown(lambda: self._shard_pool.shutdown(wait=False))
+        
+        # Cascade: küçük model tüm adayları skorlar, büyük model sadece kısa listeyi
+        self.prefilter = None
+        self.prefilter_passages = None
+        self.shortlist_k = shortlist_k
+        if cascade and self.passages is not None:
+            self.prefilter = prefilter_ranker if prefilter_ranker is not None else get_ranker(RERANK_PREFILTER_MODEL)
+            self.prefilter_passages = PassageTokenStore(
+                self.prefilter.tokenizer, RERANK_PREFILTER_MODEL, passage_tokens_dir
+            )
+            register_shutdown(self.prefilter_passages.save)
+            print(f"   Cascade: {RERANK_PREFILTER_MODEL} → ilk {shortlist_k} → {RERANKER_MODEL}")
+        
+        # Micro-batching sadece pairwise (ONNX cross-encoder) modellerde mümkün
+        self.batcher = None
+        if batching and self.passages is not None:
+            self.batcher = MicroBatcher(
+                self._score_encodings,
+                RERANK_MAX_BATCH_SIZE,
+                RERANK_MAX_WAIT_MS,
+                name="rerank-batcher"
+            )
+            register_shutdown(self.batcher.close)
         print("✅ Reranker ready!")
     
+    def _make_sessions(self, workers, intra_op_threads, inter_op_threads, session_factory=None):
+        """
+        ONNX sessions for the cross-encoder.
+        With default settings FlashRank's own session is reused.
+        
+        Args:
+            session_factory (callable): options -> session (default: CPU session on the model file)
+        
+        Returns:
+            list: InferenceSession objects (one per worker)
+        """
+        if workers <= 1 and not intra_op_threads and not inter_op_threads:
+            return [self.ranker.session]
+        
+        options = ort.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        
+        if session_factory is None:
+            model_path = str(self.ranker.model_dir / model_file_map[RERANKER_MODEL])
+            
+            def session_factory(options):
+                return ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        
+        sessions = [session_factory(options) for _ in range(max(workers, 1))]
+        print(f"   {len(sessions)} ONNX session (intra_op={intra_op_threads or 'auto'}, inter_op={inter_op_threads or 'auto'})")
+        return sessions
+    
+    def _run_session(self, session, encodings, passages=None):
+        """One cross-encoder forward pass; same inputs and scoring as FlashRank's pairwise Ranker.rerank"""
+        encodings = (passages if passages is not None else self.passages).pad(encodings)
+        onnx_input = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        }
+        if "token_type_ids" in {model_input.name for model_input in session.get_inputs()}:
+            onnx_input["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        
+        logits = session.run(None, onnx_input)[0]
+        if logits.shape[1] == 1:
+            scores = 1 / (1 + np.exp(-logits.flatten()))
+        else:
+            exp_logits = np.exp(logits)
+            scores = exp_logits[:, 1] / np.sum(exp_logits, axis=1)
+        return scores.tolist()
+    
+    def _score_encodings(self, encodings):
+        """
+        Scores tokenized (query, passage) pairs; pairs may come from different queries.
+        With several sessions the pairs are sorted by length and split into
+        contiguous shards (less padding per shard), scored in parallel and
+        put back in input order.
+        
+        Args:
+            encodings (list): Pair encodings from PassageTokenStore.pair_encodings
+        
+        Returns:
+            list: Relevance scores in the same order
+        """
+        if self._shard_pool is None or len(encodings) < 2 * len(self.sessions):
+            return self._run_session(self.sessions[0], encodings)
+        
+        order = sorted(range(len(encodings)), key=lambda i: len(encodings[i].ids))
+        shards = [shard.tolist() for shard in np.array_split(order, len(self.sessions))]
+        futures = [
+            self._shard_pool.submit(self._run_session, session, [encodings[i] for i in shard])
+            for session, shard in zip(self.sessions, shards)
+        ]
+        
+        scores = [None] * len(encodings)
+        for shard, future in zip(shards, futures):
+            for i, score in zip(shard, future.result()):
+                scores[i] = score
+        return scores
+    
     def rerank_documents(self, query, documents, top_k=TOP_RERANKED_K):
         """
         Reranks documents based on relevance to the query.
@@ -33,31 +206,118 @@ class RerankerService:
             query (str): The search query
             documents (list): List of retrieved documents
             top_k (int): Number of top documents to return
-            
+        
         Returns:
-            list: Reranked list of Document objects
+            list: The same Document objects, best-first, with rerank_score set
         """
         print("⚖️ Reranking documents...")
         
-        # Prepare passages for reranking
+        if self.passages is not None:
+            self._check_corpus_version()
+            
+            # Cascade: the prefilter keeps the shortlist, only it reaches the main model
+            if self.prefilter is not None and len(documents) > self.shortlist_k:
+                coarse = self._cached_scores(query, documents, prefilter=True)
+                order = sorted(range(len(documents)), key=lambda i: coarse[i], reverse=True)
+                documents = [documents[i] for i in order[:self.shortlist_k]]
+            
+            # Pairwise cross-encoder: cached scores + model only for misses
+            scores = self._cached_scores(query, documents)
+            order = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+            relevant_docs = []
+            for i in order[:top_k]:
+                documents[i].rerank_score = scores[i]
+                relevant_docs.append(documents[i])
+            return relevant_docs
+        
+        # Listwise (LLM) rankers order the passages themselves, without scores
+        # Prepare passages for reranking (id = position in the input list)
         passages = [
-            {
-                "id": str(i),
-                "text": doc.page_content,
-                "meta": doc.metadata
-            }
+            {"id": i, "text": doc.page_content}
             for i, doc in enumerate(documents)
         ]
         
         # Rerank
         rerank_request = RerankRequest(query=query, passages=passages)
         results = self.ranker.rerank(rerank_request)
-        top_results = results[:top_k]
         
-        # Convert back to Document objects
-        relevant_docs = [
-            Document(page_content=res['text'], metadata=res['meta'])
-            for res in top_results
-        ]
+        # Return the input objects in reranked order (no new Document copies)
+        relevant_docs = []
+        for res in results[:top_k]:
+            doc = documents[res['id']]
+            # Listwise (LLM) rerankers return an order without scores
+            doc.rerank_score = float(res['score']) if 'score' in res else None
+            relevant_docs.append(doc)
         
         return relevant_docs
+    
+    def _check_corpus_version(self):
+        """Clear the score cache after the corpus was re-ingested"""
+        if self.corpus_version is None:
+            return
+        version = self.corpus_version()
+        # Aynı değişikliği gören iki thread'den sadece biri temizler
+        with self._version_lock:
+            if version == self._cached_version:
+                return
+            if self._cached_version is not None:
+                print("🔄 Corpus değişti, reranker cache temizlendi")
+                self.passages.clear()
+                if self.prefilter_passages is not None:
+                    self.prefilter_passages.clear()
+            self.cache.clear()
+            self._cached_version = version
+    
+    def _cached_scores(self, query, documents, prefilter=False):
+        """
+        Cross-encoder scores for all documents; the model runs only on cache misses.
+        
+        Args:
+            query (str): The search query
+            documents (list): Documents to score
+            prefilter (bool): Score with the cascade's prefilter model instead
+            
+        Returns:
+            list: Scores in the same order as documents
+        """
+        # Prefilter scores share the cache under a model-tagged key
+        query_key = text_hash(query)
+        keys = [
+            None if doc.chunk_id is None
+            else (query_key, doc.chunk_id, RERANK_PREFILTER_MODEL) if prefilter
+            else (query_key, doc.chunk_id)
+            for doc in documents
+        ]
+        scores = [self.cache.get(key) if key is not None else None for key in keys]
+        
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            # Only the query is tokenized here; passages come pre-tokenized
+            passages = self.prefilter_passages if prefilter else self.passages
+            pairs = passages.pair_encodings(query, [documents[i] for i in missing])
+            if prefilter:
+                new_scores = self._run_session(self.prefilter.session, pairs, passages)
+            # Pairs join the shared batch queue when micro-batching is on
+            elif self.batcher is not None:
+                new_scores = self.batcher.map(pairs)
+            else:
+                new_scores = self._score_encodings(pairs)
+            for i, score in zip(missing, new_scores):
+                scores[i] = score
+                if keys[i] is not None:
+                    self.cache.set(keys[i], score)
+        
+        return scores
+    
+    def stats(self):
+        """Get score cache and micro-batching queue metrics"""
+        return {
+            "score_cache": self.cache.stats(),
+            "passage_tokens": self.passages.stats() if self.passages is not None else None,
+            "cascade": {
+                "prefilter_model": RERANK_PREFILTER_MODEL,
+                "shortlist_k": self.shortlist_k,
+                "prefilter_passage_tokens": self.prefilter_passages.stats()
+            } if self.prefilter is not None else None,
+            "batching": self.batcher.stats() if self.batcher is not None else None
+        }
@@ -0,0 +1,214 @@
+"""
+Process-wide shared resources
+Her süreç tek bir MongoClient (bağlantı havuzu) ve her model için tek bir
+instance kullanır. Endpoint'ler ve vector store'lar kaynakları buradan alır,
+kendileri bağlantı açıp model yüklemez.
+
+Kapanışta (atexit veya gunicorn worker_exit) shutdown() tüm kaynakları kapatır.
+"""
+
+import os
+import uuid
+import atexit
+import threading
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.server_api import ServerApi
+from config import (
+    MONGO_URI,
+    MONGO_DB_NAME,
+    MONGO_COLLECTION_NAME,
+    MONGO_META_COLLECTION_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS
+)
+
+_lock = threading.RLock()
+_pid = None
+_mongo_client = None
+_async_mongo_client = None
+_models = {}
+_shutdown_callbacks = []
+
+
+def _check_pid():
+    """
+    Fork sonrası ebeveynden kalan kaynakları bırak.
+    MongoClient fork-safe değildir; her süreç kendi havuzunu açmalıdır.
+    """
+    global _pid, _mongo_client, _async_mongo_client
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _mongo_client = None
+        _async_mongo_client = None
+        _models.clear()
+        _shutdown_callbacks.clear()
+
+
+def get_mongo_client():
+    """
+    Süreç genelinde paylaşılan MongoClient.
+    İlk çağrıda oluşturulur; pymongo bağlantı havuzu thread-safe'tir.
+
+    Returns:
+        MongoClient: Paylaşılan client
+    """
+    global _mongo_client
+    with _lock:
+        _check_pid()
+        if _mongo_client is None:
+            _mongo_client = MongoClient(
+                MONGO_URI,
+                server_api=ServerApi('1'),
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS
+            )
+        return _mongo_client
+
+
+def get_async_mongo_client():
+    """
+    Süreç genelinde paylaşılan AsyncMongoClient (asgi.py).
+    Event loop'a bağlıdır: ilk olarak sunucunun loop'u içinde çağrılmalı,
+    kapanışta close_async_mongo_client() ile aynı loop'ta kapatılmalıdır.
+
+    Returns:
+        AsyncMongoClient: Paylaşılan async client
+    """
+    global _async_mongo_client
+    with _lock:
+        _check_pid()
+        if _async_mongo_client is None:
+            _async_mongo_client = AsyncMongoClient(
+                MONGO_URI,
+                server_api=ServerApi('1'),
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS
+            )
+        return _async_mongo_client
+
+
+async def close_async_mongo_client():
+    """Async client'ı kapat (ASGI lifespan shutdown)"""
+    global _async_mongo_client
+    with _lock:
+        client, _async_mongo_client = _async_mongo_client, None
+    if client is not None:
+        await client.close()
+
+
+def get_collection():
+    """Paylaşılan client üzerinden chunk koleksiyonu"""
+    return get_mongo_client()[MONGO_DB_NAME][MONGO_COLLECTION_NAME]
+
+
+def get_corpus_version():
+    """
+    Mevcut corpus sürümü (ingestion her çalıştığında değişir).
+
+    Returns:
+        str: Sürüm kimliği, hiç ingestion kaydı yoksa None
+    """
+    meta = get_mongo_client()[MONGO_DB_NAME][MONGO_META_COLLECTION_NAME]
+    doc = meta.find_one({"_id": "corpus"})
+    return doc["version"] if doc else None
+
+
+def bump_corpus_version():
+    """
+    Ingestion sonrası corpus sürümünü yenile.
+    Sürüme bağlı cache'ler (ör. reranker skorları) bir sonraki kontrolde temizlenir.
+
+    Returns:
+        str: Yeni sürüm kimliği
+    """
+    version = uuid.uuid4().hex
+    meta = get_mongo_client()[MONGO_DB_NAME][MONGO_META_COLLECTION_NAME]
+    meta.update_one({"_id": "corpus"}, {"$set": {"version": version}}, upsert=True)
+    return version
+
+
+def get_model(name, loader):
+    """
+    Model registry: her isim için süreç başına tek instance.
+
+    Args:
+        name (str): Model anahtarı, ör. "embedding", "reranker"
+        loader (callable): İlk çağrıda modeli yükleyen fonksiyon
+
+    Returns:
+        object: Paylaşılan model instance
+    """
+    with _lock:
+        _check_pid()
+        if name not in _models:
+            _models[name] = loader()
+        return _models[name]
+
+
+def get_embedding_model():
+    """Paylaşılan SentenceTransformer embedding modeli"""
+    from mongodb_vector_store import load_embedding_model
+    return get_model("embedding", load_embedding_model)
+
+
+def get_ranker(model_name):
+    """Paylaşılan FlashRank Ranker (model başına tek instance)"""
+    from flashrank import Ranker
+    from config import FLASHRANK_CACHE_DIR
+    return get_model(f"reranker:{model_name}", lambda: Ranker(
+        model_name=model_name,
+        cache_dir=FLASHRANK_CACHE_DIR
+    ))
+
+
+def register_shutdown(callback):
+    """Kapanışta çağrılacak temizlik fonksiyonu ekle (ör. thread pool kapatma)"""
+    with _lock:
+        _check_pid()
+        _shutdown_callbacks.append(callback)
+
+
+def mongodb_health():
+    """
+    Paylaşılan client ile MongoDB bağlantısını kontrol et.
+    Döküman sayısı koleksiyon metadata'sından okunur (tarama yapılmaz).
+
+    Returns:
+        dict: Sağlık durumu
+    """
+    try:
+        client = get_mongo_client()
+        client.admin.command('ping')
+        return {
+            "status": "healthy",
+            "mongodb": "connected",
+            "documents": get_collection().estimated_document_count()
+        }
+    except Exception as e:
+        return {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+
+
+def shutdown():
+    """Tüm paylaşılan kaynakları kapat (birden fazla çağrılabilir)"""
+    global _mongo_client
+    with _lock:
+        if _pid != os.getpid():
+            return  # Bu süreç hiç kaynak açmadı
+
+        callbacks, _shutdown_callbacks[:] = list(_shutdown_callbacks), []
+        for callback in reversed(callbacks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Kapanış hatası: {e}")
+
+        if _mongo_client is not None:
+            _mongo_client.close()
+            _mongo_client = None
+        _models.clear()
+
+
+atexit.register(shutdown)
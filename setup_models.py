@@ -9,7 +9,14 @@ import os
 from pathlib import Path
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 from flashrank import Ranker
-from config import EMBEDDING_MODEL, RERANKER_MODEL, FLASHRANK_CACHE_DIR, MODEL_CACHE_DIR
+from config import (
+    EMBEDDING_MODEL,
+    RERANKER_MODEL,
+    FLASHRANK_CACHE_DIR,
+    MODEL_CACHE_DIR,
+    RERANK_CASCADE,
+    RERANK_PREFILTER_MODEL
+)
 
 # ChromaDB telemetri kapatma
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
@@ -54,6 +61,14 @@ def setup_models():
     )
     print("✅ Reranker model hazır!")
     
+    if RERANK_CASCADE:
+        print(f"\n📥 Cascade ön eleme modeli indiriliyor: {RERANK_PREFILTER_MODEL}")
+        Ranker(
+            model_name=RERANK_PREFILTER_MODEL,
+            cache_dir=FLASHRANK_CACHE_DIR
+        )
+        print("✅ Ön eleme modeli hazır!")
+    
     print("\n" + "=" * 60)
     print("✅ Tüm modeller başarıyla indirildi!")
     print("\nModeller şu dizinlerde:")
@@ -4,8 +4,8 @@ Simple Flask server for testing Admin Panel connection
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from pymongo import MongoClient
-from config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION_NAME
+from config import MONGO_DB_NAME, MONGO_COLLECTION_NAME
+from resources import get_collection, mongodb_health
 
 app = Flask(__name__)
 CORS(app)
@@ -14,19 +14,17 @@ CORS(app)
 def health():
     """Health check endpoint"""
     try:
-        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-        db = client[MONGO_DB_NAME]
-        collection = db[MONGO_COLLECTION_NAME]
-        
-        count = collection.count_documents({})
-        client.close()
+        # Paylaşılan client ile ping (her probe'da yeni bağlantı açılmaz)
+        health = mongodb_health()
+        if health['status'] != 'healthy':
+            raise Exception(health['error'])
         
         return jsonify({
             'status': 'healthy',
             'message': 'Legislation RAG API is running',
             'mongodb': {
                 'connected': True,
-                'documents': count
+                'documents': health['documents']
             }
         }), 200
     except Exception as e:
@@ -39,9 +37,7 @@ def health():
 def stats():
     """Get database statistics"""
     try:
-        client = MongoClient(MONGO_URI)
-        db = client[MONGO_DB_NAME]
-        collection = db[MONGO_COLLECTION_NAME]
+        collection = get_collection()
         
         total_docs = collection.count_documents({})
         
@@ -53,8 +49,6 @@ def stats():
         result = list(collection.aggregate(pipeline))
         total_files = result[0]['total_files'] if result else 0
         
-        client.close()
-        
         return jsonify({
             'status': 'success',
             'total_documents': total_docs,
@@ -115,12 +109,7 @@ def reset():
 def get_doc_count():
     """Get document count from MongoDB"""
     try:
-        client = MongoClient(MONGO_URI)
-        db = client[MONGO_DB_NAME]
-        collection = db[MONGO_COLLECTION_NAME]
-        count = collection.count_documents({})
-        client.close()
-        return count
+        return get_collection().estimated_document_count()
     except:
         return 0
 
@@ -9,6 +9,7 @@ echo "📍 Using PORT: $PORT"
 
 # Start gunicorn
 exec gunicorn app:app \
+  --config gunicorn_config.py \
   --bind "0.0.0.0:$PORT" \
   --workers 1 \
   --timeout 120 \
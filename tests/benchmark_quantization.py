@@ -0,0 +1,113 @@
+"""
+Benchmark: quantized embedding storage vs float32/float64
+Reports per-chunk storage size and recall@k of compact search with and
+without full-precision rescoring.
+
+Uses the local index (vector_index/) if present, otherwise synthetic data:
+    python tests/benchmark_quantization.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from bson import encode
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import LOCAL_INDEX_DIR, RESCORE_FACTOR
+from quantization import quantize_int8, embedding_fields
+
+K = 10
+NUM_QUERIES = 200
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def load_vectors():
+    """Local index matrix, or clustered synthetic 384-d vectors"""
+    path = os.path.join(LOCAL_INDEX_DIR, "embeddings.npy")
+    if os.path.exists(path):
+        print(f"📂 Yerel index kullanılıyor: {path}")
+        return np.load(path)
+
+    print("🎲 Yerel index yok, sentetik veri kullanılıyor (20000 x 384)")
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(200, 384))
+    vectors = centers[rng.integers(0, 200, 20000)] + 0.6 * rng.normal(size=(20000, 384))
+    return _normalize(vectors)
+
+
+def storage_report(vectors):
+    """BSON bytes per chunk for each MongoDB storage mode"""
+    print("\n💾 MongoDB döküman başına embedding boyutu (BSON)")
+    float64_size = len(encode(embedding_fields(vectors[0], "float64")))
+    int8_fields = embedding_fields(vectors[0], "int8")
+    int8_index_size = len(encode({"embedding": int8_fields["embedding"]}))
+    int8_total_size = len(encode(int8_fields))
+
+    print(f"   float64 liste       : {float64_size:6d} byte")
+    print(f"   int8 (index alanı)  : {int8_index_size:6d} byte  ({float64_size / int8_index_size:.1f}x küçük)")
+    print(f"   int8 + float32 tam  : {int8_total_size:6d} byte  ({float64_size / int8_total_size:.1f}x küçük)")
+
+    n, d = vectors.shape
+    print(f"\n💾 Yerel arama matrisi ({n} chunk)")
+    for name, itemsize in (("float32", 4), ("float16", 2), ("int8", 1)):
+        print(f"   {name:8s}: {n * d * itemsize / 1e6:8.1f} MB")
+
+
+def compact_scores(queries, vectors, dtype):
+    """Approximate scores on the compact matrix"""
+    if dtype == "float16":
+        return queries @ vectors.astype(np.float16).astype(np.float32).T
+    codes, scales = quantize_int8(vectors)
+    return (queries @ codes.astype(np.float32).T) * scales
+
+
+def recall(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def recall_report(vectors):
+    """recall@K vs exact float32 search, with and without rescoring"""
+    rng = np.random.default_rng(1)
+    rows = rng.choice(len(vectors), NUM_QUERIES, replace=False)
+    queries = _normalize(vectors[rows] + 0.05 * rng.normal(size=(NUM_QUERIES, vectors.shape[1])))
+
+    exact = queries @ vectors.T
+    truth = np.argsort(-exact, axis=1)[:, :K]
+
+    print(f"\n🎯 recall@{K} (referans: tam float32 arama, {NUM_QUERIES} sorgu)")
+    for dtype in ("float16", "int8"):
+        start = time.time()
+        approx = compact_scores(queries, vectors, dtype)
+        plain = np.argsort(-approx, axis=1)[:, :K]
+
+        candidates = np.argsort(-approx, axis=1)[:, :K * RESCORE_FACTOR]
+        rescored = []
+        for query, cand in zip(queries, candidates):
+            order = np.argsort(-(vectors[cand] @ query))[:K]
+            rescored.append(cand[order])
+        elapsed = (time.time() - start) * 1000 / NUM_QUERIES
+
+        print(
+            f"   {dtype:8s}: yeniden skorlamasız {recall(plain, truth):.4f} | "
+            f"{K}x{RESCORE_FACTOR} aday + float32 yeniden skorlama {recall(rescored, truth):.4f} "
+            f"({elapsed:.2f} ms/sorgu)"
+        )
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("📦 Embedding Quantization Benchmark")
+    print("=" * 70)
+
+    vectors = np.asarray(load_vectors(), dtype=np.float32)
+    storage_report(vectors)
+    recall_report(vectors)
+
+    print("\n" + "=" * 70)
@@ -0,0 +1,114 @@
+"""
+Benchmark: two-stage reranker cascade vs the full cross-encoder
+Her RAGAS test sorusu için INITIAL_RETRIEVAL_K aday bir kez alınır, sonra
+aynı adaylar farklı modlarla sıralanır:
+- full: RERANKER_MODEL tüm adayları skorlar
+- cascade@N: RERANK_PREFILTER_MODEL ilk N adayı seçer, RERANKER_MODEL sadece onları sıralar
+
+Raporlanan: rerank gecikmesi (medyan), full sıralamaya göre recall@TOP_RERANKED_K
+ve ilk 5 context'in örtüşmesi. --ragas ile RAGAS context_precision /
+context_recall de hesaplanır (OpenAI anahtarı gerekir).
+
+Kullanım:
+    python tests/benchmark_rerank_cascade.py [--ragas]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import INITIAL_RETRIEVAL_K, TOP_RERANKED_K, RERANKER_MODEL, RERANK_PREFILTER_MODEL
+from client import create_openrouter_client
+from query_expansion import expand_query
+from reranker import RerankerService
+from vectorstore_factory import get_vectorstore
+from ragas_evaluation import TEST_CASES
+
+SHORTLISTS = (10, 20, 30)
+REPEATS = 5
+CONTEXT_K = 5  # ragas_evaluation.py ile aynı: ilk 5 döküman context olur
+
+
+def rerank_timed(service, query, docs):
+    """Median latency (ms) over REPEATS runs and the final ranking"""
+    service.rerank_documents(query, list(docs), top_k=TOP_RERANKED_K)  # Pasaj tokenizasyonu ısınsın
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        ranked = service.rerank_documents(query, list(docs), top_k=TOP_RERANKED_K)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), [doc.chunk_id for doc in ranked], [doc.page_content for doc in ranked]
+
+
+def ragas_context_scores(contexts):
+    """RAGAS context_precision / context_recall for one mode's top contexts"""
+    from ragas import evaluate
+    from ragas.metrics import context_precision, context_recall
+    from datasets import Dataset
+
+    dataset = Dataset.from_dict({
+        "question": [tc["question"] for tc in TEST_CASES],
+        "contexts": contexts,
+        "ground_truth": [tc["ground_truth"] for tc in TEST_CASES]
+    })
+    result = evaluate(dataset, metrics=[context_precision, context_recall])
+    return float(result["context_precision"]), float(result["context_recall"])
+
+
+if __name__ == "__main__":
+    use_ragas = "--ragas" in sys.argv
+
+    print("=" * 70)
+    print(f"⚖️  Reranker Cascade Benchmark ({RERANK_PREFILTER_MODEL} → {RERANKER_MODEL})")
+    print("=" * 70)
+
+    # Adaylar bir kez alınır; tüm modlar aynı girdiyi sıralar
+    client = create_openrouter_client()
+    vectorstore = get_vectorstore()
+    queries = [expand_query(client, tc["question"]) for tc in TEST_CASES]
+    candidates = vectorstore.similarity_search_batch(queries, k=INITIAL_RETRIEVAL_K)
+
+    # Skor cache'i kapalı: her çağrı modeli çalıştırır
+    modes = [("full", RerankerService(batching=False, cache_size=0))]
+    for shortlist_k in SHORTLISTS:
+        modes.append((
+            f"cascade@{shortlist_k}",
+            RerankerService(batching=False, cache_size=0, cascade=True, shortlist_k=shortlist_k)
+        ))
+
+    results = {}
+    for name, service in modes:
+        latencies, rankings, contexts = [], [], []
+        for query, docs in zip(queries, candidates):
+            latency, ranking, texts = rerank_timed(service, query, docs)
+            latencies.append(latency)
+            rankings.append(ranking)
+            contexts.append(texts[:CONTEXT_K])
+        results[name] = (latencies, rankings, contexts)
+
+    full_rankings = results["full"][1]
+    full_latency = statistics.median(results["full"][0])
+
+    print(f"\n📊 {len(TEST_CASES)} soru, {INITIAL_RETRIEVAL_K} aday, top_k={TOP_RERANKED_K}\n")
+    print(f"   {'mod':12s} {'medyan ms':>10s} {'hızlanma':>9s} {f'recall@{TOP_RERANKED_K}':>10s} {f'top{CONTEXT_K} aynı':>10s}")
+    for name, (latencies, rankings, _) in results.items():
+        latency = statistics.median(latencies)
+        recall = statistics.mean(
+            len(set(r) & set(f)) / len(f) for r, f in zip(rankings, full_rankings)
+        )
+        same_top = statistics.mean(
+            r[:CONTEXT_K] == f[:CONTEXT_K] for r, f in zip(rankings, full_rankings)
+        )
+        print(f"   {name:12s} {latency:10.1f} {full_latency / latency:8.2f}x {recall:10.3f} {same_top:10.2f}")
+
+    if use_ragas:
+        print("\n📈 RAGAS context metrikleri (ilk 5 context):\n")
+        print(f"   {'mod':12s} {'precision':>10s} {'recall':>8s}")
+        for name, (_, _, contexts) in results.items():
+            precision, recall = ragas_context_scores(contexts)
+            print(f"   {name:12s} {precision:10.3f} {recall:8.3f}")
+
+    print("\n" + "=" * 70)
@@ -0,0 +1,116 @@
+"""
+Benchmark: cross-encoder rerank latency vs CPU cores
+Reranks K=50 passages per query with different ONNX session / thread pool
+settings and reports the median latency of each. The score cache is
+disabled, so every call runs the model.
+
+Uses chunks from the local index (vector_index/) if present, otherwise
+sample legislation sentences. Needs the reranker model (downloaded on
+first run):
+    python tests/benchmark_rerank_cores.py
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import LOCAL_INDEX_DIR, RERANKER_MODEL
+from documents import Document
+from reranker import RerankerService
+
+K = 50
+RUNS = 20
+WARMUP_RUNS = 3
+
+QUERIES = [
+    "İşverenin iş sağlığı ve güvenliği konusundaki yükümlülükleri nelerdir?",
+    "Yıllık ücretli izin süresi nasıl hesaplanır?",
+    "Kıdem tazminatına hak kazanma şartları nelerdir?",
+    "Fazla çalışma ücreti nasıl ödenir?",
+]
+
+SAMPLE_SENTENCES = [
+    "İşveren, çalışanların işle ilgili sağlık ve güvenliğini sağlamakla yükümlüdür.",
+    "İşyerinde işe başladığı günden itibaren en az bir yıl çalışmış olan işçilere yıllık ücretli izin verilir.",
+    "Haftalık kırkbeş saati aşan çalışmalar fazla çalışma sayılır.",
+    "İş sözleşmesi işveren tarafından bildirimsiz feshedildiğinde işçi kıdem tazminatına hak kazanır.",
+    "Risk değerlendirmesi yapılırken çalışanların temsilcileri sürece katılır.",
+]
+
+
+def load_passages():
+    """K passages from the local index, or repeated sample sentences"""
+    path = os.path.join(LOCAL_INDEX_DIR, "chunks.json")
+    if os.path.exists(path):
+        print(f"📂 Yerel index chunk'ları kullanılıyor: {path}")
+        with open(path, encoding="utf-8") as f:
+            chunks = json.load(f)[:K]
+        return [Document(c["content"], c["metadata"], None, c["chunk_id"]) for c in chunks]
+
+    print(f"🎲 Yerel index yok, örnek cümleler kullanılıyor ({K} pasaj)")
+    return [
+        Document(" ".join(SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES):] * 3), {}, None, f"sample-{i}")
+        for i in range(K)
+    ]
+
+
+def configurations():
+    """(workers, intra_op_threads) pairs up to the machine's core count"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+
+    configs = [(1, 0)]  # FlashRank varsayılan session'ı
+    for n in counts:
+        configs.append((1, n))  # Tek session, n op içi thread
+        if n > 1:
+            configs.append((n, 1))  # n session, her biri tek thread
+    return configs
+
+
+def measure(service, passages):
+    """Median and p90 latency (ms) of reranking K passages"""
+    timings = []
+    for run in range(WARMUP_RUNS + RUNS):
+        # Her çağrıda farklı sorgu -> skor cache'i devre dışı olsa da aynı girdiyi tekrarlama
+        query = f"{QUERIES[run % len(QUERIES)]} ({run})"
+        start = time.perf_counter()
+        service.rerank_documents(query, passages, top_k=K)
+        if run >= WARMUP_RUNS:
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.9) - 1]
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print(f"⚖️  Rerank Latency vs Cores (model: {RERANKER_MODEL}, k={K})")
+    print("=" * 70)
+
+    passages = load_passages()
+    results = []
+    for workers, intra in configurations():
+        service = RerankerService(
+            batching=False,
+            cache_size=0,
+            workers=workers,
+            intra_op_threads=intra
+        )
+        median, p90 = measure(service, passages)
+        results.append((workers, intra, median, p90))
+
+    baseline = results[0][2]
+    print(f"\n🖥️  CPU çekirdek sayısı: {os.cpu_count()}")
+    print(f"   {'session':>8s} {'intra_op':>9s} {'median ms':>10s} {'p90 ms':>8s} {'hızlanma':>9s}")
+    for workers, intra, median, p90 in results:
+        print(
+            f"   {workers:8d} {intra or 'auto':>9} {median:10.1f} {p90:8.1f} "
+            f"{baseline / median:8.2f}x"
+        )
@@ -41,6 +41,31 @@ from reranker import RerankerService
 from rag_pipeline import RAGPipeline
 
 
+# Test soruları (gerçek kullanım senaryoları)
+TEST_CASES = [
+    {
+        "question": "İşverenin iş sağlığı ve güvenliği konusundaki yükümlülükleri nelerdir?",
+        "ground_truth": "İşveren, çalışanların iş sağlığı ve güvenliğini sağlamakla yükümlüdür. Risk değerlendirmesi yapmak, gerekli önlemleri almak, çalışanları bilgilendirmek ve eğitmek zorundadır."
+    },
+    {
+        "question": "Risk değerlendirmesi nedir ve nasıl yapılır?",
+        "ground_truth": "Risk değerlendirmesi, işyerinde var olan ya da dışarıdan gelebilecek tehlikelerin belirlenmesi, bu tehlikelerin riske dönüşmesine yol açan faktörler ile tehlikelerden kaynaklanan risklerin analiz edilerek derecelendirilmesi ve kontrol tedbirlerinin kararlaştırılması çalışmalarıdır."
+    },
+    {
+        "question": "İş güvenliği uzmanı görevlendirmesi zorunlu mudur?",
+        "ground_truth": "İşveren, işyerlerinde iş sağlığı ve güvenliği hizmetlerini yürütmek üzere iş güvenliği uzmanı görevlendirmek zorundadır. Bu zorunluluk işyerinin tehlike sınıfına ve çalışan sayısına göre değişir."
+    },
+    {
+        "question": "Çalışan temsilcisi kimdir ve nasıl seçilir?",
+        "ground_truth": "Çalışan temsilcisi, iş sağlığı ve güvenliği konularında işveren ile çalışanlar arasında koordinasyonu sağlayan, çalışanlar tarafından seçilen kişidir. En az elli çalışanı olan işyerlerinde çalışan temsilcisi bulundurulur."
+    },
+    {
+        "question": "Kişisel koruyucu donanım kullanımı zorunlu mudur?",
+        "ground_truth": "İşveren, çalışma ortamında sağlık ve güvenlik risklerinin mühendislik tedbirleri ve diğer yöntemlerle önlenemediği veya tam olarak sınırlandırılamadığı durumlarda uygun kişisel koruyucu donanımları sağlamak ve kullandırmak zorundadır."
+    }
+]
+
+
 class RAGEvaluator:
     """RAGAS-based RAG system evaluator"""
     
@@ -69,31 +94,7 @@ class RAGEvaluator:
         Returns:
             List of test cases
         """
-        # Test soruları (gerçek kullanım senaryoları)
-        test_cases = [
-            {
-                "question": "İşverenin iş sağlığı ve güvenliği konusundaki yükümlülükleri nelerdir?",
-                "ground_truth": "İşveren, çalışanların iş sağlığı ve güvenliğini sağlamakla yükümlüdür. Risk değerlendirmesi yapmak, gerekli önlemleri almak, çalışanları bilgilendirmek ve eğitmek zorundadır."
-            },
-            {
-                "question": "Risk değerlendirmesi nedir ve nasıl yapılır?",
-                "ground_truth": "Risk değerlendirmesi, işyerinde var olan ya da dışarıdan gelebilecek tehlikelerin belirlenmesi, bu tehlikelerin riske dönüşmesine yol açan faktörler ile tehlikelerden kaynaklanan risklerin analiz edilerek derecelendirilmesi ve kontrol tedbirlerinin kararlaştırılması çalışmalarıdır."
-            },
-            {
-                "question": "İş güvenliği uzmanı görevlendirmesi zorunlu mudur?",
-                "ground_truth": "İşveren, işyerlerinde iş sağlığı ve güvenliği hizmetlerini yürütmek üzere iş güvenliği uzmanı görevlendirmek zorundadır. Bu zorunluluk işyerinin tehlike sınıfına ve çalışan sayısına göre değişir."
-            },
-            {
-                "question": "Çalışan temsilcisi kimdir ve nasıl seçilir?",
-                "ground_truth": "Çalışan temsilcisi, iş sağlığı ve güvenliği konularında işveren ile çalışanlar arasında koordinasyonu sağlayan, çalışanlar tarafından seçilen kişidir. En az elli çalışanı olan işyerlerinde çalışan temsilcisi bulundurulur."
-            },
-            {
-                "question": "Kişisel koruyucu donanım kullanımı zorunlu mudur?",
-                "ground_truth": "İşveren, çalışma ortamında sağlık ve güvenlik risklerinin mühendislik tedbirleri ve diğer yöntemlerle önlenemediği veya tam olarak sınırlandırılamadığı durumlarda uygun kişisel koruyucu donanımları sağlamak ve kullandırmak zorundadır."
-            }
-        ]
-        
-        return test_cases
+        return list(TEST_CASES)
     
     def run_evaluation(self, test_cases: List[Dict]) -> Dict:
         """
@@ -121,6 +122,12 @@ class RAGEvaluator:
         
         print(f"\n📝 {len(test_cases)} test sorusu işleniyor...\n")
         
+        # Context retrieval for all questions at once:
+        # one encode call + concurrent $vectorSearch queries
+        from query_expansion import expand_query
+        search_queries = [expand_query(self.client, tc["question"]) for tc in test_cases]
+        batch_docs = self.vectorstore.similarity_search_batch(search_queries, k=50)
+        
         for i, test_case in enumerate(test_cases, 1):
             question = test_case["question"]
             ground_truth = test_case["ground_truth"]
@@ -135,12 +142,9 @@ class RAGEvaluator:
                 # Extract answer (remove sources section)
                 answer = full_response.split("═" * 70)[0].strip()
                 
-                # Get context from last retrieval
-                # We need to access the documents used
-                # For now, we'll retrieve again for context
-                from query_expansion import expand_query
-                search_query = expand_query(self.client, question)
-                initial_docs = self.vectorstore.similarity_search(search_query, k=50)
+                # Get context from the batched retrieval above
+                search_query = search_queries[i - 1]
+                initial_docs = batch_docs[i - 1]
                 relevant_docs = self.reranker.rerank_documents(search_query, initial_docs)
                 
                 # Context is the retrieved documents
@@ -0,0 +1,137 @@
+"""
+Test script for the semantic answer cache (HNSW index over question vectors)
+Mock LLM client, vector store and reranker, no API key or database needed.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from answer_cache import AnswerCache
+from documents import Document
+from rag_pipeline import RAGPipeline
+
+DIM = 16
+
+
+def vector(seed, noise=0.0):
+    """Deterministic unit vector; small noise = near-identical phrasing"""
+    base = np.random.default_rng(seed).normal(size=DIM)
+    base /= np.linalg.norm(base)
+    if noise:
+        base = base + noise * np.random.default_rng(seed + 1000).normal(size=DIM)
+    return (base / np.linalg.norm(base)).astype(np.float32)
+
+
+class MockEncoder:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, query):
+        return self.vectors[query]
+
+
+class MockVectorStore:
+    def __init__(self, vectors):
+        self.encoder = MockEncoder(vectors)
+        self.version = "v1"
+        self.searches = 0
+
+    def corpus_version(self):
+        return self.version
+
+    def similarity_search(self, query, k=50, filter_dict=None):
+        self.searches += 1
+        return [Document("İşveren çalışanların sağlığını gözetir. Madde 4",
+                         {"source_file": "6331_Kanun.pdf", "page": 3}, 0.9, "c1")]
+
+
+class MockReranker:
+    def rerank_documents(self, query, documents, top_k=5):
+        return documents[:top_k]
+
+
+class MockClient:
+    def __init__(self):
+        self.calls = 0
+        self.last_messages = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        self.calls += 1
+        self.last_messages = messages
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"Cevap {self.calls} (Madde 4)"))])
+
+
+def test_answer_cache():
+    """Near-identical standalone questions hit; different questions, filters or corpus miss"""
+
+    print("=" * 70)
+    print("♻️  Semantic Answer Cache Test")
+    print("=" * 70)
+
+    cache = AnswerCache(max_entries=3, ttl=0, max_distance=0.06, min_term_overlap=0.5)
+    question = "İşverenin yükümlülükleri nelerdir?"
+    cache.store(question, vector(1), "cevap + kaynaklar", "cevap", ["c1"], None, "v1")
+
+    # Near-identical phrasing, same terms after stemming
+    hit = cache.lookup("işverenin yükümlülükleri neler", vector(1, noise=0.05), None, "v1")
+    assert hit is not None and hit["answer"] == "cevap + kaynaklar" and hit["sources"] == ["c1"]
+    print(f"✓ Near-identical question hit (distance {hit['distance']:.3f})")
+
+    # Close vector but different subject: term overlap guard
+    assert cache.lookup("Çalışanın yükümlülükleri nelerdir?", vector(1, noise=0.05), None, "v1") is None
+    print("✓ Close vector with different terms is not served")
+
+    # Far vector, other filter or new corpus version: miss
+    assert cache.lookup(question, vector(2), None, "v1") is None
+    assert cache.lookup(question, vector(1), {"source_dir": "TEBLİĞ"}, "v1") is None
+    assert cache.lookup(question, vector(1), None, "v2") is None and len(cache) == 0
+    print("✓ Distant question, other filter and re-ingested corpus miss")
+
+    # Size limit: least recently used entry removed, index slots reused
+    for seed in range(10, 16):
+        cache.store(f"soru {seed}", vector(seed), f"cevap {seed}", f"cevap {seed}", [], None, "v2")
+    assert len(cache) == 3 and cache.index.get_current_count() <= 3
+    assert cache.lookup("soru 15", vector(15), None, "v2")["answer"] == "cevap 15"
+    assert cache.lookup("soru 10", vector(10), None, "v2") is None
+    print(f"✓ Bounded at max_entries: {cache.stats()}")
+
+    # Pipeline: second phrasing skips retrieval and LLM; follow-ups are not cached
+    similar = "işverenin yükümlülükleri neler"
+    other = "Yeni bir soru?"
+    store = MockVectorStore({question: vector(1), similar: vector(1, noise=0.05), other: vector(3)})
+    client = MockClient()
+    pipeline = RAGPipeline(client, store, MockReranker(), answer_cache=AnswerCache(ttl=0))
+    first = pipeline.generate_response(question, expansion_mode="none")
+    pipeline.reset_conversation()
+    second = pipeline.generate_response(similar, expansion_mode="none")
+    assert second == first and client.calls == 1 and store.searches == 1
+    assert pipeline.conversation_history[-1]["content"] == "Cevap 1 (Madde 4)"
+    print("✓ Pipeline returns the cached answer without retrieval or LLM call")
+
+    third = pipeline.generate_response(question, expansion_mode="none")  # Has history now
+    assert third != first and client.calls == 2
+    print("✓ Questions with conversation history bypass the cache")
+
+    # Standalone request: cache hit despite shared history, history left unchanged
+    history = list(pipeline.conversation_history)
+    history_texts = {message["content"] for message in history}
+    assert pipeline.generate_response(similar, expansion_mode="none", standalone=True) == first
+    assert client.calls == 2 and pipeline.conversation_history == history
+    pipeline.generate_response(other, expansion_mode="none", standalone=True)
+    assert client.calls == 3 and pipeline.conversation_history == history
+    assert not any(message["content"] in history_texts for message in client.last_messages)
+    print("✓ Standalone requests use the cache and do not touch the shared history")
+
+    events = list(RAGPipeline(client, store, MockReranker(), answer_cache=pipeline.answer_cache)
+                  .generate_response_stream(similar, expansion_mode="none"))
+    assert [event for event, _ in events] == ["sources", "token", "done"] and events[-1][1] == first
+    print("✓ Streaming endpoint serves cached answers too")
+
+    print("\n✅ Semantic answer cache working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_answer_cache()
@@ -0,0 +1,148 @@
+"""
+Test script for the async RAG pipeline and the ASGI server (asgi.py)
+Mock AsyncOpenAI client, vector store and reranker, no API key or database needed.
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+import app
+import asgi
+from starlette.testclient import TestClient
+from async_pipeline import AsyncRAGPipeline
+from rag_pipeline import RAGPipeline
+from documents import Document
+from expansion_cache import ExpansionCache
+
+
+def temp_expansion_cache():
+    """Empty expansion cache of its own (no expansions from earlier runs or other tests)"""
+    return ExpansionCache(os.path.join(tempfile.mkdtemp(), "expansions.sqlite3"), ttl=0, max_entries=100)
+
+
+class MockAsyncStream:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for token in self.tokens:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+    async def close(self):
+        self.closed = True
+
+
+class MockAsyncClient:
+    """AsyncOpenAI stand-in: every completion takes `delay` seconds"""
+
+    def __init__(self, delay=0.2, expansion="işveren yükümlülük risk"):
+        self.delay = delay
+        self.expansion = expansion
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, messages, stream=False, **kwargs):
+        await asyncio.sleep(self.delay)
+        if stream:
+            return MockAsyncStream(["İşveren ", "sağlığı gözetir ", "(Madde 4)."])
+        prompt = messages[-1]["content"]
+        content = self.expansion if "Genişletilmiş:" in prompt else "Cevap (Madde 4)"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class MockVectorStore:
+    """Async vector store recording when each query was searched"""
+
+    def __init__(self):
+        self.queries = []
+        self.encoder = SimpleNamespace(batching_stats=lambda: {"batches": 0})
+
+    def get_collection_stats(self):
+        return {"total_documents": 2, "database": "test", "collection": "chunks"}
+
+    async def asimilarity_search(self, query, k=10, filter_dict=None, executor=None):
+        self.queries.append((query, time.perf_counter()))
+        await asyncio.sleep(0.01)
+        return [Document(word, {"source_file": "6331_Kanun.pdf"}, 0.5, word) for word in query.split()][:k]
+
+
+class MockReranker:
+    def rerank_documents(self, query, documents, top_k=5):
+        return documents[:top_k]
+
+    def stats(self):
+        return {"score_cache": {"hits": 0}, "batching": None}
+
+
+def test_async_pipeline():
+    """Concurrent requests overlap their LLM waits; speculative search; SSE over ASGI"""
+
+    print("=" * 70)
+    print("⚡ Async RAG Pipeline Test")
+    print("=" * 70)
+
+    async def concurrent(pipeline, count):
+        started = time.perf_counter()
+        answers = await asyncio.gather(*[
+            pipeline.agenerate_response(f"soru {i}", expansion_mode="none") for i in range(count)
+        ])
+        return answers, time.perf_counter() - started
+
+    # 20 requests, each waiting 0.2 s on the LLM: ~0.2 s total on one event loop, not 4 s
+    pipeline = AsyncRAGPipeline(MockAsyncClient(), MockVectorStore(), MockReranker(), max_history=100)
+    answers, elapsed = asyncio.run(concurrent(pipeline, 20))
+    assert all(answer.startswith("Cevap (Madde 4)") for answer in answers)
+    assert elapsed < 1.0, f"Requests did not overlap: {elapsed:.2f}s"
+    print(f"✓ 20 concurrent requests in {elapsed:.2f}s (LLM latency 0.2s each)")
+
+    # Speculative retrieval: raw-question search does not wait for the expansion
+    store = MockVectorStore()
+    pipeline = AsyncRAGPipeline(MockAsyncClient(delay=0.1), store, MockReranker(),
+                                expansion_cache=temp_expansion_cache(), expansion_deadline_ms=1000)
+    started = time.perf_counter()
+    query, docs = asyncio.run(pipeline._aexpand_and_retrieve("işveren görevleri", expansion_mode="llm"))
+    assert query == "işveren yükümlülük risk"
+    assert store.queries[0][0] == "işveren görevleri" and store.queries[0][1] - started < 0.05
+    assert sorted(doc.chunk_id for doc in docs) == ["görevleri", "işveren", "risk", "yükümlülük"]
+    print("✓ Raw-question search overlaps the async expansion; results fused with RRF")
+
+    # Deadline: slow expansion is not awaited
+    store = MockVectorStore()
+    pipeline = AsyncRAGPipeline(MockAsyncClient(delay=0.5), store, MockReranker(),
+                                expansion_cache=temp_expansion_cache(), expansion_deadline_ms=50)
+    query, docs = asyncio.run(pipeline._aexpand_and_retrieve("işveren görevleri", expansion_mode="llm"))
+    assert query == "işveren görevleri" and len(store.queries) == 1
+    print("✓ Slow expansion: raw-question candidates after the deadline")
+
+    # ASGI server: /api/ask, /api/ask/stream and validation
+    asgi.rag_pipeline = AsyncRAGPipeline(MockAsyncClient(delay=0.0), MockVectorStore(), MockReranker(),
+                                         expansion_cache=temp_expansion_cache())
+    http = TestClient(asgi.app)
+    response = http.post("/api/ask", json={"question": "İşverenin görevi nedir?", "expansion": "none"})
+    assert response.status_code == 200 and response.json()["answer"].startswith("Cevap (Madde 4)")
+    response = http.post("/api/ask/stream", json={"question": "Çalışanın hakları?", "expansion": "none"})
+    names = [line[len("event: "):] for line in response.text.split("\n") if line.startswith("event: ")]
+    assert names == ["sources", "token", "token", "token", "done"]
+    assert http.post("/api/ask", json={"question": "x", "expansion": "bogus"}).status_code == 400
+    assert http.get("/api/memory").json()["total_messages"] == 4
+    print("✓ asgi.py serves /api/ask, /api/ask/stream (SSE) and rejects invalid bodies")
+
+    # /stats: same response body as the Flask server
+    app.rag_pipeline = RAGPipeline(None, MockVectorStore(), MockReranker(), expansion_cache=temp_expansion_cache())
+    flask_stats = app.app.test_client().get("/stats").get_json()
+    asgi_stats = http.get("/stats").json()
+    assert "batching" in asgi_stats and set(asgi_stats) == set(flask_stats)
+    print("✓ /stats matches app.py (incl. batching)")
+
+    print("\n✅ Async RAG pipeline working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_async_pipeline()
@@ -0,0 +1,55 @@
+"""
+Test script for token-budget context packing
+"""
+
+from documents import Document
+from rag_pipeline import pack_context
+from text_processing import estimate_token_count
+
+
+def make_doc(chunk_id, tokens, rerank_score):
+    """Chunk with a precomputed token count"""
+    return Document("x" * 10, {"token_count": tokens}, 0.5, chunk_id, rerank_score)
+
+
+def test_context_packing():
+    """Budget, score threshold and minimum chunk count"""
+
+    print("=" * 70)
+    print("📦 Context Packing Test")
+    print("=" * 70)
+
+    docs = [
+        make_doc("a", 1000, 0.95),
+        make_doc("b", 2000, 0.80),
+        make_doc("c", 400, 0.40),
+        make_doc("d", 300, 0.005),
+    ]
+
+    # "b" does not fit the remaining budget, the shorter "c" does
+    packed = pack_context(docs, token_budget=1500, score_threshold=0.01, min_chunks=1)
+    assert [doc.chunk_id for doc in packed] == ["a", "c"]
+    print("✓ Token budget respected (1400/1500 tokens)")
+
+    # "d" is below the threshold
+    packed = pack_context(docs, token_budget=10000, score_threshold=0.01, min_chunks=1)
+    assert [doc.chunk_id for doc in packed] == ["a", "b", "c"]
+    print("✓ Low-score chunk dropped")
+
+    # min_chunks keeps low-score chunks when scores are poorly calibrated
+    packed = pack_context(docs, token_budget=10000, score_threshold=0.99, min_chunks=2)
+    assert [doc.chunk_id for doc in packed] == ["a", "b"]
+    print("✓ Minimum chunk count kept")
+
+    # Chunks ingested before token counts existed fall back to an estimate
+    legacy = Document("ç" * 300, {}, 0.5, "legacy", 0.9)
+    assert pack_context([legacy], token_budget=50)[0] is legacy
+    assert estimate_token_count("ç" * 300, chars_per_token=3.0) == 100
+    print("✓ Missing token_count estimated from text")
+
+    print("\n✅ Context packing working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_context_packing()
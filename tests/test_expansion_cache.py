@@ -0,0 +1,69 @@
+"""
+Test script for the persistent query expansion cache (SQLite, no external dependencies)
+"""
+
+import os
+import tempfile
+import time
+
+from expansion_cache import ExpansionCache, expansion_key
+
+
+def test_expansion_cache():
+    """Test key normalization, persistence across instances, TTL and size limit"""
+
+    print("=" * 70)
+    print("🗄️  Query Expansion Cache Test")
+    print("=" * 70)
+
+    path = os.path.join(tempfile.mkdtemp(), "expansions.sqlite3")
+    cache = ExpansionCache(path, ttl=0, max_entries=3)
+
+    # Same question with different whitespace/case -> same key; model and prompt version separate
+    key = expansion_key("İşverenin  yükümlülükleri nelerdir?", "model-a", 1)
+    assert key == expansion_key("işverenin yükümlülükleri nelerdir? ", "model-a", 1)
+    assert key != expansion_key("İşverenin yükümlülükleri nelerdir?", "model-b", 1)
+    assert key != expansion_key("İşverenin yükümlülükleri nelerdir?", "model-a", 2)
+    print("✓ Key covers normalized question, model and prompt version")
+
+    assert cache.get(key) is None
+    cache.set(key, "işveren yükümlülükleri iş sağlığı güvenliği")
+    assert cache.get(key) == "işveren yükümlülükleri iş sağlığı güvenliği"
+    print("✓ Miss, then hit after set")
+
+    # A second instance (another worker / restart) reads the same file
+    other = ExpansionCache(path, ttl=0, max_entries=3)
+    assert other.get(key) == "işveren yükümlülükleri iş sağlığı güvenliği"
+    other.close()
+    print("✓ Entries are shared across instances and survive reopening")
+
+    # Size limit keeps the most recently used entries
+    for i in range(3):
+        time.sleep(0.01)
+        cache.set(f"k{i}", f"v{i}")
+    time.sleep(0.01)
+    cache.get("k0")
+    cache.prune()
+    assert cache.stats()["size"] == 3
+    assert cache.get(key) is None and cache.get("k0") == "v0"
+    print("✓ Least recently used entry pruned at max_entries")
+
+    # Expired entries are not returned
+    expiring = ExpansionCache(path, ttl=0.05, max_entries=3)
+    expiring.set("short", "lived")
+    assert expiring.get("short") == "lived"
+    time.sleep(0.1)
+    assert expiring.get("short") is None
+    print("✓ Entries expire after TTL")
+
+    stats = cache.stats()
+    print(f"\n📊 Stats: {stats}")
+    cache.close()
+    expiring.close()
+
+    print("\n✅ Expansion cache working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_expansion_cache()
@@ -0,0 +1,85 @@
+"""
+Test script for the persistent HNSW graph (hnsw_vector_store.py)
+Temporary index directory and a stand-in embedding model, no database needed.
+"""
+
+import os
+import tempfile
+import numpy as np
+
+from local_vector_store import HNSW_INDEX_FILE, HNSW_META_FILE, LocalVectorStore, save_local_index
+from hnsw_vector_store import HNSWVectorStore
+
+
+class MockModel:
+    """Embedding model stand-in (queries are searched by vector in this test)"""
+
+    def encode(self, texts, **kwargs):
+        return np.zeros((len(texts), 8) if isinstance(texts, list) else 8, dtype=np.float32)
+
+
+def write_corpus(index_dir, vectors):
+    contents = [f"Madde {i}" for i in range(len(vectors))]
+    save_local_index(vectors, contents, [{"page": i} for i in range(len(vectors))], index_dir=index_dir)
+
+
+def top_row(store, vector):
+    vector = vector / np.linalg.norm(vector)
+    return int(store._search_vector(vector.astype(np.float32), 1)[0][0])
+
+
+def test_hnsw_store():
+    """The saved graph is only reused for the corpus it was built from"""
+
+    print("=" * 70)
+    print("🕸️ HNSW Graph Persistence Test")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        write_corpus(index_dir, vectors)
+        store = HNSWVectorStore(index_dir, model=MockModel())
+        assert top_row(store, vectors[0]) == 0
+        assert os.path.exists(os.path.join(index_dir, HNSW_INDEX_FILE))
+        print("✓ Graph built and saved")
+
+        # Same corpus: the saved graph is loaded, results unchanged
+        store = HNSWVectorStore(index_dir, model=MockModel())
+        assert top_row(store, vectors[0]) == 0
+        print("✓ Saved graph reused for the same corpus")
+
+        # Re-export at the same size in a different order: the stale graph is not served
+        write_corpus(index_dir, vectors[::-1].copy())
+        assert not os.path.exists(os.path.join(index_dir, HNSW_INDEX_FILE))
+        store = HNSWVectorStore(index_dir, model=MockModel())
+        exact = LocalVectorStore(index_dir, model=MockModel(), dtype="float32")
+        assert top_row(store, vectors[0]) == top_row(exact, vectors[0]) == 49
+        print("✓ Re-exported corpus: graph rebuilt, matches exact search")
+
+        # Graph files copied from a smaller corpus: rebuilt, labels stay in range
+        write_corpus(index_dir, vectors[:20])
+        HNSWVectorStore(index_dir, model=MockModel())
+        saved = {name: open(os.path.join(index_dir, name), "rb").read() for name in (HNSW_INDEX_FILE, HNSW_META_FILE)}
+        write_corpus(index_dir, vectors)
+        for name, data in saved.items():
+            with open(os.path.join(index_dir, name), "wb") as f:
+                f.write(data)
+        store = HNSWVectorStore(index_dir, model=MockModel())
+        assert store.index.get_current_count() == 50 and top_row(store, vectors[42]) == 42
+        print("✓ Graph of another corpus rebuilt")
+
+        # Incremental add: the graph is extended and reused without a rebuild
+        extra = rng.normal(size=(5, 8)).astype(np.float32)
+        store.add_chunks(extra, [f"Ek {i}" for i in range(5)], [{"page": 50 + i} for i in range(5)])
+        store = HNSWVectorStore(index_dir, model=MockModel())
+        assert store.index.get_current_count() == 55 and top_row(store, extra[3]) == 53
+        print("✓ Added chunks kept in the saved graph")
+
+    print("\n✅ HNSW graph persistence working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_hnsw_store()
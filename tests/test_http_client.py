@@ -0,0 +1,122 @@
+"""
+Test script for the pooled, instrumented OpenRouter HTTP client (client.py)
+Local HTTP/1.1 server in a thread, no API key or network needed.
+"""
+
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import AsyncOpenAI, OpenAI
+
+import client as client_module
+from client import (
+    awarm_up_client,
+    create_async_http_client,
+    create_http_client,
+    http_call_stats,
+    warm_up_client
+)
+
+COMPLETION = {
+    "id": "test", "object": "chat.completion", "created": 0, "model": "test/model",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Cevap (Madde 4)"}, "finish_reason": "stop"}]
+}
+
+
+class OpenRouterHandler(BaseHTTPRequestHandler):
+    """/key answers at once, chat completions after 100 ms; connections are kept alive"""
+
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        self._reply({"data": {"label": "test"}})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(0.1)
+        self._reply(COMPLETION)
+
+    def _reply(self, payload):
+        OpenRouterHandler.connections.add(self.client_address)
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def ask(client):
+    return client.chat.completions.create(model="test/model", messages=[{"role": "user", "content": "soru"}])
+
+
+def test_http_client():
+    """Warmup opens the connection; later calls reuse it; TTFB and reuse are recorded"""
+
+    print("=" * 70)
+    print("🔌 Pooled OpenRouter HTTP Client Test")
+    print("=" * 70)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OpenRouterHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+
+    # Settings: split timeouts and pool limits from config
+    http_client = create_http_client()
+    timeout = http_client.timeout
+    assert timeout.connect == client_module.HTTP_CONNECT_TIMEOUT and timeout.read == client_module.HTTP_TIMEOUT
+    print(f"✓ Timeouts: connect {timeout.connect}s, read {timeout.read}s, pool {timeout.pool}s")
+
+    # Warmup pays for the connection; the first question reuses it
+    client = OpenAI(base_url=base_url, api_key="test", http_client=http_client)
+    warm_up_client(client)
+    response = ask(client)
+    ask(client)
+    assert response.choices[0].message.content == "Cevap (Madde 4)"
+
+    stats = http_call_stats()
+    warmup, first, second = stats["recent"]
+    assert warmup["path"] == "/api/v1/key" and warmup["new_connection"]
+    assert not first["new_connection"] and not second["new_connection"]
+    assert first["ttfb_ms"] >= 100
+    assert stats["requests"] == 3 and stats["reused_connections"] == 2
+    assert len(OpenRouterHandler.connections) == 1
+    print(f"✓ Warmup opened the connection; questions reused it (TTFB {first['ttfb_ms']} ms)")
+
+    # Async client: same instrumentation with async trace hooks
+    async def async_calls():
+        client = AsyncOpenAI(base_url=base_url, api_key="test", http_client=create_async_http_client())
+        await awarm_up_client(client)
+        await asyncio.gather(*[
+            client.chat.completions.create(model="test/model", messages=[{"role": "user", "content": "soru"}])
+            for _ in range(3)
+        ])
+        await client.close()
+
+    asyncio.run(async_calls())
+    stats = http_call_stats()
+    calls = stats["recent"][3:]
+    assert len(calls) == 4 and calls[0]["new_connection"] and all(call["ttfb_ms"] >= 100 for call in calls[1:])
+    # 3 eşzamanlı istek: biri ısıtılmış bağlantıyı kullanır, diğerleri yeni bağlantı açar (HTTP/1.1)
+    assert sum(not call["new_connection"] for call in calls[1:]) >= 1
+    print(f"✓ Async client: {stats['reuse_percent']}% of requests reused a connection")
+
+    # Unreachable server: warmup only warns
+    warm_up_client(OpenAI(base_url="http://127.0.0.1:9/api/v1", api_key="test", http_client=create_http_client()))
+    print("✓ Failed warmup does not raise")
+
+    server.shutdown()
+    print(f"\n📊 Stats: { {key: value for key, value in stats.items() if key != 'recent'} }")
+    print("\n✅ Pooled HTTP client working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_http_client()
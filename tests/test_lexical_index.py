@@ -0,0 +1,82 @@
+"""
+Test script for BM25 lexical search and Reciprocal Rank Fusion
+"""
+
+from lexical_index import LexicalIndex, tokenize, turkish_lower
+from rank_fusion import reciprocal_rank_fusion
+
+
+def make_chunks():
+    """Small corpus of legislation-like chunks"""
+    texts = [
+        "Madde 26 - İdari para cezaları: Bu Kanunda belirtilen yükümlülüklere uymayan işverenlere idari para cezası verilir.",
+        "Madde 4 - İşveren, çalışanların işle ilgili sağlık ve güvenliğini sağlamakla yükümlüdür.",
+        "Madde 10 - Risk değerlendirmesi işveren tarafından yapılır veya yaptırılır.",
+        "İŞYERİ HEKİMİ ve iş güvenliği uzmanı görevlendirilmesi hakkında hükümler.",
+    ]
+    return [
+        {"chunk_id": str(i), "content": text, "metadata": {"page": i}}
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_turkish_tokenization():
+    """Dotted/dotless i casefolding and suffix stripping"""
+
+    print("=" * 70)
+    print("🔤 Türkçe Tokenizasyon Testi")
+    print("=" * 70)
+
+    assert turkish_lower("İŞYERİ") == "işyeri"
+    assert turkish_lower("ISLAK") == "ıslak"
+    print("✓ İ → i, I → ı")
+
+    # Inflected forms share a stem with the base form
+    assert tokenize("cezası") == tokenize("ceza")
+    assert tokenize("cezaları") == tokenize("ceza")
+    assert tokenize("İşverenlere") == tokenize("işveren")
+    assert tokenize("kanunun") == tokenize("kanun")
+    assert tokenize("güvenliği") == tokenize("güvenlik")
+    print(f"✓ Suffix stripping: cezaları → {tokenize('cezaları')}")
+
+    # Article numbers survive tokenization
+    assert "26" in tokenize("Madde 26")
+    print("✓ Numbers are kept")
+
+
+def test_bm25_and_fusion():
+    """Exact legal terms rank first; fusion merges duplicates"""
+
+    print("\n" + "=" * 70)
+    print("📖 BM25 + RRF Testi")
+    print("=" * 70)
+
+    index = LexicalIndex(make_chunks())
+
+    results = index.search("idari para cezası madde 26", k=3)
+    assert results[0].chunk_id == "0"
+    print(f"✓ 'idari para cezası madde 26' → chunk {results[0].chunk_id}")
+
+    results = index.search("işyeri hekimi", k=3)
+    assert results[0].chunk_id == "3"
+    print(f"✓ 'işyeri hekimi' → chunk {results[0].chunk_id}")
+
+    filtered = index.search("işveren", k=3, filter_dict={"page": 2})
+    assert [doc.chunk_id for doc in filtered] == ["2"]
+    print("✓ Metadata filter")
+
+    # Vector and BM25 lists overlap on chunk 1
+    vector_docs = index.search("risk değerlendirmesi işveren", k=2)
+    lexical_docs = index.search("işveren sağlık güvenlik", k=2)
+    fused = reciprocal_rank_fusion([vector_docs, lexical_docs])
+    keys = [doc.chunk_id for doc in fused]
+    assert len(keys) == len(set(keys))
+    print(f"✓ Fused order (deduplicated): {keys}")
+
+    print("\n✅ Lexical search working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_turkish_tokenization()
+    test_bm25_and_fusion()
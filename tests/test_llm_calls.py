@@ -0,0 +1,189 @@
+"""
+Test script for hedged, deadline-bounded LLM calls with model fallback (llm_calls.py)
+Mock OpenRouter clients with scripted latencies, no API key needed.
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+import threading
+from types import SimpleNamespace
+
+import llm_calls
+from llm_calls import LatencyHistogram, LLMDeadlineExceeded, complete, acomplete, llm_call_stats
+from expansion_cache import ExpansionCache
+from query_expansion import expand_query
+from config import MODEL_NAME
+
+
+def temp_expansion_cache():
+    """Empty expansion cache of its own (no expansions from earlier runs or other tests)"""
+    return ExpansionCache(os.path.join(tempfile.mkdtemp(), "expansions.sqlite3"), ttl=0, max_entries=100)
+
+
+class MockStream:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class MockClient:
+    """Each model answers after its scripted delays, in call order ("error" raises)"""
+
+    def __init__(self, script):
+        self.script = {model: list(steps) for model, steps in script.items()}
+        self.calls = []
+        self.streams = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _next(self, model, timeout):
+        with self._lock:
+            self.calls.append((model, timeout))
+            steps = self.script[model]
+            return steps.pop(0) if len(steps) > 1 else steps[0]
+
+    def _response(self, model, step, stream):
+        if step[0] == "error":
+            raise RuntimeError(f"{model} returned 502")
+        if stream:
+            self.streams.append(MockStream())
+            return self.streams[-1]
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(message=SimpleNamespace(content=f"{model} cevap"))])
+
+    def create(self, model, timeout=None, stream=False, **kwargs):
+        step = self._next(model, timeout)
+        time.sleep(step[1])
+        return self._response(model, step, stream)
+
+
+class MockAsyncClient(MockClient):
+    async def create(self, model, timeout=None, stream=False, **kwargs):
+        step = self._next(model, timeout)
+        await asyncio.sleep(step[1])
+        return self._response(model, step, stream)
+
+
+def request(model, **kwargs):
+    return dict({"model": model, "messages": [{"role": "user", "content": "soru"}]}, **kwargs)
+
+
+def warm_up(client, model, count=20, kind="answer", **kwargs):
+    for _ in range(count):
+        complete(client, request(model, **kwargs), kind=kind)
+
+
+def test_llm_calls():
+    """Deadlines, hedged duplicates, fallback model and adaptive latency histograms"""
+
+    print("=" * 70)
+    print("🪁 Hedged LLM Calls Test")
+    print("=" * 70)
+
+    llm_calls.LLM_HEDGE_MIN_MS = 50
+
+    # Histogram: percentiles within one bucket (%20) of the true latency
+    histogram = LatencyHistogram()
+    for _ in range(95):
+        histogram.record(0.1)
+    for _ in range(5):
+        histogram.record(2.0)
+    assert 0.1 <= histogram.percentile(50) < 0.12
+    assert 2.0 <= histogram.percentile(99) < 2.4
+    print(f"✓ Histogram: {histogram.stats()}")
+
+    # No hedging before LLM_HEDGE_MIN_SAMPLES measurements
+    client = MockClient({"fast/model": [("ok", 0.02)]})
+    assert llm_calls.get_latency_tracker().hedge_delay("fast/model", "answer") is None
+    warm_up(client, "fast/model")
+    delay = llm_calls.get_latency_tracker().hedge_delay("fast/model", "answer")
+    assert 0.05 <= delay < 0.1
+    print(f"✓ Hedge threshold after 20 calls: {delay * 1000:.0f} ms")
+
+    # Slow primary: the hedged duplicate answers first
+    client = MockClient({"fast/model": [("ok", 1.0), ("ok", 0.02)]})
+    started = time.perf_counter()
+    response = complete(client, request("fast/model"))
+    elapsed = time.perf_counter() - started
+    assert response.model == "fast/model" and elapsed < 0.5 and len(client.calls) == 2
+    assert llm_call_stats()["hedge_wins"] == 1
+    print(f"✓ Slow primary hedged: answered in {elapsed * 1000:.0f} ms instead of 1000 ms")
+
+    # Streams have their own histogram: time to headers must not lower the blocking cut-off
+    client = MockClient({"fast/model": [("ok", 0.01)]})
+    warm_up(client, "fast/model", kind="answer_stream", stream=True)
+    assert llm_calls.get_latency_tracker().hedge_delay("fast/model", "answer") == delay
+    client = MockClient({"fast/model": [("ok", 0.03)]})
+    complete(client, request("fast/model"))
+    assert len(client.calls) == 1
+    print("✓ Streamed calls do not change the hedge cut-off of blocking answers")
+
+    # Losing streams are closed once they arrive
+    client = MockClient({"fast/model": [("ok", 0.3), ("ok", 0.02)]})
+    stream = complete(client, request("fast/model", stream=True), kind="answer_stream")
+    time.sleep(0.4)
+    assert len(client.streams) == 2 and not stream.closed
+    assert all(other.closed for other in client.streams if other is not stream)
+    print("✓ Losing stream closed")
+
+    # Primary error: fallback model
+    llm_calls.LLM_FALLBACK_MODEL = "backup/model"
+    client = MockClient({"primary/model": [("error", 0.01)], "backup/model": [("ok", 0.01)]})
+    response = complete(client, request("primary/model"))
+    assert response.model == "backup/model" and [call[0] for call in client.calls] == ["primary/model", "backup/model"]
+    print("✓ Primary error: answered by the fallback model")
+
+    # Both fail: the error is raised
+    client = MockClient({"primary/model": [("error", 0.01)], "backup/model": [("error", 0.01)]})
+    try:
+        complete(client, request("primary/model"))
+        assert False, "Expected the fallback's error"
+    except RuntimeError as e:
+        assert "backup/model" in str(e)
+    print("✓ Fallback error raised")
+
+    # Deadline: a stuck call does not hold the worker until HTTP_TIMEOUT
+    llm_calls.CALL_DEADLINES_MS["answer"] = 200
+    client = MockClient({"slow/model": [("ok", 1.0)]})
+    started = time.perf_counter()
+    try:
+        complete(client, request("slow/model"))
+        assert False, "Expected LLMDeadlineExceeded"
+    except LLMDeadlineExceeded:
+        pass
+    elapsed = time.perf_counter() - started
+    assert 0.2 <= elapsed < 0.4 and client.calls[0][1].read <= 0.2
+    print(f"✓ Deadline exceeded after {elapsed * 1000:.0f} ms (per-attempt read timeout {client.calls[0][1].read:.2f} s)")
+
+    # Expansion past its deadline: the original query is used
+    llm_calls.CALL_DEADLINES_MS["expansion"] = 100
+    client = MockClient({MODEL_NAME: [("ok", 1.0)]})
+    assert expand_query(client, "işveren görevleri", mode="llm", cache=temp_expansion_cache()) == "işveren görevleri"
+    print("✓ Expansion deadline: original query used")
+
+    # Async: the hedge wins and the slow attempt is cancelled
+    async def hedged():
+        client = MockAsyncClient({"async/model": [("ok", 0.02)]})
+        for _ in range(20):
+            await acomplete(client, request("async/model"))
+        client.script["async/model"] = [("ok", 1.0), ("ok", 0.02)]
+        started = time.perf_counter()
+        response = await acomplete(client, request("async/model"))
+        return response, time.perf_counter() - started
+
+    response, elapsed = asyncio.run(hedged())
+    assert response.model == "async/model" and elapsed < 0.5
+    # Cancelled loser is not a finished measurement: 20 warm-up calls + the winning hedge
+    assert llm_call_stats()["latency"]["async/model (answer)"]["samples"] == 21
+    print(f"✓ Async hedge answered in {elapsed * 1000:.0f} ms")
+
+    print(f"\n📊 Stats: {llm_call_stats()}")
+    print("\n✅ Hedged LLM calls working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_llm_calls()
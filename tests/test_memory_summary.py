@@ -0,0 +1,142 @@
+"""
+Test script for the "summarize" memory strategy (rolling, token-bounded summary)
+Mock LLM client, no API key or database needed.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from async_pipeline import AsyncRAGPipeline
+from conversation_memory import message_tokens
+from rag_pipeline import RAGPipeline
+
+
+class MockClient:
+    """Summarizer LLM: returns a summary listing the questions it was given"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.prompts = []
+        self.release = threading.Event()
+        self.release.set()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _summary(self, messages):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        previous = prompt.split("Mevcut özet: ")[1].split("\n")[0]
+        asked = [line.split(": ", 1)[1] for line in prompt.splitlines() if line.startswith("Kullanıcı: ")]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+            content=" ".join(([] if previous == "(yok)" else [previous]) + asked)
+        ))])
+
+    def create(self, messages, **kwargs):
+        self.release.wait()
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("OpenRouter unavailable")
+        return self._summary(messages)
+
+
+class MockAsyncClient(MockClient):
+    async def create(self, messages, **kwargs):
+        return self._summary(messages)
+
+
+def make_pipeline(client, cls=RAGPipeline, budget=60):
+    pipeline = cls(client, None, None)
+    pipeline.memory_strategy = "summarize"
+    pipeline.memory_token_budget = budget
+    return pipeline
+
+
+def talk(pipeline, turns, start=1):
+    for i in range(start, start + turns):
+        pipeline._remember(f"Soru {i}", f"Cevap {i}: " + "madde metni " * 10)
+
+
+def wait_for(pipeline):
+    if pipeline._summary_executor is not None:
+        pipeline._summary_executor.submit(lambda: None).result()
+
+
+def test_memory_summary():
+    """Evicted turns are folded into a bounded summary in the background"""
+
+    print("=" * 70)
+    print("🧠 Rolling Summary Memory Test")
+    print("=" * 70)
+
+    # Long session: history stays within the token budget, older turns are summarized
+    client = MockClient()
+    pipeline = make_pipeline(client)
+    for i in range(1, 9):
+        talk(pipeline, 1, start=i)
+        wait_for(pipeline)
+    assert message_tokens(pipeline.conversation_history) <= 60
+    assert pipeline.conversation_history[0]["content"] == "Soru 8"
+    assert pipeline.summary.split() == [word for i in range(1, 8) for word in ("Soru", str(i))]
+    assert pipeline._pending_turns == []
+    print(f"✓ History {message_tokens(pipeline.conversation_history)} tokens, summary: {pipeline.summary}")
+
+    # Incremental: each call sends the previous summary and only the new turns
+    assert all(prompt.count("Kullanıcı: ") == 1 for prompt in client.prompts)
+    messages = pipeline._build_messages("Soru 9", [])
+    assert messages[1]["role"] == "system" and pipeline.summary in messages[1]["content"]
+    assert messages[2]["content"] == "Soru 8"
+    print(f"✓ {len(client.prompts)} incremental summary calls; summary sent as a system message")
+
+    # No request waits: while the summarizer is slow, evicted turns stay in the prompt
+    client = MockClient()
+    client.release.clear()
+    pipeline = make_pipeline(client, budget=100)
+    started = time.perf_counter()
+    talk(pipeline, 3)
+    assert time.perf_counter() - started < 0.1
+    contents = [message["content"] for message in pipeline._build_messages("Soru 4", [])]
+    assert contents[1] == "Soru 1" and "Soru 3" in contents
+    client.release.set()
+    wait_for(pipeline)
+    assert "Soru 1" in pipeline.summary and not pipeline._pending_turns
+    print("✓ Summaries run in the background; unsummarized turns are not lost meanwhile")
+
+    # Failed summaries: turns kept for a later retry, backlog still token-bounded
+    pipeline = make_pipeline(MockClient(fail=True))
+    talk(pipeline, 10)
+    wait_for(pipeline)
+    assert pipeline.summary == "" and 0 < message_tokens(pipeline._pending_turns) <= 60
+    print("✓ Failed summaries keep a bounded backlog of turns")
+
+    # Reset while a summary is in flight: the stale summary is dropped
+    client = MockClient()
+    client.release.clear()
+    pipeline = make_pipeline(client)
+    talk(pipeline, 3)
+    pipeline.reset_conversation()
+    client.release.set()
+    wait_for(pipeline)
+    assert pipeline.summary == "" and pipeline.conversation_history == []
+    print("✓ Reset discards summaries of the previous conversation")
+
+    # Async pipeline: summaries are tasks on the event loop
+    async def async_session():
+        pipeline = make_pipeline(MockAsyncClient(), cls=AsyncRAGPipeline)
+        for i in range(1, 6):
+            talk(pipeline, 1, start=i)
+            await asyncio.gather(*list(pipeline._background))
+        return pipeline
+
+    pipeline = asyncio.run(async_session())
+    assert "Soru 1" in pipeline.summary and "Soru 4" in pipeline.summary
+    print(f"✓ Async pipeline summary: {pipeline.summary}")
+    print(f"\n📊 Stats: {pipeline.get_conversation_stats()}")
+
+    print("\n✅ Rolling summary memory working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_memory_summary()
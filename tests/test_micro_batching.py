@@ -0,0 +1,85 @@
+"""
+Test script for the cross-request micro-batching scheduler (no external dependencies)
+"""
+
+import threading
+import time
+
+from batching import MicroBatcher
+
+
+def test_micro_batching():
+    """Concurrent submissions share batches and get their own results back"""
+
+    print("=" * 70)
+    print("📦 Micro-batching Test")
+    print("=" * 70)
+
+    batch_sizes = []
+
+    def square_batch(items):
+        batch_sizes.append(len(items))
+        time.sleep(0.01)  # Simulated forward pass
+        return [item * item for item in items]
+
+    batcher = MicroBatcher(square_batch, max_batch_size=8, max_wait_ms=20, name="test-batcher")
+
+    # 16 concurrent single-item requests
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(i).result()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: i * i for i in range(16)}
+    assert max(batch_sizes) <= 8
+    assert len(batch_sizes) < 16, "Concurrent requests should share forward passes"
+    print(f"✓ 16 requests → {len(batch_sizes)} batches {batch_sizes}")
+
+    # Multi-item request keeps input order
+    assert batcher.map([3, 1, 2]) == [9, 1, 4]
+    print("✓ map() preserves order")
+
+    stats = batcher.stats()
+    assert stats["items"] == 19 and stats["queue_depth"] == 0
+    print(f"✓ Stats: avg batch {stats['avg_batch_size']:.1f}, max queue depth {stats['max_queue_depth']}")
+
+    batcher.close()
+
+
+def test_batch_errors():
+    """A failing batch fails every waiting request"""
+
+    print("\n" + "=" * 70)
+    print("💥 Batch Error Test")
+    print("=" * 70)
+
+    def failing_batch(items):
+        raise ValueError("model error")
+
+    batcher = MicroBatcher(failing_batch, max_batch_size=4, max_wait_ms=1)
+    try:
+        batcher.submit("x").result()
+        raise AssertionError("Exception should propagate")
+    except ValueError:
+        print("✓ Exception propagated to caller")
+
+    batcher.close()
+    try:
+        batcher.submit("y")
+        raise AssertionError("Closed batcher should reject items")
+    except RuntimeError:
+        print("✓ Closed batcher rejects new items")
+
+    print("\n✅ Micro-batching working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_micro_batching()
+    test_batch_errors()
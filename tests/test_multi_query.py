@@ -0,0 +1,84 @@
+"""
+Test script for multi-query retrieval (sub-queries, batch search, RRF, dedup)
+Mock LLM client and vector store, no API key or database needed.
+"""
+
+import os
+import tempfile
+from types import SimpleNamespace
+
+from documents import Document
+from expansion_cache import ExpansionCache
+from query_expansion import parse_subqueries
+from rag_pipeline import RAGPipeline
+
+
+def temp_expansion_cache():
+    """Empty expansion cache of its own (no expansions from earlier runs or other tests)"""
+    return ExpansionCache(os.path.join(tempfile.mkdtemp(), "expansions.sqlite3"), ttl=0, max_entries=100)
+
+
+class MockClient:
+    """Chat client returning a fixed completion"""
+
+    def __init__(self, content):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+            )
+        ))
+
+
+class MockVectorStore:
+    """Returns chunks named after the query words; records batch calls"""
+
+    def __init__(self):
+        self.batches = []
+
+    def similarity_search_batch(self, queries, k=10, filter_dict=None):
+        self.batches.append(list(queries))
+        return [[Document(word, {}, 0.5, word) for word in query.split()][:k] for query in queries]
+
+
+def test_multi_query():
+    """Sub-queries are parsed, searched in batches and fused without duplicates"""
+
+    print("=" * 70)
+    print("🔀 Multi-Query Retrieval Test")
+    print("=" * 70)
+
+    # LLM output cleanup: numbering, bullets, quotes, duplicates of the question
+    text = '1. işveren yükümlülük\n- "risk değerlendirmesi"\n\nİşveren görevleri\n2) işveren yükümlülük\n3. eğitim'
+    assert parse_subqueries(text, "işveren görevleri", 3) == [
+        "işveren yükümlülük", "risk değerlendirmesi", "eğitim"
+    ]
+    print("✓ Sub-queries parsed and deduplicated")
+
+    content = "işveren yükümlülük risk\nçalışan eğitim risk"
+
+    # Non-speculative: one batch with the question and all sub-queries
+    store = MockVectorStore()
+    pipeline = RAGPipeline(MockClient(content), store, None, speculative=False,
+                           expansion_cache=temp_expansion_cache())
+    query, docs = pipeline._expand_and_retrieve("işveren görevleri", expansion_mode="multi")
+    assert query == "işveren görevleri"  # Reranker scores against the original question
+    assert store.batches == [["işveren görevleri", "işveren yükümlülük risk", "çalışan eğitim risk"]]
+    ids = [doc.chunk_id for doc in docs]
+    assert len(ids) == len(set(ids)) == 6
+    assert ids[:2] == ["işveren", "risk"]  # Found by two sub-queries each
+    print(f"✓ One batch search, fused and deduplicated: {ids}")
+
+    # Speculative: the question is searched first, sub-queries in a second batch
+    store = MockVectorStore()
+    pipeline = RAGPipeline(MockClient(content), store, None, expansion_cache=temp_expansion_cache())
+    query, docs = pipeline._expand_and_retrieve("işveren görevleri", expansion_mode="multi")
+    assert store.batches == [["işveren görevleri"], ["işveren yükümlülük risk", "çalışan eğitim risk"]]
+    assert sorted(doc.chunk_id for doc in docs) == sorted(ids)
+    print("✓ Speculative mode overlaps the question search with sub-query generation")
+
+    print("\n✅ Multi-query retrieval working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_multi_query()
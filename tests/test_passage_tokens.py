@@ -0,0 +1,99 @@
+"""
+Test script for the pre-tokenized reranker passage store (small word-level tokenizer, no model download)
+"""
+
+import tempfile
+
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+
+from documents import Document
+from passage_tokens import PassageTokenStore
+
+WORDS = "işveren risk değerlendirmesi yapar çalışan eğitim alır madde kanun nedir".split()
+
+
+def make_tokenizer(max_length=12):
+    """BERT-style pair template with truncation and padding, like FlashRank's tokenizer"""
+    vocab = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "[SEP]": 3}
+    vocab.update({word: i + 4 for i, word in enumerate(WORDS)})
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        pair="[CLS] $A [SEP] $B:1 [SEP]:1",
+        special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    tokenizer.enable_truncation(max_length=max_length)
+    tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+    return tokenizer
+
+
+def test_pair_encodings_match_tokenizer():
+    """Pre-tokenized pairs equal tokenizer.encode_batch on raw (query, passage) pairs"""
+
+    print("=" * 70)
+    print("🔤 Pre-tokenized Passage Test")
+    print("=" * 70)
+
+    tokenizer = make_tokenizer()
+    store = PassageTokenStore(tokenizer, "test-model", tempfile.mkdtemp())
+
+    query = "risk değerlendirmesi nedir"
+    docs = [
+        Document("işveren risk değerlendirmesi yapar", {}, chunk_id="1"),
+        Document("çalışan eğitim alır " * 4, {}, chunk_id="2"),  # truncated
+        Document("madde", {}, chunk_id=None),
+    ]
+
+    expected = tokenizer.encode_batch([[query, doc.page_content] for doc in docs])
+    actual = store.pad(store.pair_encodings(query, docs))
+    for exp, act in zip(expected, actual):
+        assert exp.ids == act.ids
+        assert exp.type_ids == act.type_ids
+        assert exp.attention_mask == act.attention_mask
+    print("✓ ids / type_ids / attention_mask identical (incl. truncation and padding)")
+
+    assert set(store.encodings) == {"1", "2"}
+    print("✓ Passages with chunk ids stored once")
+
+    # Corpus re-ingested while a rerank is running: the request keeps its passages
+    class ClearingStore(PassageTokenStore):
+        def add(self, chunk_ids, texts):
+            added = super().add(chunk_ids, texts)
+            self.clear()  # Başka bir thread'in clear() çağrısı
+            return added
+
+    racing = ClearingStore(tokenizer, "test-model", tempfile.mkdtemp())
+    racing.add(["1"], [docs[0].page_content])
+    encodings = racing.passage_encodings(docs)
+    assert [e.ids for e in encodings] == [e.ids for e in store.passage_encodings(docs)]
+    print("✓ Concurrent clear() does not fail a running request")
+
+
+def test_sidecar_persistence():
+    """Stored passages survive a restart and belong to one model"""
+
+    print("\n" + "=" * 70)
+    print("💾 Sidecar Persistence Test")
+    print("=" * 70)
+
+    directory = tempfile.mkdtemp()
+    store = PassageTokenStore(make_tokenizer(), "test-model", directory)
+    store.add(["a", "b"], ["kanun madde", "işveren eğitim"])
+    store.save()
+
+    reloaded = PassageTokenStore(make_tokenizer(), "test-model", directory)
+    assert reloaded.encodings["a"].ids == store.encodings["a"].ids
+    print(f"✓ {len(reloaded.encodings)} passages reloaded from {reloaded.path}")
+
+    other = PassageTokenStore(make_tokenizer(), "other-model", directory)
+    assert not other.encodings
+    print("✓ Other model's sidecar is not used")
+
+    print("\n✅ Passage token store working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_pair_encodings_match_tokenizer()
+    test_sidecar_persistence()
@@ -0,0 +1,60 @@
+"""
+Test script for the query embedding LRU cache (no external dependencies)
+"""
+
+import time
+
+from cache_utils import LRUCache
+from query_encoder import QueryEncoder
+
+
+class MockModel:
+    """Counts encode calls instead of running a real model"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        import numpy as np
+        self.calls += 1
+        return np.full(4, len(text), dtype=np.float32)
+
+
+def test_query_cache():
+    """Test hits, eviction and TTL expiry"""
+
+    print("=" * 70)
+    print("🗄️  Query Embedding Cache Test")
+    print("=" * 70)
+
+    model = MockModel()
+    encoder = QueryEncoder(model, cache_size=2, cache_ttl=0)
+
+    # Same question with different whitespace -> one forward pass
+    encoder.encode("İşverenin   yükümlülükleri nelerdir?")
+    encoder.encode("İşverenin yükümlülükleri nelerdir? ")
+    assert model.calls == 1, "Normalized query should hit the cache"
+    print("✓ Whitespace-normalized query served from cache")
+
+    # Third distinct query evicts the least recently used one
+    encoder.encode("Risk değerlendirmesi nedir?")
+    encoder.encode("İş güvenliği uzmanı zorunlu mu?")
+    stats = encoder.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+    print(f"✓ LRU eviction: {stats}")
+
+    # TTL expiry
+    cache = LRUCache(max_size=10, ttl=0.05)
+    cache.set("q", 1)
+    time.sleep(0.06)
+    assert cache.get("q") is None
+    assert cache.stats()["expirations"] == 1
+    print("✓ Expired entries are dropped")
+
+    print("\n✅ Query cache working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_query_cache()
@@ -0,0 +1,123 @@
+"""
+Test script for the reranker score cache (mock cross-encoder, no model download)
+"""
+
+import tempfile
+
+import numpy as np
+from tokenizers import Tokenizer, models, pre_tokenizers
+
+from documents import Document
+from reranker import RerankerService
+
+
+class MockSession:
+    """Cross-encoder whose logit is the number of real tokens; counts scored pairs"""
+
+    def __init__(self):
+        self.scored_pairs = 0
+
+    def get_inputs(self):
+        return [type("Input", (), {"name": name})() for name in ("input_ids", "attention_mask")]
+
+    def run(self, _, onnx_input):
+        mask = onnx_input["attention_mask"]
+        self.scored_pairs += mask.shape[0]
+        return [mask.sum(axis=1, keepdims=True).astype(np.float32) / 10]
+
+
+class MockRanker:
+    """FlashRank Ranker stand-in: a mock ONNX session and a word-level tokenizer"""
+
+    def __init__(self):
+        self.session = MockSession()
+        self.tokenizer = Tokenizer(models.WordLevel({"[PAD]": 0, "[UNK]": 1, "x": 2}, unk_token="[UNK]"))
+        self.tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+
+def make_service(version, **kwargs):
+    """RerankerService with mock models (no model download)"""
+    options = dict(batching=False, cache_size=100, cache_ttl=None, workers=1,
+                   intra_op_threads=0, inter_op_threads=0, cascade=False)
+    options.update(kwargs)
+    return RerankerService(
+        corpus_version=lambda: version["value"],
+        ranker=MockRanker(),
+        passage_tokens_dir=tempfile.mkdtemp(),
+        **options
+    )
+
+
+def test_rerank_cache():
+    """Repeated queries reuse scores; re-ingestion clears them"""
+
+    print("=" * 70)
+    print("⚖️  Reranker Score Cache Test")
+    print("=" * 70)
+
+    version = {"value": "v1"}
+    service = make_service(version)
+    docs = [Document("x " * i, {}, 0.5, str(i)) for i in range(1, 6)]
+
+    ranked = service.rerank_documents("İşveren yükümlülükleri", docs, top_k=3)
+    assert [doc.chunk_id for doc in ranked] == ["5", "4", "3"]
+    assert service.ranker.session.scored_pairs == 5
+    print("✓ First call scores all 5 passages")
+
+    # Same query (different whitespace) + one new chunk -> only the new chunk is scored
+    docs.append(Document("x " * 9, {}, 0.5, "9"))
+    ranked = service.rerank_documents("İşveren  yükümlülükleri ", docs, top_k=3)
+    assert ranked[0].chunk_id == "9"
+    assert service.ranker.session.scored_pairs == 6
+    print("✓ Second call scores only the cache miss")
+
+    # Re-ingestion changes the corpus version -> cache cleared
+    version["value"] = "v2"
+    service.rerank_documents("İşveren yükümlülükleri", docs, top_k=3)
+    assert service.ranker.session.scored_pairs == 12
+    print("✓ Corpus version change invalidates cached scores")
+
+    print("\n✅ Reranker score cache working correctly!")
+    print("=" * 70)
+
+
+def test_sharded_scoring():
+    """Several ONNX sessions give the same scores, in input order"""
+
+    def scores(service):
+        docs = [Document("x " * (i % 7 + 1), {}, 0.5, str(i)) for i in range(50)]
+        ranked = service.rerank_documents("soru", docs, top_k=50)
+        return [doc.rerank_score for doc in sorted(ranked, key=lambda doc: int(doc.chunk_id))]
+
+    expected = scores(make_service({"value": "v1"}))
+    service = make_service({"value": "v1"}, workers=3, session_factory=lambda options: MockSession())
+    assert len(service.sessions) == 3
+    assert np.allclose(scores(service), expected)
+    assert [session.scored_pairs for session in service.sessions] == [17, 17, 16]
+    print("✓ 50 pairs sharded across 3 sessions, scores match single session")
+
+
+def test_cascade():
+    """The prefilter scores every candidate, the main model only the shortlist"""
+
+    service = make_service({"value": "v1"}, cascade=True, shortlist_k=4, prefilter_ranker=MockRanker())
+    docs = [Document("x " * i, {}, 0.5, str(i)) for i in range(1, 11)]
+
+    ranked = service.rerank_documents("soru", docs, top_k=10)
+    assert [doc.chunk_id for doc in ranked] == ["10", "9", "8", "7"]
+    assert service.prefilter.session.scored_pairs == 10
+    assert service.ranker.session.scored_pairs == 4
+    print("✓ 10 candidates → prefilter → 4 scored by the main model")
+
+    # Both stages are cached separately
+    service.rerank_documents("soru", docs, top_k=10)
+    assert service.prefilter.session.scored_pairs == 10
+    assert service.ranker.session.scored_pairs == 4
+    print("✓ Repeated query reuses prefilter and main model scores")
+
+
+if __name__ == "__main__":
+    test_rerank_cache()
+    test_sharded_scoring()
+    test_cascade()
@@ -0,0 +1,100 @@
+"""
+Test script for speculative retrieval (raw-question search overlapping query expansion)
+Mock LLM client and vector store, no API key or database needed.
+"""
+
+import os
+import time
+import tempfile
+from types import SimpleNamespace
+
+from documents import Document
+from expansion_cache import ExpansionCache
+from rag_pipeline import RAGPipeline
+
+
+def temp_expansion_cache():
+    """Empty expansion cache of its own (no expansions from earlier runs or other tests)"""
+    return ExpansionCache(os.path.join(tempfile.mkdtemp(), "expansions.sqlite3"), ttl=0, max_entries=100)
+
+
+class MockClient:
+    """Chat client whose completion takes `delay` seconds (or fails)"""
+
+    def __init__(self, expansion, delay=0.0, fail=False):
+        self.expansion = expansion
+        self.delay = delay
+        self.fail = fail
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("OpenRouter unavailable")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.expansion))])
+
+
+class MockVectorStore:
+    """Returns chunks named after the query words; records query start times"""
+
+    def __init__(self):
+        self.queries = []
+
+    def similarity_search(self, query, k=50, filter_dict=None):
+        self.queries.append((query, time.perf_counter()))
+        return [Document(word, {}, 0.5, word) for word in query.split()][:k]
+
+
+def make_pipeline(client, store, **kwargs):
+    return RAGPipeline(client, store, None, expansion_cache=temp_expansion_cache(),
+                       expansion_deadline_ms=200, **kwargs)
+
+
+def test_speculative_retrieval():
+    """Merge on fast expansion, raw candidates on slow or failed expansion"""
+
+    print("=" * 70)
+    print("🏎️  Speculative Retrieval Test")
+    print("=" * 70)
+
+    # Fast expansion: both candidate sets are merged, duplicates removed
+    store = MockVectorStore()
+    pipeline = make_pipeline(MockClient("işveren yükümlülük risk", delay=0.05), store)
+    started = time.perf_counter()
+    query, docs = pipeline._expand_and_retrieve("işveren görevleri")
+    assert query == "işveren yükümlülük risk"
+    assert store.queries[0][0] == "işveren görevleri"
+    assert store.queries[0][1] - started < 0.05, "Raw retrieval must not wait for the expansion"
+    assert sorted(doc.chunk_id for doc in docs) == ["görevleri", "işveren", "risk", "yükümlülük"]
+    assert docs[0].chunk_id == "işveren"  # Found by both queries
+    print("✓ Raw retrieval starts immediately; expanded candidates merged with RRF")
+
+    # Slow expansion: deadline passes, second retrieval skipped
+    store = MockVectorStore()
+    pipeline = make_pipeline(MockClient("geç genişletme", delay=0.5), store)
+    started = time.perf_counter()
+    query, docs = pipeline._expand_and_retrieve("işveren görevleri")
+    assert time.perf_counter() - started < 0.4
+    assert query == "işveren görevleri" and len(store.queries) == 1
+    print("✓ Slow expansion: raw-question candidates used after the deadline")
+
+    # Failed expansion: expand_query returns the original question
+    store = MockVectorStore()
+    pipeline = make_pipeline(MockClient(None, fail=True), store)
+    query, docs = pipeline._expand_and_retrieve("işveren görevleri")
+    assert query == "işveren görevleri" and len(store.queries) == 1
+    print("✓ Failed expansion: no second retrieval")
+
+    # Speculation off: expansion first, one retrieval
+    store = MockVectorStore()
+    pipeline = make_pipeline(MockClient("işveren risk"), store, speculative=False)
+    query, docs = pipeline._expand_and_retrieve("işveren görevleri")
+    assert [q for q, _ in store.queries] == ["işveren risk"]
+    print("✓ Non-speculative mode retrieves once with the expanded query")
+
+    print("\n✅ Speculative retrieval working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_speculative_retrieval()
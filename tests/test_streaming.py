@@ -0,0 +1,103 @@
+"""
+Test script for streaming answers (generate_response_stream and /api/ask/stream SSE)
+Mock LLM client, vector store and reranker, no API key or database needed.
+"""
+
+import json
+from types import SimpleNamespace
+
+import app as server
+from documents import Document
+from rag_pipeline import RAGPipeline
+
+
+class MockStream:
+    """Iterable of completion chunks that records close()"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.closed = False
+
+    def __iter__(self):
+        yield SimpleNamespace(choices=[])  # Keep-alive chunk without choices
+        for token in self.tokens:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))])
+
+    def close(self):
+        self.closed = True
+
+
+class MockClient:
+    """Chat client returning a MockStream when stream=True"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.streams = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, stream=False, **kwargs):
+        assert stream, "Streaming answer must request stream=True"
+        self.streams.append(MockStream(self.tokens))
+        return self.streams[-1]
+
+
+class MockVectorStore:
+    def similarity_search(self, query, k=50, filter_dict=None):
+        return [Document("İşveren çalışanların sağlığını gözetir. Madde 4",
+                         {"source_file": "6331_Kanun.pdf", "page": 3}, 0.9, "c1")]
+
+
+class MockReranker:
+    def rerank_documents(self, query, documents, top_k=5):
+        return documents[:top_k]
+
+
+def test_streaming():
+    """Sources first, tokens as they arrive, memory updated only on completion"""
+
+    print("=" * 70)
+    print("📡 Streaming Answer Test")
+    print("=" * 70)
+
+    tokens = ["İşveren ", "sağlığı ", "gözetir ", "(Madde 4)."]
+    client = MockClient(tokens)
+    pipeline = RAGPipeline(client, MockVectorStore(), MockReranker())
+
+    events = list(pipeline.generate_response_stream("İşverenin görevi nedir?", expansion_mode="none"))
+    kinds = [event for event, _ in events]
+    assert kinds == ["sources", "token", "token", "token", "token", "done"]
+    assert "6331 Kanun" in events[0][1]
+    answer = "".join(data for event, data in events if event == "token")
+    assert events[-1][1] == answer + events[0][1]
+    assert pipeline.conversation_history[-1] == {"role": "assistant", "content": answer}
+    assert client.streams[0].closed
+    print(f"✓ Events in order: {kinds}")
+
+    # Consumer stops early: upstream closed, no half answer in memory
+    stream = pipeline.generate_response_stream("Çalışanın hakları nelerdir?", expansion_mode="none")
+    next(stream), next(stream)
+    stream.close()
+    assert client.streams[1].closed
+    assert len(pipeline.conversation_history) == 2
+    print("✓ Early disconnect closes the LLM stream and leaves memory unchanged")
+
+    # SSE endpoint
+    server.rag_pipeline = pipeline
+    http = server.app.test_client()
+    response = http.post("/api/ask/stream", json={"question": "İşverenin görevi nedir?", "expansion": "none"})
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    frames = [frame.split("\n") for frame in body.strip().split("\n\n")]
+    names = [frame[0][len("event: "):] for frame in frames]
+    assert names == ["sources", "token", "token", "token", "token", "done"]
+    assert json.loads(frames[-1][1][len("data: "):])["answer"].startswith(answer)
+    assert http.post("/api/ask/stream", json={"question": " "}).status_code == 400
+    print("✓ /api/ask/stream sends Server-Sent Events; invalid body -> 400")
+
+    print("\n✅ Streaming answers working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_streaming()
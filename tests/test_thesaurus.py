@@ -0,0 +1,64 @@
+"""
+Test script for offline (thesaurus-based) query expansion
+"""
+
+import json
+import os
+import tempfile
+
+from thesaurus import Thesaurus, build_thesaurus, mine_definitions, term_key
+
+CORPUS = [
+    "Bu Kanunun uygulanmasında; a) Bakanlık: Çalışma ve Sosyal Güvenlik Bakanlığını, "
+    "b) Çalışan: Kendi özel kanunlarındaki statülerine bakılmaksızın işyerinde istihdam edilen gerçek kişiyi, "
+    "c) Kurum: Sosyal Güvenlik Kurumunu, ifade eder.",
+    "İşveren, çalışma ortamında uygun kişisel koruyucu donanım (KKD) sağlar.",
+] + ["Emniyet kemeri ve iskele."] * 6 + [
+    "Kimyasal maddeler etiketlenir ve ambalajlanır.",
+] * 6
+
+
+def test_thesaurus():
+    """Curated rules, mined definitions/acronyms and co-occurring terms"""
+
+    print("=" * 70)
+    print("📖 Thesaurus Query Expansion Test")
+    print("=" * 70)
+
+    thesaurus = Thesaurus(max_terms=12)
+
+    # Curated rule (same as the LLM prompt rule), matched on stems: "cezaları" → "ceza"
+    expanded = thesaurus.expand("İş güvenliği ihlallerinin cezaları nelerdir?")
+    assert expanded.startswith("İş güvenliği ihlallerinin cezaları nelerdir?")
+    assert "idari para cezası" in expanded and "madde 26" in expanded
+    print(f"✓ Curated rule: {expanded}")
+
+    # No match -> query unchanged
+    assert thesaurus.expand("Merhaba") == "Merhaba"
+    print("✓ Unmatched query returned unchanged")
+
+    # Definitions and acronyms mined from cleaned (single-line) legislation text
+    entries = mine_definitions(CORPUS[0] + " " + CORPUS[1])
+    assert entries[term_key("Bakanlık")] == ["Çalışma ve Sosyal Güvenlik Bakanlığını"]
+    assert entries[term_key("Kurum")] == ["Sosyal Güvenlik Kurumunu"]
+    assert term_key("Çalışan") not in entries  # Long definition skipped
+    assert entries[term_key("KKD")] == ["kişisel koruyucu donanım"]
+    print("✓ Definitions and acronyms mined")
+
+    # Built file: co-occurring terms become expansions
+    path = os.path.join(tempfile.mkdtemp(), "thesaurus.json")
+    build_thesaurus(CORPUS, path)
+    with open(path, encoding="utf-8") as f:
+        mined = json.load(f)["entries"]
+    assert mined[term_key("emniyet")] == ["kemeri", "iskele"]
+    thesaurus = Thesaurus.load(path)
+    expanded = thesaurus.expand("Bakanlık emniyet kuralları")
+    assert "Çalışma ve Sosyal Güvenlik Bakanlığını" in expanded and "iskele" in expanded
+    print(f"✓ Mined thesaurus: {expanded}")
+
+    print("\n✅ Thesaurus expansion working correctly!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    test_thesaurus()
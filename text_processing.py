@@ -2,7 +2,20 @@
 Text preprocessing utilities
 """
 
+import math
 import re
+import unicodedata
+from config import CHARS_PER_TOKEN
+
+
+def turkish_lower(text):
+    """
+    Türkçe kurallarına göre küçük harfe çevir.
+    str.lower() "I" harfini "i", "İ" harfini "i̇" (birleşik nokta) yapar;
+    burada "I" → "ı" ve "İ" → "i" olur.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return text.replace("I", "ı").replace("İ", "i").lower()
 
 
 def clean_text(text):
@@ -25,3 +38,18 @@ def clean_text(text):
     text = re.sub(r'\s+', ' ', text).strip()
     
     return text
+
+
+def estimate_token_count(text, chars_per_token=CHARS_PER_TOKEN):
+    """
+    Estimates the LLM token count of a text without loading a tokenizer.
+    Computed once per chunk at ingestion and stored as metadata["token_count"].
+    
+    Args:
+        text (str): Chunk text
+        chars_per_token (float): Average characters per token
+        
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / chars_per_token)
@@ -0,0 +1,287 @@
+"""
+Offline query expansion thesaurus
+LLM çağrısı olmadan sorgu genişletme. İki kaynak birleştirilir:
+- Elle yazılmış kurallar (ör. "yaptırım/ceza" → "idari para cezası", "madde 26")
+- data/ klasöründeki corpus'tan çıkarılan terimler: tanım maddeleri
+  ("Bakanlık: Çalışma ve Sosyal Güvenlik Bakanlığını"), parantez içi
+  kısaltmalar ("kişisel koruyucu donanım (KKD)") ve aynı cümlede sık
+  birlikte geçen terimler (normalize PMI)
+
+Terimler lexical_index'in kök alma kurallarıyla eşleştirilir; "işverenin"
+ile "işveren" aynı kurala takılır.
+
+Thesaurus dosyasını oluşturma (data/ klasöründeki PDF'lerden):
+    python thesaurus.py
+"""
+
+import os
+import re
+import json
+import math
+from collections import Counter, defaultdict
+from lexical_index import tokenize, STOPWORDS, stem
+from text_processing import turkish_lower
+from resources import get_model
+from config import THESAURUS_PATH, THESAURUS_MAX_TERMS
+
+# Tetikleyici ifadeler → sorguya eklenecek ifadeler (6331 sayılı Kanun madde numaraları)
+CURATED_RULES = [
+    (("yaptırım", "ceza"), ("idari para cezası", "hapis cezası", "yaptırımlar", "madde 26")),
+    (("işveren yükümlülük", "işverenin görevleri"), ("işverenin genel yükümlülüğü", "madde 4")),
+    (("çalışan yükümlülük", "çalışanın görevleri"), ("çalışanların yükümlülükleri", "madde 19")),
+    (("risk değerlendirmesi", "risk analizi"), ("risk değerlendirmesi", "kontrol tedbirleri", "madde 10")),
+    (("iş güvenliği uzmanı", "işyeri hekimi", "isg profesyoneli"), ("iş sağlığı ve güvenliği hizmetleri", "madde 6", "madde 8")),
+    (("çalışan temsilcisi",), ("çalışan temsilcisi", "destek elemanı", "madde 20")),
+    (("eğitim",), ("çalışanların eğitimi", "madde 17")),
+    (("bilgilendirme",), ("çalışanların bilgilendirilmesi", "madde 16")),
+    (("acil durum", "tahliye", "yangın"), ("acil durum planları", "yangınla mücadele", "ilk yardım", "madde 11")),
+    (("iş kazası", "meslek hastalığı"), ("iş kazası ve meslek hastalıklarının kayıt ve bildirimi", "madde 14")),
+    (("sağlık gözetimi", "sağlık raporu", "muayene"), ("sağlık gözetimi", "madde 15")),
+    (("kaçınma", "çalışmaktan kaçınma"), ("çalışmaktan kaçınma hakkı", "madde 13")),
+    (("işin durdurulması", "durdurma"), ("işin durdurulması", "madde 25")),
+    (("kurul", "isg kurulu"), ("iş sağlığı ve güvenliği kurulu", "madde 22")),
+    (("kişisel koruyucu", "kkd", "koruyucu donanım"), ("kişisel koruyucu donanım", "KKD")),
+    (("tehlike sınıfı",), ("az tehlikeli", "tehlikeli", "çok tehlikeli", "işyeri tehlike sınıfları")),
+]
+
+# Birbirinin yerine kullanılan terimler
+SYNONYM_GROUPS = [
+    ("çalışan", "işçi", "personel"),
+    ("işyeri", "iş yeri", "işletme"),
+    ("iş sağlığı ve güvenliği", "isg", "iş güvenliği"),
+    ("alt işveren", "taşeron"),
+    ("ceza", "yaptırım", "müeyyide"),
+]
+
+# Corpus madenciliği eşikleri
+MIN_TERM_DF = 5          # Bir terimin geçmesi gereken en az cümle sayısı
+MIN_PAIR_COUNT = 4       # Birlikte geçme sayısı alt sınırı
+MIN_NPMI = 0.35          # Normalize PMI alt sınırı
+MAX_RELATED = 3          # Terim başına ilişkili terim
+MAX_VOCABULARY = 5000    # En sık terimler (eş-geçiş sayımı bunlarla sınırlı)
+MAX_DEFINITION_WORDS = 6  # Uzun tanımlar sorguyu sulandırır; kısa olanlar (ör. "Bakanlık") alınır
+
+# Tanımlar maddesi, temizlenmiş (tek satır) metinde: "a) Bakanlık: Çalışma ve ... Bakanlığını, b) ..."
+DEFINITION_PATTERN = re.compile(
+    r"(?:^|\s)[a-zçğıöşü]{1,2}\)\s*([A-ZÇĞİÖŞÜ][^:()]{1,59}?)\s*:\s*"
+    r"(.+?)(?=,\s*[a-zçğıöşü]{1,2}\)\s|[.;]|$)"
+)
+ACRONYM_PATTERN = re.compile(
+    r"([A-ZÇĞİÖŞÜa-zçğıöşü][a-zçğıöşü]+(?:\s+[A-ZÇĞİÖŞÜa-zçğıöşü][a-zçğıöşü]+){1,5})\s*\(([A-ZÇĞİÖŞÜ]{2,6})\)"
+)
+SENTENCE_PATTERN = re.compile(r"(?<=[.;:!?])\s+|\n{2,}")
+
+
+def term_key(text):
+    """Eşleştirme anahtarı: ifadenin kökleri (boşlukla birleşik)"""
+    return " ".join(tokenize(text))
+
+
+class Thesaurus:
+    """Stemmed term → expansion phrases, applied to a query without any model call"""
+
+    def __init__(self, entries=None, max_terms=THESAURUS_MAX_TERMS):
+        """
+        Args:
+            entries (dict): term_key → eklenecek ifadeler (madencilikten gelen)
+            max_terms (int): Sorguya eklenecek en fazla ifade
+        """
+        self.max_terms = max_terms
+        self.entries = defaultdict(list)
+
+        # Elle yazılmış kurallar önce gelir, corpus'tan çıkanlar sonra
+        for triggers, phrases in CURATED_RULES:
+            for trigger in triggers:
+                self._add(term_key(trigger), phrases)
+        for group in SYNONYM_GROUPS:
+            for term in group:
+                self._add(term_key(term), [other for other in group if other != term])
+        for key, phrases in (entries or {}).items():
+            self._add(key, phrases)
+
+        self.max_ngram = max((len(key.split()) for key in self.entries), default=1)
+
+    def _add(self, key, phrases):
+        if not key:
+            return
+        for phrase in phrases:
+            if phrase not in self.entries[key]:
+                self.entries[key].append(phrase)
+
+    @classmethod
+    def load(cls, path=THESAURUS_PATH):
+        """Corpus'tan çıkarılmış dosyayı yükle; yoksa sadece elle yazılmış kurallar"""
+        entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)["entries"]
+            print(f"✅ Thesaurus yüklendi: {len(entries)} terim ({path})")
+        else:
+            print(f"ℹ️  Thesaurus dosyası yok ({path}), sadece elle yazılmış kurallar kullanılıyor")
+        return cls(entries)
+
+    def expand(self, query):
+        """
+        Sorguya eşleşen terimlerin ifadelerini ekle.
+
+        Args:
+            query (str): Kullanıcı sorusu
+
+        Returns:
+            str: Genişletilmiş sorgu (eşleşme yoksa orijinal sorgu)
+        """
+        stems = tokenize(query)
+        present = set(stems)
+        added = []
+
+        # Uzun ifadeler önce: "iş kazası" kuralı "iş" kuralından önce uygulanır
+        for n in range(min(self.max_ngram, len(stems)), 0, -1):
+            for i in range(len(stems) - n + 1):
+                for phrase in self.entries.get(" ".join(stems[i:i + n]), ()):
+                    phrase_stems = set(tokenize(phrase))
+                    if phrase_stems <= present:
+                        continue  # Sorguda veya eklenen bir ifadede zaten geçiyor
+                    added.append(phrase)
+                    present |= phrase_stems
+                    if len(added) >= self.max_terms:
+                        return f"{query} {' '.join(added)}"
+
+        return f"{query} {' '.join(added)}" if added else query
+
+
+def _acronym_phrase(phrase, acronym):
+    """
+    Kısaltmanın açılımı: baş harfleri kısaltmayı veren son kelimeler.
+    "... ile kişisel koruyucu donanım (KKD)" → "kişisel koruyucu donanım"
+    """
+    words = phrase.split()
+    content = 0
+    for start in range(len(words) - 1, -1, -1):
+        if turkish_lower(words[start]) not in STOPWORDS:
+            content += 1
+        if content == len(acronym):
+            initials = "".join(
+                turkish_lower(word)[0] for word in words[start:]
+                if turkish_lower(word) not in STOPWORDS
+            )
+            return " ".join(words[start:]) if initials == turkish_lower(acronym) else None
+    return None
+
+
+def mine_definitions(text):
+    """Tanım maddeleri ve parantez içi kısaltmalar → {term_key: [ifade]}"""
+    entries = defaultdict(list)
+
+    for term, definition in DEFINITION_PATTERN.findall(text):
+        definition = re.sub(r",?\s*ifade eder$", "", definition.strip().rstrip(",."))
+        words = definition.split()
+        if 1 <= len(words) <= MAX_DEFINITION_WORDS:
+            entries[term_key(term)].append(" ".join(words))
+
+    for phrase, acronym in ACRONYM_PATTERN.findall(text):
+        phrase = _acronym_phrase(phrase, acronym)
+        if phrase:
+            entries[term_key(acronym)].append(phrase)
+            entries[term_key(phrase)].append(acronym)
+
+    return entries
+
+
+def mine_related_terms(texts):
+    """
+    Aynı cümlede sık birlikte geçen terimler (normalize PMI).
+
+    Args:
+        texts (list): Corpus metinleri
+
+    Returns:
+        dict: term_key → en ilişkili terimlerin en sık yüzey biçimleri
+    """
+    sentences = []
+    surface = defaultdict(Counter)
+    for text in texts:
+        for sentence in SENTENCE_PATTERN.split(text):
+            words = [w for w in re.findall(r"\w+", turkish_lower(sentence)) if w not in STOPWORDS]
+            stems = set()
+            for word in words:
+                if len(word) < 3 or word.isdigit():
+                    continue
+                token = stem(word)
+                surface[token][word] += 1
+                stems.add(token)
+            if len(stems) > 1:
+                sentences.append(stems)
+
+    df = Counter(token for stems in sentences for token in stems)
+    vocabulary = {
+        token for token, count in df.most_common(MAX_VOCABULARY) if count >= MIN_TERM_DF
+    }
+
+    pairs = Counter()
+    for stems in sentences:
+        terms = sorted(stems & vocabulary)
+        for i, a in enumerate(terms):
+            for b in terms[i + 1:]:
+                pairs[(a, b)] += 1
+
+    n = len(sentences)
+    related = defaultdict(list)
+    for (a, b), count in pairs.items():
+        if count < MIN_PAIR_COUNT:
+            continue
+        p_ab = count / n
+        if p_ab >= 1:
+            continue
+        npmi = math.log(p_ab / ((df[a] / n) * (df[b] / n))) / -math.log(p_ab)
+        if npmi >= MIN_NPMI:
+            related[a].append((npmi, b))
+            related[b].append((npmi, a))
+
+    return {
+        token: [surface[other].most_common(1)[0][0] for _, other in sorted(scored, reverse=True)[:MAX_RELATED]]
+        for token, scored in related.items()
+    }
+
+
+def build_thesaurus(texts, path=THESAURUS_PATH):
+    """
+    Corpus metinlerinden thesaurus dosyasını oluştur.
+
+    Args:
+        texts (list): Corpus metinleri (sayfa veya chunk)
+        path (str): Çıktı dosyası
+
+    Returns:
+        int: Terim sayısı
+    """
+    mined = [mine_definitions(text) for text in texts] + [mine_related_terms(texts)]
+    entries = defaultdict(list)
+    for source in mined:
+        for key, phrases in source.items():
+            for phrase in phrases:
+                if key and phrase not in entries[key]:
+                    entries[key].append(phrase)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "entries": entries}, f, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
+    print(f"✅ Thesaurus: {len(entries)} terim → {path}")
+    return len(entries)
+
+
+def get_thesaurus():
+    """Süreç genelinde paylaşılan Thesaurus"""
+    return get_model("thesaurus", Thesaurus.load)
+
+
+if __name__ == "__main__":
+    from document_loader import load_all_pdfs_from_directory
+    from text_processing import clean_text
+    from config import KANUN_DIR, TEBLIG_DIR
+
+    print("=" * 60)
+    print("Query Expansion Thesaurus")
+    print("=" * 60)
+    pages = load_all_pdfs_from_directory(KANUN_DIR) + load_all_pdfs_from_directory(TEBLIG_DIR)
+    build_thesaurus([clean_text(page.page_content) for page in pages])
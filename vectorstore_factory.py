@@ -0,0 +1,47 @@
+"""
+Vector store backend selection
+VECTOR_BACKEND ayarına göre MongoDB, yerel (exact) veya HNSW vector store döndürür.
+"""
+
+from config import VECTOR_BACKEND
+
+
+def get_vectorstore(backend=VECTOR_BACKEND):
+    """
+    Yapılandırılmış vector store backend'ini oluştur.
+
+    Args:
+        backend (str): "mongodb", "local" veya "hnsw"
+
+    Returns:
+        Vector store instance
+    """
+    if backend == "hnsw":
+        from hnsw_vector_store import get_hnsw_vectorstore
+        return get_hnsw_vectorstore()
+    if backend == "local":
+        from local_vector_store import get_local_vectorstore
+        return get_local_vectorstore()
+    if backend == "mongodb":
+        from mongodb_vector_store import get_mongodb_vectorstore
+        return get_mongodb_vectorstore()
+    raise ValueError(f"Bilinmeyen VECTOR_BACKEND: {backend}")
+
+
+def vectorstore_exists(backend=VECTOR_BACKEND):
+    """
+    Seçili backend'de döküman var mı kontrol et.
+
+    Args:
+        backend (str): "mongodb", "local" veya "hnsw"
+
+    Returns:
+        bool: True if documents exist
+    """
+    if backend in ("local", "hnsw"):
+        from local_vector_store import local_store_exists
+        return local_store_exists()
+    if backend == "mongodb":
+        from mongodb_vector_store import mongodb_store_exists
+        return mongodb_store_exists()
+    raise ValueError(f"Bilinmeyen VECTOR_BACKEND: {backend}")